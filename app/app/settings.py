@@ -1,4 +1,5 @@
 import os
+import sys
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -39,6 +40,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     *LOCAL_APPS,
     *THIRD_PARTY_APP
 ]
@@ -53,11 +55,36 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
-if DEBUG:
+# Silk keeps profiling (and running EXPLAINs) after a test request
+# has finished, which skews the query counts asserted in tests.
+TESTING = 'test' in sys.argv
+
+if DEBUG and not TESTING:
     MIDDLEWARE.append('silk.middleware.SilkyMiddleware')
     INSTALLED_APPS.append('silk')
+if DEBUG:
     INSTALLED_APPS.append('django_extensions')
 
+# Records the queries of every request and checks them against the
+# `query_budget` of the APIView; see core/query_inspection.py.
+if DEBUG or TESTING:
+    MIDDLEWARE.append('core.query_inspection.QueryInspectionMiddleware')
+QUERY_REPEAT_THRESHOLD = 3
+
+# Background jobs, see core/jobs.py. The tests use the in-memory queue.
+JOBS_BACKEND = 'core.jobs.LocalQueue' if TESTING else 'core.jobs.RedisQueue'
+# Payloads of the jobs that ran out of retries are kept this long.
+JOBS_FAILED_TIMEOUT = 60 * 60 * 24 * 7
+
+# Backend of the throttles in core/rate_limit.py. The tests use the in-memory one.
+RATE_LIMIT_BACKEND = (
+    'core.rate_limit.LocalRateLimiter' if TESTING else 'core.rate_limit.RedisRateLimiter'
+)
+
+# Set when deployed under ASGI, so the hot read endpoints are routed to
+# their async views (users/urls.py, skill/urls.py).
+ASYNC_READ_VIEWS = os.environ.get('ASYNC_READ_VIEWS') == '1'
+
 
 ROOT_URLCONF = 'app.urls'
 
@@ -115,6 +142,24 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+# Argon2id at the OWASP minimum cost (19 MiB, 2 passes), about a tenth of
+# the CPU time of the PBKDF2 default; PASSWORD_HASHER=scrypt switches to
+# scrypt. PBKDF2 stays listed for the existing hashes, which are upgraded
+# on the next login.
+PASSWORD_HASHER = os.environ.get('PASSWORD_HASHER', 'argon2')
+PASSWORD_ARGON2_PARAMS = {'time_cost': 2, 'memory_cost': 19456, 'parallelism': 1}
+PASSWORD_SCRYPT_PARAMS = {'work_factor': 2 ** 14, 'block_size': 8, 'parallelism': 5}
+PASSWORD_HASHERS = [
+    'core.hashers.Argon2PasswordHasher',
+    'core.hashers.ScryptPasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+]
+if PASSWORD_HASHER == 'scrypt':
+    PASSWORD_HASHERS[0], PASSWORD_HASHERS[1] = PASSWORD_HASHERS[1], PASSWORD_HASHERS[0]
+# Threads hashing passwords at the same time, see core/hashers.py.
+PASSWORD_HASH_WORKERS = os.cpu_count() or 1
+
 
 # Internationalization
 # https://docs.djangoproject.com/en/4.2/topics/i18n/
@@ -148,13 +193,47 @@ REST_FRAMEWORK = {
     # YOUR SETTINGS
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'core.authentication.ClaimsJWTAuthentication',
         'rest_framework.authentication.SessionAuthentication'
-    )
+    ),
+    # Sliding window limits of the views with a `throttle_scope`,
+    # keyed by client IP and by the phone number in the request body.
+    'DEFAULT_THROTTLE_RATES': {
+        'registration_ip': '10/hour',
+        'otp_resend_ip': '30/hour',
+        'otp_resend_phone': '5/hour',
+        'otp_verify_ip': '60/hour',
+        'otp_verify_phone': '10/hour',
+    }
+}
+
+# Set on a server under `manage.py load_test`, which registers thousands
+# of users from one IP. Views without a rate are not throttled.
+if os.environ.get('DISABLE_THROTTLES') == '1':
+    REST_FRAMEWORK['DEFAULT_THROTTLE_RATES'] = {}
+
+# The tokens carry the claims `core.authentication` builds the user from.
+SIMPLE_JWT = {
+    'TOKEN_OBTAIN_SERIALIZER': 'core.authentication.ClaimsTokenObtainPairSerializer',
+    'TOKEN_REFRESH_SERIALIZER': 'core.authentication.ClaimsTokenRefreshSerializer',
 }
 
 # Validating profile images size
 MAX_PROFILE_IMAG_SIZE_MB = 5
+MAX_PROFILE_IMAGE_DIMENSION = 4096
+# WebP thumbnails rendered for every profile image, by their longest side.
+PROFILE_THUMBNAIL_SIZES = (96, 320)
+PROFILE_THUMBNAIL_QUALITY = 80
+
+# OTP lifetime and the failed attempts allowed per phone number
+OTP_TIMEOUT_SECONDS = 60 * 2
+OTP_MAX_ATTEMPTS = 5
+
+# Baselines of the microbenchmarks (core/benchmarking.py) and how much
+# slower than its baseline a benchmark may run before failing.
+BENCHMARK_BASELINES = BASE_DIR / 'core' / 'tests' / 'benchmark_baselines.json'
+BENCHMARK_TIME_THRESHOLD = float(os.environ.get('BENCHMARK_TIME_THRESHOLD', '1.0'))
+BENCHMARK_TIME_FLOOR_MS = 5
 
 # Cache system config
 CACHES = {
@@ -166,3 +245,8 @@ CACHES = {
         }
     }
 }
+# The tests get a database and a key prefix of their own, so the
+# `delete_pattern('*')` cleaning up after them can't wipe the dev cache.
+if TESTING:
+    CACHES['default']['LOCATION'] = 'redis://redis:6379/15'
+    CACHES['default']['KEY_PREFIX'] = 'test'
@@ -21,5 +21,6 @@ urlpatterns = [
 ]
 
 if settings.DEBUG:
-    urlpatterns.append(path('silk/', include('silk.urls', namespace='silk')))
+    if not settings.TESTING:
+        urlpatterns.append(path('silk/', include('silk.urls', namespace='silk')))
     urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
@@ -0,0 +1,52 @@
+"""
+Base class of the async read endpoints served under ASGI.
+
+DRF 3.14 dispatches every request synchronously, so an `async def` handler
+on a plain APIView never gets awaited. `AsyncAPIView` awaits the handler
+and renders the response on the event loop; Django would otherwise hand
+the `render()` of a DRF Response to a thread.
+"""
+from inspect import iscoroutinefunction
+
+from django.http import HttpResponse
+from rest_framework.views import APIView
+
+
+class AsyncAPIView(APIView):
+    """
+    APIView with coroutine handlers, for public endpoints: authentication
+    is left lazy, since authenticating would query the database from the
+    event loop.
+    """
+
+    def perform_authentication(self, request) -> None:
+        pass
+
+    async def dispatch(self, request, *args, **kwargs):
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            self.initial(request, *args, **kwargs)
+            handler = getattr(self, request.method.lower(), None)
+            if request.method.lower() not in self.http_method_names or handler is None:
+                handler = self.http_method_not_allowed
+            response = handler(request, *args, **kwargs)
+            if iscoroutinefunction(handler):
+                response = await response
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self._rendered(self.response)
+
+    @staticmethod
+    def _rendered(response) -> HttpResponse:
+        response.render()
+        rendered = HttpResponse(response.content, status=response.status_code)
+        for header, value in response.items():
+            rendered[header] = value
+        return rendered
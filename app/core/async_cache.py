@@ -0,0 +1,44 @@
+"""
+Async access to the django-redis cache.
+
+django-redis has no async API, so `cache.aget()` runs the sync client in a
+thread. These helpers talk to the same Redis with `redis.asyncio` and use
+the cache's key prefix and serializer, so a value written by either side
+reads the same from both.
+"""
+import asyncio
+import weakref
+
+from django.conf import settings
+from django.core.cache import cache
+from redis import asyncio as aioredis
+
+_clients = weakref.WeakKeyDictionary()
+
+
+def get_async_redis() -> aioredis.Redis:
+    """Async client of the default cache, one per event loop."""
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None:
+        client = aioredis.Redis.from_url(settings.CACHES['default']['LOCATION'])
+        _clients[loop] = client
+    return client
+
+def make_key(key:str) -> str:
+    return str(cache.make_key(key))
+
+async def aget(key:str, default=None):
+    value = await get_async_redis().get(make_key(key))
+    if value is None:
+        return default
+    return cache.client.decode(value)
+
+async def aset(key:str, value, *, timeout:int|None) -> None:
+    await get_async_redis().set(make_key(key), cache.client.encode(value), ex=timeout)
+
+async def aadd(key:str, value, *, timeout:int|None) -> bool:
+    """Set `key` only when it is missing, like `cache.add()`."""
+    return bool(await get_async_redis().set(
+        make_key(key), cache.client.encode(value), ex=timeout, nx=True
+    ))
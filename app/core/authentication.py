@@ -0,0 +1,126 @@
+"""
+JWT authentication trusting the claims of the token.
+
+The tokens carry what the permission checks and the views read off the
+user on every request (`is_active`, `is_admin` and the id and uuid of the
+profile), so authenticating builds `request.user` and `request.user.profile`
+from the claims instead of selecting them. Both are model instances with
+the other fields deferred, so touching one of those still loads it.
+
+Claims are refreshed along with the access token, which bounds how long a
+changed `is_admin` goes unnoticed to `ACCESS_TOKEN_LIFETIME`. A deactivated
+user can't wait that long, so deactivating one, or changing its flags in
+the admin, records it in Redis and the tokens issued before, refresh
+tokens included, are refused from then on.
+
+    revoked_user_<id> >> time of the revocation, kept as long as a refresh
+                         token issued before it may live
+"""
+import time
+
+from django.core.cache import cache
+from django.db import router
+from django.utils.translation import gettext_lazy as _
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.serializers import (
+    TokenObtainPairSerializer,
+    TokenRefreshSerializer
+)
+from rest_framework_simplejwt.settings import api_settings
+
+from users.models import (
+    BaseUser,
+    Profile
+)
+
+CLAIMS = ('is_active', 'is_admin', 'profile_id', 'profile_uuid')
+
+
+def add_claims(token, user:BaseUser) -> None:
+    profile = getattr(user, 'profile', None)
+    token['is_active'] = user.is_active
+    token['is_admin'] = user.is_admin
+    token['profile_id'] = profile.id if profile else None
+    token['profile_uuid'] = profile.uuid if profile else None
+
+
+def _from_values(model, db:str, **values):
+    """A `model` instance loaded with `values`, every other field deferred."""
+    # `from_db` takes the values in the order of the model fields.
+    names = [
+        field.attname for field in model._meta.concrete_fields
+        if field.attname in values
+    ]
+    return model.from_db(db, names, [values[name] for name in names])
+
+
+def user_from_claims(token) -> BaseUser:
+    """
+    The user of `token` and its profile, holding only what the claims
+    say; any other field is loaded from the database when touched.
+    """
+    db = router.db_for_read(BaseUser)
+    user = _from_values(
+        BaseUser, db, id=token[api_settings.USER_ID_CLAIM],
+        is_active=token['is_active'], is_admin=token['is_admin']
+    )
+    if token['profile_id'] is not None:
+        profile = _from_values(
+            Profile, db, id=token['profile_id'], uuid=token['profile_uuid'], user_id=user.id
+        )
+        BaseUser.profile.related.set_cached_value(user, profile)
+        Profile.user.field.set_cached_value(profile, user)
+    return user
+
+
+def revoke_user_tokens(*, user_id:int) -> None:
+    """Refuse every token issued to the user until now."""
+    cache.set(
+        f'revoked_user_{user_id}', int(time.time()),
+        timeout=int(api_settings.REFRESH_TOKEN_LIFETIME.total_seconds())
+    )
+
+
+def is_revoked(token) -> bool:
+    revoked_at = cache.get(f"revoked_user_{token[api_settings.USER_ID_CLAIM]}")
+    return revoked_at is not None and token['iat'] <= revoked_at
+
+
+class ClaimsTokenObtainPairSerializer(TokenObtainPairSerializer):
+
+    @classmethod
+    def get_token(cls, user):
+        token = super().get_token(user)
+        add_claims(token, user)
+        return token
+
+
+class ClaimsTokenRefreshSerializer(TokenRefreshSerializer):
+    """Issues the access token with the claims of the user as they are now."""
+
+    def validate(self, attrs):
+        refresh = self.token_class(attrs['refresh'])
+        if is_revoked(refresh):
+            raise AuthenticationFailed(_('Token is revoked'), code='token_revoked')
+        user = BaseUser.objects.select_related('profile').filter(
+            id=refresh[api_settings.USER_ID_CLAIM], is_active=True
+        ).first()
+        if user is None:
+            raise AuthenticationFailed(_('User is inactive'), code='user_inactive')
+
+        access = refresh.access_token
+        add_claims(access, user)
+        return {'access': str(access)}
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+
+    def get_user(self, validated_token):
+        if any(claim not in validated_token for claim in CLAIMS):
+            # Issued before the claims were, so look the user up.
+            return super().get_user(validated_token)
+
+        if not validated_token['is_active'] or is_revoked(validated_token):
+            raise AuthenticationFailed(_('User is inactive'), code='user_inactive')
+        return user_from_claims(validated_token)
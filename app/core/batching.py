@@ -0,0 +1,134 @@
+"""
+Request-scoped batching of the rows serializers read by id.
+
+A `BatchedField` renders the row whose id it is given, but doesn't load
+it on its own. The paginated responses first run `prefetch`, which
+collects the ids every `BatchedField` of the page will read and loads
+them with one `in_bulk` per model (and per level of nesting) into the
+`Loader` of the request. Serialization then reads them from there, and
+rows loaded once are reused by anything else serialized in the request
+that doesn't need more of their fields; a row loaded with only some of
+its fields is loaded again, whole, for those that do.
+"""
+from collections import defaultdict
+
+from rest_framework import serializers
+from rest_framework.fields import SkipField
+
+
+class Loader:
+
+    def __init__(self) -> None:
+        self.rows = defaultdict(dict)
+        # Model >> {pk: the fields its row was loaded with, None for all}.
+        self.loaded = defaultdict(dict)
+        self.pending = defaultdict(set)
+        self.fields = defaultdict(set)
+
+    def has(self, model, pk, *, fields:tuple[str, ...]=()) -> bool:
+        """Whether the row of `pk` is loaded with every field of `fields`."""
+        if pk not in self.rows[model]:
+            return False
+        loaded = self.loaded[model][pk]
+        return loaded is None or (bool(fields) and loaded.issuperset(fields))
+
+    def want(self, model, pk, *, fields:tuple[str, ...]=()) -> None:
+        """
+        Queue `pk` for the next `resolve`. `fields` narrows the SELECT,
+        unless some other id of the model wants every field.
+        """
+        if pk is not None and not self.has(model, pk, fields=fields):
+            self.pending[model].add(pk)
+            if fields and self.fields[model] is not None:
+                self.fields[model].update(fields)
+            elif not fields:
+                self.fields[model] = None
+
+    def resolve(self) -> None:
+        for model, pks in self.pending.items():
+            fields = self.fields[model]
+            queryset = model._default_manager.all()
+            if fields:
+                queryset = queryset.only(*fields)
+            rows = queryset.in_bulk(pks)
+            # Remembering the missing ones too, so they aren't asked again.
+            self.rows[model].update({pk: rows.get(pk) for pk in pks})
+            self.loaded[model].update({
+                pk: frozenset(fields) if fields and pk in rows else None for pk in pks
+            })
+        self.pending.clear()
+        self.fields.clear()
+
+    def get(self, model, pk, *, fields:tuple[str, ...]=()):
+        if not self.has(model, pk, fields=fields):
+            # Not prefetched, e.g. serialized outside a paginated response.
+            self.want(model, pk, fields=fields)
+            self.resolve()
+        return self.rows[model][pk]
+
+
+def get_loader(request) -> Loader:
+    request = getattr(request, '_request', request)
+    if not hasattr(request, 'batch_loader'):
+        request.batch_loader = Loader()
+    return request.batch_loader
+
+
+class BatchedField(serializers.Field):
+    """
+    Read-only field rendering the `model` row whose id is at `source`,
+    either as one of its attributes or through `serializer`.
+    """
+
+    def __init__(self, *, model, attribute:str|None=None, serializer=None, **kwargs) -> None:
+        kwargs['read_only'] = True
+        super().__init__(**kwargs)
+        self.model = model
+        self.attribute = attribute
+        self.serializer_class = serializer
+
+    @property
+    def loaded_fields(self) -> tuple[str, ...]:
+        return (self.attribute,) if self.attribute else ()
+
+    def get_pk(self, instance):
+        try:
+            return self.get_attribute(instance)
+        except SkipField:
+            return None
+
+    def to_representation(self, pk):
+        row = get_loader(self.context['request']).get(self.model, pk, fields=self.loaded_fields)
+        if row is None:
+            return None
+        if self.attribute:
+            return getattr(row, self.attribute)
+        return self.serializer_class(row, context=self.context).data
+
+
+def _batched_fields(serializer) -> list[BatchedField]:
+    if isinstance(serializer, serializers.ListSerializer):
+        serializer = serializer.child
+    return [field for field in serializer.fields.values() if isinstance(field, BatchedField)]
+
+def has_batched_fields(serializer) -> bool:
+    return bool(_batched_fields(serializer))
+
+def prefetch(serializer, instances, *, loader:Loader) -> None:
+    """Load every row the `BatchedField`s of `serializer` will read for `instances`."""
+    fields = _batched_fields(serializer)
+    if not fields:
+        return
+    for field in fields:
+        for instance in instances:
+            loader.want(field.model, field.get_pk(instance), fields=field.loaded_fields)
+    loader.resolve()
+
+    for field in fields:
+        if field.serializer_class is None:
+            continue
+        rows = [loader.rows[field.model].get(field.get_pk(instance)) for instance in instances]
+        prefetch(
+            field.serializer_class(context=serializer.context),
+            [row for row in rows if row is not None], loader=loader
+        )
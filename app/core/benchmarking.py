@@ -0,0 +1,118 @@
+"""
+Microbenchmarks of the selectors, services and serializers.
+
+`BenchmarkTestMixin.assertWithinBaseline` times a callable over a few
+rounds, counts the queries of one round and compares both with the
+baseline stored under the same name and dataset size:
+
+    BENCHMARK_BASELINES >> {"<name>[<dataset size>]": {"min_ms": .., "queries": ..}}
+
+A benchmark fails when it runs more queries than its baseline, or when
+its fastest round goes over the baseline by more than
+`BENCHMARK_TIME_THRESHOLD` of it plus `BENCHMARK_TIME_FLOOR_MS`. The
+fastest round is the one least disturbed by whatever else the machine
+was doing; the query count is exact and catches most regressions, the
+time catches the rest once they are large. Benchmarks without a
+baseline only report their measurement.
+
+The benchmarks are in core/tests/*/benchmarks.py, outside the pattern of
+the functional tests. Run them, or record new baselines after a change
+made a path slower on purpose or on another machine, with:
+
+    python manage.py test -p 'benchmarks.py'
+    BENCHMARK_SAVE=1 python manage.py test -p 'benchmarks.py'
+"""
+import json
+import logging
+import os
+import time
+from dataclasses import dataclass
+
+from django.conf import settings
+
+from core.query_inspection import QueryRecorder
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Measurement:
+    min_ms: float
+    queries: int
+
+
+def measure(func, *, rounds:int) -> Measurement:
+    """
+    The best wall time of `func` over `rounds` calls and the queries of
+    one call, all after a first call warming up the caches.
+    """
+    func()
+    with QueryRecorder() as report:
+        func()
+    timings = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return Measurement(min_ms=round(min(timings), 3), queries=report.count)
+
+
+def load_baselines() -> dict:
+    try:
+        with open(settings.BENCHMARK_BASELINES) as file:
+            return json.load(file)
+    except FileNotFoundError:
+        return {}
+
+
+def save_baselines(measurements:dict[str, Measurement]) -> None:
+    """Store `measurements` as baselines, keeping the others."""
+    baselines = load_baselines()
+    baselines.update({
+        key: {'min_ms': measurement.min_ms, 'queries': measurement.queries}
+        for key, measurement in measurements.items()
+    })
+    with open(settings.BENCHMARK_BASELINES, 'w') as file:
+        json.dump(baselines, file, indent=2, sort_keys=True)
+        file.write('\n')
+
+
+class BenchmarkTestMixin:
+    """For TestCases seeding a dataset of `dataset_size` in `setUpTestData`."""
+    dataset_size: int
+    rounds = 20
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        cls.measurements = {}
+        cls.baselines = load_baselines()
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        if os.environ.get('BENCHMARK_SAVE') == '1':
+            save_baselines(cls.measurements)
+        super().tearDownClass()
+
+    def assertWithinBaseline(self, name:str, func, *, rounds:int|None=None) -> Measurement:
+        key = f'{name}[{self.dataset_size}]'
+        measurement = measure(func, rounds=rounds or self.rounds)
+        self.measurements[key] = measurement
+        logger.info('%s: %.3fms, %d queries', key, measurement.min_ms, measurement.queries)
+
+        baseline = self.baselines.get(key)
+        if baseline is None or os.environ.get('BENCHMARK_SAVE') == '1':
+            return measurement
+        self.assertLessEqual(
+            measurement.queries, baseline['queries'],
+            f"{key} ran {measurement.queries} queries, {baseline['queries']} in its baseline."
+        )
+        limit = (
+            baseline['min_ms'] * (1 + settings.BENCHMARK_TIME_THRESHOLD)
+            + settings.BENCHMARK_TIME_FLOOR_MS
+        )
+        self.assertLessEqual(
+            measurement.min_ms, limit,
+            f"{key} took {measurement.min_ms}ms, {baseline['min_ms']}ms in its baseline."
+        )
+        return measurement
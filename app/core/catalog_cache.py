@@ -0,0 +1,139 @@
+"""
+Two-tier cache for the published skill catalog.
+
+Entries are keyed by a catalog version number kept in Redis. Every write
+to categories or skills bumps the version, so each worker only needs one
+GET of the version per request to know whether its in-process copy is
+still valid; no pub/sub is involved.
+
+    process LRU >> Redis >> loader (database)
+
+Besides the loaded values, the rendered JSON bodies of the catalog
+endpoints are cached the same way together with their ETag. The `a*`
+variants serve the async views; they only leave the event loop to run a
+loader on a miss.
+"""
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.db import transaction
+
+from core import async_cache
+
+CATALOG_VERSION_KEY = 'catalog_version'
+CATALOG_TIMEOUT = 60 * 60 * 24
+
+_loaders = {}
+
+
+class _LocalLRU:
+    """Small thread-safe LRU for the per-process tier."""
+
+    def __init__(self, *, maxsize:int) -> None:
+        self.maxsize = maxsize
+        self.data = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            if key not in self.data:
+                return None
+            self.data.move_to_end(key)
+            return self.data[key]
+
+    def set(self, key, value) -> None:
+        with self.lock:
+            self.data[key] = value
+            self.data.move_to_end(key)
+            if len(self.data) > self.maxsize:
+                self.data.popitem(last=False)
+
+_local = _LocalLRU(maxsize=128)
+
+
+def catalog_version() -> int:
+    # Seeding from the clock rather than 1, so a flushed Redis can't
+    # bring back a version some worker still has in memory.
+    return cache.get_or_set(CATALOG_VERSION_KEY, time.time_ns(), timeout=None)
+
+async def acatalog_version() -> int:
+    version = await async_cache.aget(CATALOG_VERSION_KEY)
+    if version is None:
+        await async_cache.aadd(CATALOG_VERSION_KEY, time.time_ns(), timeout=None)
+        version = await async_cache.aget(CATALOG_VERSION_KEY)
+    return version
+
+def _incr_catalog_version() -> None:
+    catalog_version()
+    cache.incr(CATALOG_VERSION_KEY)
+
+def bump_catalog_version() -> None:
+    """
+    Invalidate every cached catalog entry. Bumping again on commit drops
+    whatever another worker loaded while the transaction was still open.
+    """
+    _incr_catalog_version()
+    transaction.on_commit(_incr_catalog_version)
+
+def register_catalog(name:str):
+    """Decorator registering the loader of the catalog entry `name`."""
+    def decorator(loader):
+        _loaders[name] = loader
+        return loader
+    return decorator
+
+def _two_tier_get(key:str, load):
+    value = _local.get(key)
+    if value is None:
+        value = cache.get(key)
+        if value is None:
+            value = load()
+            cache.set(key, value, timeout=CATALOG_TIMEOUT)
+        _local.set(key, value)
+    return value
+
+async def _atwo_tier_get(key:str, load):
+    value = _local.get(key)
+    if value is None:
+        value = await async_cache.aget(key)
+        if value is None:
+            value = await sync_to_async(load)()
+            await async_cache.aset(key, value, timeout=CATALOG_TIMEOUT)
+        _local.set(key, value)
+    return value
+
+def get_catalog(name:str):
+    """Return the current value of a registered catalog entry."""
+    return _two_tier_get(
+        f'catalog_{name}_{catalog_version()}', _loaders[name]
+    )
+
+def get_rendered_catalog(name:str, *, request, render) -> tuple[bytes, str]:
+    """
+    Return the rendered body of a catalog entry and its strong ETag.
+    `render` turns the entry into bytes; the body holds absolute URLs,
+    so it is cached per host as well as per version.
+    """
+    version = catalog_version()
+    host = request.build_absolute_uri('/')
+
+    def load() -> tuple[bytes, str]:
+        body = render(_two_tier_get(f'catalog_{name}_{version}', _loaders[name]))
+        return body, f'"{hashlib.sha256(body).hexdigest()}"'
+
+    return _two_tier_get(f'catalog_rendered_{name}_{version}_{host}', load)
+
+async def aget_rendered_catalog(name:str, *, request, render) -> tuple[bytes, str]:
+    """Async `get_rendered_catalog`."""
+    version = await acatalog_version()
+    host = request.build_absolute_uri('/')
+
+    def load() -> tuple[bytes, str]:
+        body = render(_two_tier_get(f'catalog_{name}_{version}', _loaders[name]))
+        return body, f'"{hashlib.sha256(body).hexdigest()}"'
+
+    return await _atwo_tier_get(f'catalog_rendered_{name}_{version}_{host}', load)
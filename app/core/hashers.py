@@ -0,0 +1,49 @@
+"""
+Password hashers tuned from settings and the pool hashing runs on.
+
+Argon2id and scrypt release the GIL while hashing, so handing the work to
+a small pool lets the request thread validate the user against the
+database in the meantime, and bounds how many hashes, each holding
+megabytes of memory, run at once.
+"""
+import threading
+from concurrent.futures import (
+    Future,
+    ThreadPoolExecutor
+)
+
+from django.conf import settings
+from django.contrib.auth import hashers
+from django.contrib.auth.hashers import make_password
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+class Argon2PasswordHasher(hashers.Argon2PasswordHasher):
+    """Argon2id with the costs in `PASSWORD_ARGON2_PARAMS`."""
+
+    def __init__(self) -> None:
+        for name, value in settings.PASSWORD_ARGON2_PARAMS.items():
+            setattr(self, name, value)
+
+
+class ScryptPasswordHasher(hashers.ScryptPasswordHasher):
+    """Scrypt with the costs in `PASSWORD_SCRYPT_PARAMS`."""
+
+    def __init__(self) -> None:
+        for name, value in settings.PASSWORD_SCRYPT_PARAMS.items():
+            setattr(self, name, value)
+
+
+def submit_password_hash(password:str) -> Future:
+    """Hash `password` with the preferred hasher on the bounded pool."""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=settings.PASSWORD_HASH_WORKERS,
+                    thread_name_prefix='password-hash'
+                )
+    return _executor.submit(make_password, password)
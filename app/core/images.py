@@ -0,0 +1,69 @@
+"""
+Profile image pipeline.
+
+Uploads stream to a temporary file chunk by chunk and are refused as soon
+as they pass `MAX_PROFILE_IMAG_SIZE_MB`, rather than once fully read.
+Their dimensions are checked from the image header, without decoding it
+(see `profile_image_dimensions_validator`), and the WebP thumbnails of
+`PROFILE_THUMBNAIL_SIZES` are rendered by a job, off the request path.
+
+    uploads/profile/<name>.<ext>                 >> the image as uploaded
+    uploads/profile/thumbnails/<name>_<size>.webp >> its thumbnails
+"""
+import io
+import os
+
+from django.conf import settings
+from django.core.files.uploadhandler import TemporaryFileUploadHandler
+from PIL import (
+    Image,
+    ImageOps
+)
+from rest_framework import serializers
+
+
+class ImageUploadHandler(TemporaryFileUploadHandler):
+    """Streams the upload to disk, giving up once it is too large."""
+
+    def new_file(self, *args, **kwargs) -> None:
+        super().new_file(*args, **kwargs)
+        self.max_size = settings.MAX_PROFILE_IMAG_SIZE_MB * 1024 * 1024
+        self.received = 0
+
+    def receive_data_chunk(self, raw_data, start):
+        self.received += len(raw_data)
+        if self.received > self.max_size:
+            self.file.close()
+            raise serializers.ValidationError({
+                self.field_name: [
+                    f'Max file size is {settings.MAX_PROFILE_IMAG_SIZE_MB}MB'
+                ]
+            })
+        return super().receive_data_chunk(raw_data, start)
+
+
+def thumbnail_path(image_name:str, size:int) -> str:
+    directory, file_name = os.path.split(image_name)
+    stem = os.path.splitext(file_name)[0]
+    return os.path.join(directory, 'thumbnails', f'{stem}_{size}.webp')
+
+
+def render_thumbnails(image_file, *, sizes:tuple[int, ...]) -> dict[int, bytes]:
+    """WebP thumbnails of `image_file` fitting each of `sizes`, keeping its ratio."""
+    largest = max(sizes)
+    with Image.open(image_file) as image:
+        # JPEGs are decoded straight at a fraction of their size.
+        image.draft('RGB', (largest, largest))
+        image = ImageOps.exif_transpose(image)
+        if image.mode not in ('RGB', 'RGBA'):
+            has_alpha = 'A' in image.getbands() or 'transparency' in image.info
+            image = image.convert('RGBA' if has_alpha else 'RGB')
+
+        thumbnails = {}
+        # Each size is scaled down from the previous one, not from the original.
+        for size in sorted(sizes, reverse=True):
+            image.thumbnail((size, size), Image.Resampling.LANCZOS)
+            buffer = io.BytesIO()
+            image.save(buffer, 'WEBP', quality=settings.PROFILE_THUMBNAIL_QUALITY, method=4)
+            thumbnails[size] = buffer.getvalue()
+    return thumbnails
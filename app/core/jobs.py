@@ -0,0 +1,267 @@
+"""
+Lightweight background job queue.
+
+A job is a plain function decorated with `@job`; `func.delay(**kwargs)`
+enqueues it once the current transaction commits and `manage.py run_jobs`
+runs it. Payloads are JSON, so keyword arguments must be JSON friendly,
+and name the job they run, which must be one registered by `@job`.
+
+    jobs_queue               >> list of payloads ready to run (LPUSH / BLMOVE)
+    jobs_processing_{worker} >> list of the payloads a worker is running
+    jobs_delayed             >> zset of payloads waiting for a retry, scored by run-at
+    jobs_failed              >> list of payloads that ran out of retries,
+                                expiring `JOBS_FAILED_TIMEOUT` after the last
+
+A worker moves the payload it runs to its processing list and drops it
+from there once the job is done, so the jobs of a worker that died are
+queued again when a worker of the same name starts. A failing job is
+retried `max_retries` times, `backoff * 2 ** attempt` seconds apart; the
+`sensitive` kwargs of a job that ran out of them are masked before it is
+kept. `JOBS_BACKEND` picks the Redis queue or the in-memory one used by
+the tests.
+"""
+import json
+import logging
+import time
+import uuid
+from collections import deque
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils.module_loading import (
+    import_module,
+    import_string
+)
+from django_redis import get_redis_connection
+
+logger = logging.getLogger(__name__)
+
+MASK = '***'
+
+# Job path >> function, filled by `@job`.
+_jobs = {}
+
+# Moving due retries back to the queue atomically, so two workers can't
+# both promote the same payload.
+PROMOTE_DUE = """
+local due = redis.call('zrangebyscore', KEYS[1], '-inf', ARGV[1], 'LIMIT', 0, ARGV[2])
+for _, payload in ipairs(due) do
+    redis.call('zrem', KEYS[1], payload)
+    redis.call('lpush', KEYS[2], payload)
+end
+return #due
+"""
+
+
+class RedisQueue:
+
+    def __init__(self) -> None:
+        self.client = get_redis_connection('default')
+        self.queue_key = cache.make_key('jobs_queue')
+        self.delayed_key = cache.make_key('jobs_delayed')
+        self.failed_key = cache.make_key('jobs_failed')
+        self.promote_due = self.client.register_script(PROMOTE_DUE)
+        self.promoted_at = 0
+
+    def push(self, *payloads:str) -> None:
+        self.client.lpush(self.queue_key, *payloads)
+
+    def schedule(self, payload:str, *, run_at:float) -> None:
+        self.client.zadd(self.delayed_key, {payload: run_at})
+
+    def fail(self, payload:str) -> None:
+        pipe = self.client.pipeline()
+        pipe.lpush(self.failed_key, payload)
+        pipe.expire(self.failed_key, settings.JOBS_FAILED_TIMEOUT)
+        pipe.execute()
+
+    def _processing_key(self, worker:str) -> str:
+        return cache.make_key(f'jobs_processing_{worker}')
+
+    def pop(self, *, timeout:int, worker:str) -> str|None:
+        # Retries are due at a second granularity at best, so checking
+        # them on every pop would only double the round trips.
+        now = time.time()
+        if now - self.promoted_at >= 1:
+            self.promote_due(keys=[self.delayed_key, self.queue_key], args=[now, 100])
+            self.promoted_at = now
+        payload = self.client.blmove(
+            self.queue_key, self._processing_key(worker), timeout, 'RIGHT', 'LEFT'
+        )
+        return payload.decode() if payload else None
+
+    def ack(self, payload:str, *, worker:str) -> None:
+        self.client.lrem(self._processing_key(worker), 1, payload)
+
+    def recover(self, *, worker:str) -> int:
+        """Queue again the payloads `worker` was running when it died."""
+        recovered = 0
+        while self.client.lmove(
+            self._processing_key(worker), self.queue_key, 'RIGHT', 'RIGHT'
+        ):
+            recovered += 1
+        return recovered
+
+    def __len__(self) -> int:
+        return self.client.llen(self.queue_key)
+
+
+class LocalQueue:
+    """In-process queue for tests; `pop` never blocks."""
+
+    def __init__(self) -> None:
+        self.queue = deque()
+        self.processing = {}
+        self.delayed = []
+        self.failed = []
+
+    def push(self, *payloads:str) -> None:
+        self.queue.extendleft(payloads)
+
+    def schedule(self, payload:str, *, run_at:float) -> None:
+        self.delayed.append((run_at, payload))
+
+    def fail(self, payload:str) -> None:
+        self.failed.append(payload)
+
+    def pop(self, *, timeout:int, worker:str) -> str|None:
+        now = time.time()
+        for run_at, payload in [entry for entry in self.delayed if entry[0] <= now]:
+            self.delayed.remove((run_at, payload))
+            self.queue.appendleft(payload)
+        if not self.queue:
+            return None
+        payload = self.queue.pop()
+        self.processing.setdefault(worker, []).append(payload)
+        return payload
+
+    def ack(self, payload:str, *, worker:str) -> None:
+        self.processing[worker].remove(payload)
+
+    def recover(self, *, worker:str) -> int:
+        payloads = self.processing.pop(worker, [])
+        self.queue.extend(payloads)
+        return len(payloads)
+
+    def __len__(self) -> int:
+        return len(self.queue)
+
+
+@lru_cache(maxsize=None)
+def get_queue():
+    return import_string(settings.JOBS_BACKEND)()
+
+def _resolve(path:str):
+    """The job at `path`; only functions registered by `@job` are run."""
+    if path not in _jobs:
+        # Registered once the worker imported the module defining it.
+        import_module(path.rsplit('.', 1)[0])
+    try:
+        return _jobs[path]
+    except KeyError:
+        raise LookupError(f'{path} is not a registered job.')
+
+def _mask(payload:str, *, sensitive:tuple[str, ...]) -> str:
+    message = json.loads(payload)
+    for name in sensitive:
+        if name in message['kwargs']:
+            message['kwargs'][name] = MASK
+    return json.dumps(message)
+
+def make_payload(func, kwargs:dict) -> str:
+    return json.dumps({
+        'id': uuid.uuid4().hex,
+        'job': f'{func.__module__}.{func.__qualname__}',
+        'kwargs': kwargs,
+        'attempt': 0,
+    })
+
+def job(func=None, *, max_retries:int=5, backoff:float=2, sensitive:tuple[str, ...]=()):
+    """
+    Decorator turning a function into a job, adding `func.delay(**kwargs)`
+    which enqueues it on commit of the current transaction. The kwargs in
+    `sensitive` are masked in the payloads kept once the job failed.
+    """
+    def decorator(func):
+        def delay(**kwargs) -> None:
+            payload = make_payload(func, kwargs)
+            transaction.on_commit(lambda: get_queue().push(payload))
+
+        func.delay = delay
+        func.max_retries = max_retries
+        func.backoff = backoff
+        func.sensitive = sensitive
+        _jobs[f'{func.__module__}.{func.__qualname__}'] = func
+        return func
+
+    if func is not None:
+        return decorator(func)
+    return decorator
+
+@job
+def noop() -> None:
+    """Empty job, used to measure the queue throughput."""
+
+
+class Worker:
+    """Runs the queued jobs and keeps the counters behind the jobs/sec metric."""
+
+    def __init__(self, queue=None, *, name:str='default') -> None:
+        self.queue = queue if queue is not None else get_queue()
+        self.name = name
+        self.processed = 0
+        self.retried = 0
+        self.failed = 0
+
+    def run_one(self, payload:str) -> None:
+        message = json.loads(payload)
+        try:
+            func = _resolve(message['job'])
+        except (ImportError, LookupError):
+            logger.exception('Refused job %s.', message['job'])
+            self.queue.fail(payload)
+            self.failed += 1
+            return
+        try:
+            func(**message['kwargs'])
+        except Exception:
+            attempt = message['attempt']
+            if attempt >= func.max_retries:
+                logger.exception('Job %s failed for good.', message['job'])
+                self.queue.fail(_mask(payload, sensitive=func.sensitive))
+                self.failed += 1
+                return
+            logger.warning('Job %s failed, retrying.', message['job'], exc_info=True)
+            message['attempt'] = attempt + 1
+            self.queue.schedule(
+                json.dumps(message), run_at=time.time() + func.backoff * 2 ** attempt
+            )
+            self.retried += 1
+            return
+        self.processed += 1
+
+    def run(self, *, burst:bool=False, timeout:int=1, report=None, report_interval:float=60) -> None:
+        """
+        Queue again the jobs this worker's name left running, then keep
+        running jobs, calling `report(worker, seconds)` every
+        `report_interval` seconds. With `burst` it returns once the queue is
+        empty, leaving retries that are not due yet behind.
+        """
+        recovered = self.queue.recover(worker=self.name)
+        if recovered:
+            logger.warning('Queued again %s jobs worker %s left running.', recovered, self.name)
+        last_report = time.perf_counter()
+        while True:
+            payload = self.queue.pop(timeout=timeout, worker=self.name)
+            if payload is not None:
+                self.run_one(payload)
+                self.queue.ack(payload, worker=self.name)
+            elif burst:
+                return
+
+            elapsed = time.perf_counter() - last_report
+            if report is not None and elapsed >= report_interval:
+                report(self, elapsed)
+                last_report = time.perf_counter()
@@ -0,0 +1,161 @@
+"""
+Freelancer leaderboards kept in Redis sorted sets.
+
+    leaderboard                     >> zset of every profile
+    leaderboard_skill_{skill_id}    >> zset of the profiles with the skill
+    leaderboard_category_{cat_id}   >> zset of the profiles with a skill
+                                       of the category
+
+Members are profile ids scored by `Profile.score`. The ids are zero
+padded, so ties come out of ZREVRANGE by descending id, the order of the
+freelancers list. Top N, the rank of a profile and its neighbours are
+then O(log N) reads instead of sorting the profiles table.
+
+The services update the boards on commit of every score or skill change;
+`manage.py rebuild_leaderboard` rebuilds them all from the database, e.g.
+after Redis lost them, and must run while no scores or skills change
+(see `rebuild`).
+"""
+from django.core.cache import cache
+from django.db import transaction
+from django_redis import get_redis_connection
+
+from users.models import (
+    Profile,
+    ProfileSkill
+)
+
+GLOBAL_BOARD = 'leaderboard'
+
+
+def skill_board(skill_id:int) -> str:
+    return f'leaderboard_skill_{skill_id}'
+
+def category_board(category_id:int) -> str:
+    return f'leaderboard_category_{category_id}'
+
+def _member(profile_id:int) -> str:
+    return f'{profile_id:012d}'
+
+def _entries(rows, *, start_rank:int) -> list[tuple[int, int, int]]:
+    return [
+        (rank, int(member), int(score))
+        for rank, (member, score) in enumerate(rows, start=start_rank)
+    ]
+
+
+def top(*, board:str=GLOBAL_BOARD, limit:int, offset:int=0) -> list[tuple[int, int, int]]:
+    """The (rank, profile_id, score) of the `limit` best profiles, from `offset`."""
+    rows = get_redis_connection('default').zrevrange(
+        cache.make_key(board), offset, offset + limit - 1, withscores=True
+    )
+    return _entries(rows, start_rank=offset + 1)
+
+def rank_of(*, profile_id:int, board:str=GLOBAL_BOARD) -> int|None:
+    """1-based rank of the profile, None when it is not on the board."""
+    rank = get_redis_connection('default').zrevrank(
+        cache.make_key(board), _member(profile_id)
+    )
+    return rank + 1 if rank is not None else None
+
+def neighbors(*, profile_id:int, board:str=GLOBAL_BOARD, radius:int) -> list[tuple[int, int, int]]:
+    """The profile and up to `radius` profiles ranked right above and below it."""
+    client = get_redis_connection('default')
+    key = cache.make_key(board)
+    rank = client.zrevrank(key, _member(profile_id))
+    if rank is None:
+        return []
+    start = max(rank - radius, 0)
+    rows = client.zrevrange(key, start, rank + radius, withscores=True)
+    return _entries(rows, start_rank=start + 1)
+
+
+def boards_of(profile_id:int) -> set[str]:
+    """The boards the profile belongs to, by its skills."""
+    boards = {GLOBAL_BOARD}
+    for skill_id, category_id in ProfileSkill.objects.filter(
+        profile_id=profile_id
+    ).values_list('skill_id', 'skill_id__category_id'):
+        boards.add(skill_board(skill_id))
+        boards.add(category_board(category_id))
+    return boards
+
+def add_to_boards(*, profile_id:int, score:int, boards:set[str]) -> None:
+    """Put the profile on `boards` once the current transaction commits."""
+    def add() -> None:
+        pipe = get_redis_connection('default').pipeline()
+        for board in boards:
+            pipe.zadd(cache.make_key(board), {_member(profile_id): score})
+        pipe.execute()
+    transaction.on_commit(add)
+
+def remove_from_boards(*, profile_id:int, boards:set[str]) -> None:
+    def remove() -> None:
+        pipe = get_redis_connection('default').pipeline()
+        for board in boards:
+            pipe.zrem(cache.make_key(board), _member(profile_id))
+        pipe.execute()
+    transaction.on_commit(remove)
+
+def sync_profile(*, profile_id:int, score:int) -> None:
+    """Update the score of the profile on every board it belongs to."""
+    add_to_boards(profile_id=profile_id, score=score, boards=boards_of(profile_id))
+
+
+def rebuild(*, chunk_size:int=2000) -> int:
+    """
+    Rebuild every board from the database, streaming the rows in chunks.
+    The new boards are filled under temporary keys and renamed over the
+    old ones, so readers never see a partial board. Returns the number of
+    profiles ranked.
+
+    Score and skill changes committed while the rows stream update the
+    old boards, which the renames then drop, so run it with those writes
+    stopped, e.g. in a maintenance window, or run it again after them.
+    """
+    client = get_redis_connection('default')
+    staged = {}
+
+    def stage(board:str) -> str:
+        if board not in staged:
+            staged[board] = cache.make_key(f'rebuild_{board}')
+            client.delete(staged[board])
+        return staged[board]
+
+    def write(rows) -> int:
+        pipe = client.pipeline(transaction=False)
+        written = 0
+        for boards, profile_id, score in rows:
+            for board in boards:
+                pipe.zadd(stage(board), {_member(profile_id): score})
+            written += 1
+            if written % chunk_size == 0:
+                pipe.execute()
+        pipe.execute()
+        return written
+
+    ranked = write(
+        ((GLOBAL_BOARD,), profile_id, score)
+        for profile_id, score in Profile.objects.values_list(
+            'id', 'score'
+        ).order_by().iterator(chunk_size=chunk_size)
+    )
+    write(
+        ((skill_board(skill_id), category_board(category_id)), profile_id, score)
+        for profile_id, score, skill_id, category_id in ProfileSkill.objects.values_list(
+            'profile_id', 'profile_id__score', 'skill_id', 'skill_id__category_id'
+        ).order_by().iterator(chunk_size=chunk_size)
+    )
+
+    # Boards left without any profile would otherwise linger.
+    boards = [GLOBAL_BOARD]
+    for pattern in ('leaderboard_skill_*', 'leaderboard_category_*'):
+        boards += cache.iter_keys(pattern)
+    stale = [cache.make_key(board) for board in boards if board not in staged]
+    pipe = client.pipeline()
+    for board, staged_key in staged.items():
+        pipe.rename(staged_key, cache.make_key(board))
+    if stale:
+        pipe.delete(*stale)
+    pipe.execute()
+    return ranked
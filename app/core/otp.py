@@ -0,0 +1,72 @@
+"""
+OTP store keyed by phone number.
+
+Every outstanding OTP is kept under one key expiring with it:
+    otp_phone_{phone_number} >> hash {'otp': code, 'attempts': failures}
+so verification is an O(1) lookup instead of a KEYS scan. A code is
+only ever checked against the phone number it was sent to, which is
+what lets failed attempts be counted and the OTP burned after
+`OTP_MAX_ATTEMPTS` of them.
+"""
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.cache import cache
+from django_redis import get_redis_connection
+
+# Compare, count the failure or claim in one step, so nothing runs
+# between reading the hash and changing it: HINCRBY on a key that has
+# just expired would create a hash with no TTL, and two requests with
+# the right code would both be accepted.
+CONSUME = """
+local stored = redis.call('HGET', KEYS[1], 'otp')
+if not stored then
+    return 0
+end
+if stored == ARGV[1] then
+    redis.call('DEL', KEYS[1])
+    return 1
+end
+if redis.call('HINCRBY', KEYS[1], 'attempts', 1) >= tonumber(ARGV[2]) then
+    redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+def otp_phone_key(phone_number:str) -> str:
+    return cache.make_key(f'otp_phone_{phone_number}')
+
+@lru_cache(maxsize=None)
+def _consume_script():
+    return get_redis_connection('default').register_script(CONSUME)
+
+def queue_store_otp(*, pipe, phone_number:str, otp:int) -> None:
+    """Queue the commands of `store_otp` on an existing pipeline."""
+    phone_key = otp_phone_key(phone_number)
+    pipe.delete(phone_key)
+    pipe.hset(phone_key, mapping={'otp': otp, 'attempts': 0})
+    pipe.expire(phone_key, settings.OTP_TIMEOUT_SECONDS)
+
+def store_otp(*, phone_number:str, otp:int) -> None:
+    """Store a fresh OTP for the phone number, replacing the previous one."""
+    pipe = get_redis_connection('default').pipeline()
+    queue_store_otp(pipe=pipe, phone_number=phone_number, otp=otp)
+    pipe.execute()
+
+def consume_otp(*, otp:int, phone_number:str) -> bool:
+    """
+    Consume the OTP sent to the phone number, returning whether it matched.
+    A code is accepted only once; failed attempts are counted and the OTP
+    is burned after `OTP_MAX_ATTEMPTS` of them.
+    """
+    return bool(_consume_script()(
+        keys=[otp_phone_key(phone_number)],
+        args=[otp, settings.OTP_MAX_ATTEMPTS]
+    ))
+
+def otp_attempts(*, phone_number:str) -> int:
+    attempts = get_redis_connection('default').hget(
+        otp_phone_key(phone_number), 'attempts'
+    )
+    return int(attempts) if attempts is not None else 0
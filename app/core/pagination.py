@@ -1,7 +1,26 @@
+import json
+from base64 import (
+    urlsafe_b64decode,
+    urlsafe_b64encode
+)
 from collections import OrderedDict
 
-from rest_framework.pagination import LimitOffsetPagination as _LimitOffsetPagination
+from asgiref.sync import sync_to_async
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import (
+    BasePagination,
+    LimitOffsetPagination as _LimitOffsetPagination
+)
 from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+from core.batching import (
+    get_loader,
+    has_batched_fields,
+    prefetch
+)
 
 def get_paginated_response(*, pagination_class, serializer_class, queryset, request, view):
     paginator = pagination_class()
@@ -17,18 +36,35 @@ def get_paginated_response(*, pagination_class, serializer_class, queryset, requ
     return Response(data=serializer.data)
 
 def get_paginated_response_context(*, pagination_class, serializer_class, queryset, request, view):
+    """
+    Like `get_paginated_response`, with the request in the serializer
+    context and the rows of its `BatchedField`s loaded in batches.
+    """
     paginator = pagination_class()
 
     page = paginator.paginate_queryset(queryset, request, view=view)
 
     if page is not None:
         serializer = serializer_class(page, many=True, context={'request':request})
+        prefetch(serializer, page, loader=get_loader(request))
         return paginator.get_paginated_response(serializer.data)
 
     serializer = serializer_class(queryset, many=True, context={'request':request})
+    prefetch(serializer, queryset, loader=get_loader(request))
 
     return Response(data=serializer.data)
 
+async def aget_paginated_response_context(*, pagination_class, serializer_class, queryset, request, view):
+    """`get_paginated_response_context` for paginators with `apaginate_queryset`."""
+    paginator = pagination_class()
+
+    page = await paginator.apaginate_queryset(queryset, request, view=view)
+
+    serializer = serializer_class(page, many=True, context={'request':request})
+    if has_batched_fields(serializer):
+        await sync_to_async(prefetch)(serializer, page, loader=get_loader(request))
+    return paginator.get_paginated_response(serializer.data)
+
 class LimitOffsetPagination(_LimitOffsetPagination):
     default_limit = 10
     max_limit = 50
@@ -56,3 +92,151 @@ class LimitOffsetPagination(_LimitOffsetPagination):
             ('previous', self.get_previous_link()),
             ('results', data)
         ]))
+
+
+class KeysetPagination(BasePagination):
+    """
+    Cursor pagination over a unique tuple of fields, e.g. ('-score', '-id').
+    Every page is a range scan starting at the cursor on the matching index,
+    so deep pages cost the same as the first one. The COUNT(*) can be
+    skipped by setting `include_count` to False.
+    """
+    ordering = ('-id', )
+    default_limit = 10
+    max_limit = 50
+    include_count = True
+    limit_query_param = 'limit'
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = 'Invalid cursor.'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.limit = self.get_limit(request)
+        self.count = queryset.count() if self.include_count else None
+
+        position, reverse = self.decode_cursor(request, model=queryset.model)
+        page = list(self.get_page_queryset(queryset, position=position, reverse=reverse))
+        return self.set_page(page, position=position, reverse=reverse)
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """`paginate_queryset` running the queries with the async ORM."""
+        self.request = request
+        self.limit = self.get_limit(request)
+        self.count = await queryset.acount() if self.include_count else None
+
+        position, reverse = self.decode_cursor(request, model=queryset.model)
+        page = [
+            instance async for instance
+            in self.get_page_queryset(queryset, position=position, reverse=reverse)
+        ]
+        return self.set_page(page, position=position, reverse=reverse)
+
+    def get_page_queryset(self, queryset, *, position, reverse):
+        ordering = self.get_ordering(reverse=reverse)
+        queryset = queryset.order_by(*ordering)
+        if position is not None:
+            queryset = queryset.filter(self.get_range_filter(ordering, position))
+        # One extra row tells whether there is a next page.
+        return queryset[:self.limit + 1]
+
+    def set_page(self, page, *, position, reverse):
+        has_more = len(page) > self.limit
+        page = page[:self.limit]
+        if reverse:
+            page.reverse()
+
+        self.has_next = has_more or (reverse and position is not None)
+        self.has_previous = position is not None and (not reverse or has_more)
+        self.page = page
+        return page
+
+    def get_limit(self, request):
+        try:
+            limit = int(request.query_params[self.limit_query_param])
+        except (KeyError, ValueError):
+            return self.default_limit
+        return min(max(limit, 1), self.max_limit)
+
+    def get_ordering(self, *, reverse):
+        if not reverse:
+            return self.ordering
+        return tuple(
+            field[1:] if field.startswith('-') else f'-{field}'
+            for field in self.ordering
+        )
+
+    def get_range_filter(self, ordering, position):
+        """
+        Lexicographic `(f1, f2, ...) after (v1, v2, ...)` as Q objects. The
+        leading `f1 <= v1` bound is redundant but lets Postgres turn it into
+        an index range instead of evaluating the OR chain on every row.
+        """
+        range_filter = Q()
+        for index, field in enumerate(ordering):
+            name = field.lstrip('-')
+            lookup = 'lt' if field.startswith('-') else 'gt'
+            condition = Q(**{f'{name}__{lookup}': position[index]})
+            for previous, value in zip(ordering[:index], position):
+                condition &= Q(**{previous.lstrip('-'): value})
+            range_filter |= condition
+
+        name = ordering[0].lstrip('-')
+        lookup = 'lte' if ordering[0].startswith('-') else 'gte'
+        return Q(**{f'{name}__{lookup}': position[0]}) & range_filter
+
+    def get_position(self, instance):
+        return [getattr(instance, field.lstrip('-')) for field in self.ordering]
+
+    def encode_cursor(self, *, position, reverse):
+        payload = json.dumps({'p': position, 'r': reverse}, default=str)
+        cursor = urlsafe_b64encode(payload.encode()).decode()
+        url = self.request.build_absolute_uri()
+        url = replace_query_param(url, self.limit_query_param, self.limit)
+        return replace_query_param(url, self.cursor_query_param, cursor)
+
+    def decode_cursor(self, request, *, model):
+        cursor = request.query_params.get(self.cursor_query_param)
+        if not cursor:
+            return None, False
+        try:
+            payload = json.loads(urlsafe_b64decode(cursor.encode()))
+            position, reverse = payload['p'], bool(payload['r'])
+        except (TypeError, ValueError, KeyError):
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(position, list) or len(position) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+        # The cursor comes from the client, so its values are only trusted
+        # once they convert to the types of the ordering fields.
+        try:
+            position = [
+                model._meta.get_field(field.lstrip('-')).to_python(value)
+                for field, value in zip(self.ordering, position)
+            ]
+        except (TypeError, ValueError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+        if None in position:
+            raise NotFound(self.invalid_cursor_message)
+        return position, reverse
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(
+            position=self.get_position(self.page[-1]), reverse=False
+        )
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self.encode_cursor(
+            position=self.get_position(self.page[0]), reverse=True
+        )
+
+    def get_paginated_response(self, data):
+        response = OrderedDict([('limit', self.limit)])
+        if self.include_count:
+            response['count'] = self.count
+        response['next'] = self.get_next_link()
+        response['previous'] = self.get_previous_link()
+        response['results'] = data
+        return Response(response)
@@ -0,0 +1,113 @@
+"""
+Read-through cache of the profile detail.
+
+Entries hold the serialized profile, a small dict, rather than the
+pickled model, and are keyed by uuid. Every write to a profile, its
+counters or its skills calls `invalidate_profiles`, which deletes the
+entries right away and again on commit, so a read racing the transaction
+can't leave the old row cached. Bulk writes bump the cache version in
+the keys instead, the way `catalog_cache` does, which drops every entry
+without scanning the keyspace for them.
+
+    profile_cache_version           >> generation of the entries
+    profile_detail_<version>_<uuid> >> serialized profile
+    profile_cache_hits              >> reads served from the cache
+    profile_cache_misses            >> reads that went to the database
+
+`views` is cached too; the counts pending in Redis are added on every read
+and flushing them invalidates the entries they went into.
+"""
+import time
+
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.db import transaction
+from django_redis import get_redis_connection
+
+from core import async_cache
+from users.models import Profile
+
+PROFILE_CACHE_TIMEOUT = 60 * 60
+PROFILE_VERSION_KEY = 'profile_cache_version'
+
+
+def profile_cache_version() -> int:
+    # Seeded from the clock, see `catalog_cache.catalog_version`.
+    return cache.get_or_set(PROFILE_VERSION_KEY, time.time_ns(), timeout=None)
+
+async def aprofile_cache_version() -> int:
+    version = await async_cache.aget(PROFILE_VERSION_KEY)
+    if version is None:
+        await async_cache.aadd(PROFILE_VERSION_KEY, time.time_ns(), timeout=None)
+        version = await async_cache.aget(PROFILE_VERSION_KEY)
+    return version
+
+def _key(uuid:str, version:int) -> str:
+    return f'profile_detail_{version}_{uuid}'
+
+def _load(uuid:str, serialize) -> dict:
+    return dict(serialize(Profile.objects.defer('search_vector').get(uuid=uuid)))
+
+def _count(outcome:str) -> None:
+    get_redis_connection('default').incr(cache.make_key(f'profile_cache_{outcome}'))
+
+def get_profile_detail(*, uuid:str, serialize) -> dict:
+    """
+    The cached detail of the profile, loaded and turned into a dict by
+    `serialize` on a miss. Raises `Profile.DoesNotExist`.
+    """
+    key = _key(uuid, profile_cache_version())
+    data = cache.get(key)
+    if data is not None:
+        _count('hits')
+        return data
+    _count('misses')
+    data = _load(uuid, serialize)
+    cache.set(key, data, timeout=PROFILE_CACHE_TIMEOUT)
+    return data
+
+async def aget_profile_detail(*, uuid:str, serialize) -> dict:
+    """Async `get_profile_detail`."""
+    client = async_cache.get_async_redis()
+    key = _key(uuid, await aprofile_cache_version())
+    data = await async_cache.aget(key)
+    if data is not None:
+        await client.incr(async_cache.make_key('profile_cache_hits'))
+        return data
+    await client.incr(async_cache.make_key('profile_cache_misses'))
+    data = await sync_to_async(_load)(uuid, serialize)
+    await async_cache.aset(key, data, timeout=PROFILE_CACHE_TIMEOUT)
+    return data
+
+def _delete(uuids:tuple) -> None:
+    version = profile_cache_version()
+    cache.delete_many([_key(uuid, version) for uuid in uuids])
+
+def invalidate_profiles(*uuids:str) -> None:
+    _delete(uuids)
+    transaction.on_commit(lambda: _delete(uuids))
+
+def _incr_profile_cache_version() -> None:
+    profile_cache_version()
+    cache.incr(PROFILE_VERSION_KEY)
+
+def invalidate_all_profiles() -> None:
+    """For bulk writes touching profiles by the thousand."""
+    _incr_profile_cache_version()
+    transaction.on_commit(_incr_profile_cache_version)
+
+def profile_cache_stats() -> dict:
+    hits, misses = (
+        int(count or 0) for count in get_redis_connection('default').mget(
+            cache.make_key('profile_cache_hits'), cache.make_key('profile_cache_misses')
+        )
+    )
+    reads = hits + misses
+    return {
+        'hits': hits,
+        'misses': misses,
+        'hit_ratio': round(hits / reads, 4) if reads else None,
+    }
+
+def reset_profile_cache_stats() -> None:
+    cache.delete_many(['profile_cache_hits', 'profile_cache_misses'])
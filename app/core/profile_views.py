@@ -0,0 +1,91 @@
+"""
+Write-behind counter for profile views.
+
+Every hit is an INCR on `profile_views_{uuid}` plus an SADD of the uuid
+into the `profile_views_dirty` set; `flush_profile_views` drains the dirty
+set and applies the pending counts to `Profile.views` in bulk.
+"""
+from django.core.cache import cache
+from django.db import connection
+from django_redis import get_redis_connection
+
+from core.async_cache import get_async_redis
+from core.profile_cache import invalidate_profiles
+from users.models import Profile
+
+
+def _views_key(uuid:str) -> str:
+    return cache.make_key(f'profile_views_{uuid}')
+
+def _dirty_key() -> str:
+    return cache.make_key('profile_views_dirty')
+
+def record_profile_view(*, uuid:str) -> int:
+    """Count one view and return the views not flushed to the database yet."""
+    pipe = get_redis_connection('default').pipeline()
+    pipe.incr(_views_key(uuid))
+    pipe.sadd(_dirty_key(), uuid)
+    pending, _ = pipe.execute()
+    return pending
+
+async def arecord_profile_view(*, uuid:str) -> int:
+    """Async `record_profile_view`."""
+    pipe = get_async_redis().pipeline()
+    pipe.incr(_views_key(uuid))
+    pipe.sadd(_dirty_key(), uuid)
+    pending, _ = await pipe.execute()
+    return pending
+
+def pending_profile_views(*, uuid:str) -> int:
+    pending = get_redis_connection('default').get(_views_key(uuid))
+    return int(pending) if pending is not None else 0
+
+def _bulk_add_views(*, deltas:list[tuple[str, int]]) -> None:
+    values = ', '.join(['(%s, %s)'] * len(deltas))
+    params = [param for delta in deltas for param in delta]
+    table = Profile._meta.db_table
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'UPDATE {table} AS p SET views = p.views + v.delta '
+            f'FROM (VALUES {values}) AS v(uuid, delta) '
+            f'WHERE p.uuid = v.uuid',
+            params
+        )
+
+def flush_profile_views(*, batch_size:int=1000) -> int:
+    """
+    Move the pending view counts into `Profile.views`, one UPDATE per batch.
+    Returns the number of views flushed.
+    """
+    client = get_redis_connection('default')
+    flushed = 0
+
+    while True:
+        uuids = [uuid.decode() for uuid in client.spop(_dirty_key(), batch_size)]
+        if not uuids:
+            return flushed
+
+        pipe = client.pipeline()
+        for uuid in uuids:
+            pipe.getdel(_views_key(uuid))
+        deltas = [
+            (uuid, int(pending))
+            for uuid, pending in zip(uuids, pipe.execute())
+            if pending is not None
+        ]
+        if not deltas:
+            continue
+
+        try:
+            _bulk_add_views(deltas=deltas)
+        except Exception:
+            # Putting the drained counts back so the next flush retries them.
+            pipe = client.pipeline()
+            for uuid, pending in deltas:
+                pipe.incrby(_views_key(uuid), pending)
+                pipe.sadd(_dirty_key(), uuid)
+            pipe.execute()
+            raise
+        # The cached profiles don't count the views flushed into their row.
+        invalidate_profiles(*[uuid for uuid, _ in deltas])
+        flushed += sum(pending for _, pending in deltas)
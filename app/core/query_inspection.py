@@ -0,0 +1,165 @@
+"""
+Per-request SQL inspection.
+
+`QueryInspectionMiddleware` records every query a request runs, groups
+them by fingerprint (the SQL with its literals and parameters masked)
+and compares the total with the `query_budget` of the APIView that
+served the request. A fingerprint that repeats `QUERY_REPEAT_THRESHOLD`
+times or more is the usual shape of an N+1.
+
+The report is logged and attached to the response as `query_report`,
+which `QueryBudgetTestMixin` asserts on in the test suite.
+"""
+import logging
+import re
+from collections import Counter
+from dataclasses import (
+    dataclass,
+    field
+)
+
+from asgiref.sync import (
+    iscoroutinefunction,
+    markcoroutinefunction,
+    sync_to_async
+)
+from django.conf import settings
+from django.db import connection
+
+logger = logging.getLogger(__name__)
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r'\b\d+(?:\.\d+)?\b')
+_IN_LIST = re.compile(r'\bIN \((?:\s*\?\s*,?)+\)', re.IGNORECASE)
+_VALUES_LIST = re.compile(r'\bVALUES (?:\((?:[^()])*\),?\s*)+', re.IGNORECASE)
+_PLACEHOLDER = re.compile(r'%s')
+_SPACES = re.compile(r'\s+')
+# Savepoints come from nested atomic blocks, EXPLAINs from the profiler.
+_IGNORED = ('SAVEPOINT', 'RELEASE SAVEPOINT', 'ROLLBACK TO SAVEPOINT', 'EXPLAIN')
+
+
+def fingerprint(sql:str) -> str:
+    """Mask the literals of `sql`, so queries of the same shape match."""
+    sql = _STRING.sub('?', sql)
+    sql = _NUMBER.sub('?', sql)
+    sql = _PLACEHOLDER.sub('?', sql)
+    sql = _IN_LIST.sub('IN (...)', sql)
+    sql = _VALUES_LIST.sub('VALUES (...) ', sql)
+    return _SPACES.sub(' ', sql).strip()
+
+
+@dataclass
+class QueryReport:
+    view: str|None = None
+    budget: int|None = None
+    queries: list[str] = field(default_factory=list)
+
+    @property
+    def count(self) -> int:
+        return len(self.queries)
+
+    @property
+    def over_budget(self) -> bool:
+        return self.budget is not None and self.count > self.budget
+
+    @property
+    def repeated(self) -> dict[str, int]:
+        counts = Counter(fingerprint(sql) for sql in self.queries)
+        return {
+            shape: times for shape, times in counts.items()
+            if times >= settings.QUERY_REPEAT_THRESHOLD
+        }
+
+
+class QueryRecorder:
+    """Context manager appending the queries run inside it to a report."""
+
+    def __init__(self, report:QueryReport|None=None) -> None:
+        self.report = report or QueryReport()
+
+    def __call__(self, execute, sql, params, many, context):
+        if not sql.lstrip().upper().startswith(_IGNORED):
+            self.report.queries.append(sql)
+        return execute(sql, params, many, context)
+
+    def __enter__(self) -> QueryReport:
+        self._wrapper = connection.execute_wrapper(self)
+        self._wrapper.__enter__()
+        return self.report
+
+    def __exit__(self, *exc_info) -> None:
+        self._wrapper.__exit__(*exc_info)
+
+
+class QueryInspectionMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response) -> None:
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        request.query_report = QueryReport()
+        with QueryRecorder(request.query_report):
+            response = self.get_response(request)
+        return self.report(request, response)
+
+    async def __acall__(self, request):
+        # The async ORM runs its queries in the request's sync thread,
+        # whose connection is not the one of the event loop thread.
+        request.query_report = QueryReport()
+        recorder = QueryRecorder(request.query_report)
+        await sync_to_async(recorder.__enter__)()
+        try:
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(recorder.__exit__)(None, None, None)
+        return self.report(request, response)
+
+    def report(self, request, response):
+        report = request.query_report
+        if report.over_budget:
+            logger.warning(
+                '%s ran %s queries, over its budget of %s.',
+                report.view, report.count, report.budget
+            )
+        for shape, times in report.repeated.items():
+            logger.warning('%s repeated %s times: %s', report.view, times, shape)
+
+        response.query_report = report
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs) -> None:
+        view_class = getattr(view_func, 'view_class', None)
+        if view_class is not None:
+            request.query_report.view = view_class.__name__
+            request.query_report.budget = getattr(view_class, 'query_budget', None)
+
+
+class QueryBudgetTestMixin:
+    """TestCase mixin checking the `query_report` of test client responses."""
+
+    def assertEndpointWithinBudget(self, method, url, data=None, *, status_code=200, **kwargs):
+        """Request `url` with `self.client` and check the response is within budget."""
+        response = getattr(self.client, method)(url, data, **kwargs)
+        self.assertEqual(response.status_code, status_code, response.content)
+        self.assertWithinQueryBudget(response)
+        return response
+
+    def assertWithinQueryBudget(self, response) -> None:
+        report = response.query_report
+        queries = '\n'.join(report.queries)
+        if report.over_budget:
+            self.fail(
+                f'{report.view} ran {report.count} queries, '
+                f'over its budget of {report.budget}:\n{queries}'
+            )
+        if report.repeated:
+            self.fail(
+                f'{report.view} repeated queries of the same shape: '
+                f'{report.repeated}\n{queries}'
+            )
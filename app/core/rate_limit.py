@@ -0,0 +1,139 @@
+"""
+Sliding window rate limiter and the DRF throttles built on it.
+
+Every key holds a zset of its hits inside the window, scored by time in
+ms. One Lua script drops the expired hits, counts the rest and records
+the new hit if there is room, so a check is a single round trip and two
+workers can't both take the last slot. The time comes from the Redis
+server, so app servers with drifting clocks agree on the window.
+
+`RATE_LIMIT_BACKEND` picks the Redis limiter or the in-memory one used by
+the tests.
+"""
+import threading
+import time
+import uuid
+from collections import (
+    defaultdict,
+    deque
+)
+from collections.abc import Mapping
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.module_loading import import_string
+from django_redis import get_redis_connection
+from rest_framework.throttling import SimpleRateThrottle
+
+SLIDING_WINDOW = """
+local now = redis.call('time')
+now = now[1] * 1000 + math.floor(now[2] / 1000)
+local window = tonumber(ARGV[1])
+
+redis.call('zremrangebyscore', KEYS[1], '-inf', now - window)
+if redis.call('zcard', KEYS[1]) < tonumber(ARGV[2]) then
+    redis.call('zadd', KEYS[1], now, ARGV[3])
+    redis.call('pexpire', KEYS[1], window)
+    return 0
+end
+local oldest = redis.call('zrange', KEYS[1], 0, 0, 'WITHSCORES')
+return tonumber(oldest[2]) + window - now
+"""
+
+
+class RedisRateLimiter:
+
+    def __init__(self) -> None:
+        self.script = get_redis_connection('default').register_script(SLIDING_WINDOW)
+
+    def hit(self, key:str, *, limit:int, window:int) -> float:
+        """
+        Record a hit on `key` if it made less than `limit` hits in the last
+        `window` seconds. Returns 0 when allowed, else the seconds to wait.
+        """
+        wait_ms = self.script(
+            keys=[cache.make_key(f'rate_limit_{key}')],
+            args=[window * 1000, limit, uuid.uuid4().hex]
+        )
+        return wait_ms / 1000
+
+
+class LocalRateLimiter:
+    """In-process limiter for tests."""
+
+    def __init__(self) -> None:
+        self.hits = defaultdict(deque)
+        self.lock = threading.Lock()
+
+    def hit(self, key:str, *, limit:int, window:int) -> float:
+        now = time.monotonic()
+        with self.lock:
+            hits = self.hits[key]
+            while hits and hits[0] <= now - window:
+                hits.popleft()
+            if len(hits) < limit:
+                hits.append(now)
+                return 0
+            return hits[0] + window - now
+
+    def reset(self) -> None:
+        with self.lock:
+            self.hits.clear()
+
+
+@lru_cache(maxsize=None)
+def get_rate_limiter():
+    return import_string(settings.RATE_LIMIT_BACKEND)()
+
+
+class SlidingWindowThrottle(SimpleRateThrottle):
+    """
+    Throttle of the views setting `throttle_scope`. The rate comes from
+    `DEFAULT_THROTTLE_RATES['<throttle_scope>_<key_name>']`; views without
+    such a rate are not throttled.
+    """
+    key_name = None
+
+    def __init__(self) -> None:
+        # The scope is only known once the view is, see `allow_request`.
+        pass
+
+    def allow_request(self, request, view):
+        self.scope = f"{getattr(view, 'throttle_scope', None)}_{self.key_name}"
+        if self.scope not in self.THROTTLE_RATES:
+            return True
+        self.rate = self.get_rate()
+        self.num_requests, self.duration = self.parse_rate(self.rate)
+
+        key = self.get_cache_key(request, view)
+        if key is None:
+            return True
+        self.retry_after = get_rate_limiter().hit(
+            key, limit=self.num_requests, window=self.duration
+        )
+        return not self.retry_after
+
+    def wait(self):
+        return self.retry_after
+
+
+class IpThrottle(SlidingWindowThrottle):
+    key_name = 'ip'
+
+    def get_cache_key(self, request, view):
+        return self.cache_format % {'scope': self.scope, 'ident': self.get_ident(request)}
+
+
+class PhoneNumberThrottle(SlidingWindowThrottle):
+    """Keyed by the `phone_number` of the request body, if it has one."""
+    key_name = 'phone'
+
+    def get_cache_key(self, request, view):
+        # The body may be any JSON; the serializer is the one to reject it.
+        if not isinstance(request.data, Mapping):
+            return None
+        phone_number = request.data.get('phone_number')
+        if not phone_number:
+            return None
+        return self.cache_format % {'scope': self.scope, 'ident': str(phone_number)}
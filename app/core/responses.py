@@ -0,0 +1,36 @@
+import json
+
+from django.utils.http import parse_etags
+from rest_framework import status
+from rest_framework.response import Response
+
+
+class RenderedResponse(Response):
+    """
+    Response around a JSON body rendered beforehand, so it skips the
+    serializers and the renderer. `data` is only decoded when accessed.
+    """
+
+    def __init__(self, body:bytes, **kwargs) -> None:
+        self.body = body
+        super().__init__(content_type='application/json', **kwargs)
+
+    @property
+    def data(self):
+        return json.loads(self.body)
+
+    @data.setter
+    def data(self, value) -> None:
+        pass
+
+    @property
+    def rendered_content(self) -> bytes:
+        return self.body
+
+
+def conditional_response(*, request, body:bytes, etag:str) -> Response:
+    """Answer with 304 when the client already holds `etag`."""
+    if_none_match = parse_etags(request.headers.get('If-None-Match', ''))
+    if etag in if_none_match or '*' in if_none_match:
+        return Response(status=status.HTTP_304_NOT_MODIFIED, headers={'ETag': etag})
+    return RenderedResponse(body, headers={'ETag': etag})
@@ -1,7 +1,10 @@
 from django.db.models import QuerySet
-from django.core.cache import cache
 from rest_framework import serializers
 
+from core.catalog_cache import (
+    register_catalog,
+    get_catalog
+)
 from skill.models import (
     Category,
     Skill
@@ -24,12 +27,39 @@ def get_published_skills(*, category:Category|None) -> QuerySet[Skill]:
     else:
         return Skill.objects.filter(published=True).only('name', 'slug')
 
-def category_choices() -> QuerySet[Category]:
-    cached_data = cache.get('category_choices')
-    if cached_data:
-        return cached_data
-    else:
-        return list(Category.objects.filter(published=True).values_list('name', flat=True))
+@register_catalog('published_categories')
+def _load_published_categories() -> tuple[dict, ...]:
+    return tuple(
+        Category.objects.filter(published=True).order_by('id').values('name', 'slug')
+    )
+
+@register_catalog('published_skills')
+def _load_published_skills() -> tuple[dict, ...]:
+    return tuple(
+        Skill.objects.filter(published=True).order_by('id').values('name', 'slug')
+    )
+
+def published_categories_catalog() -> tuple[dict, ...]:
+    """Published categories as `name`/`slug` dicts, served from the catalog cache."""
+    return get_catalog('published_categories')
+
+def published_skills_catalog() -> tuple[dict, ...]:
+    """Published skills as `name`/`slug` dicts, served from the catalog cache."""
+    return get_catalog('published_skills')
+
+@register_catalog('category_choices')
+def _load_category_choices() -> tuple[str, ...]:
+    return tuple(
+        Category.objects.filter(published=True).order_by('id').values_list('name', flat=True)
+    )
+
+def category_choices() -> tuple[str, ...]:
+    """
+    Names of the published categories, served from the catalog cache and
+    loaded again after every category write. Meant to be called per
+    request, never at import time.
+    """
+    return get_catalog('category_choices')
 
 def get_all_categories() -> QuerySet[Category]:
     return Category.objects.all().only('name', 'published', 'slug')
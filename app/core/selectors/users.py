@@ -1,40 +1,231 @@
-from django.core.cache import cache
-from django.db.models import QuerySet
+from functools import partial
 
-from skill.models import Skill
+from django.contrib.postgres.search import (
+    SearchQuery,
+    SearchRank,
+    TrigramSimilarity
+)
+from django.db import connection
+from django.db.models import (
+    F,
+    Case,
+    When,
+    Exists,
+    FloatField,
+    OuterRef,
+    QuerySet,
+    Subquery,
+    Value,
+    ExpressionWrapper
+)
+from django.db.models.functions import (
+    Coalesce,
+    Ln
+)
+
+from core.leaderboard import (
+    GLOBAL_BOARD,
+    category_board,
+    skill_board,
+    neighbors,
+    top
+)
+from core.social_graph import (
+    ProfileIdList,
+    followers_of,
+    followings_of
+)
+from skill.models import (
+    Category,
+    Skill
+)
 from users.models import (
     BaseUser,
     Profile,
-    Subscription
+    ProfileSkill
 )
 
+# Search ranking knobs: skills below the threshold don't match at all and
+# score is blended in logarithmically so it only breaks near-ties.
+SKILL_SIMILARITY_THRESHOLD = 0.3
+SCORE_RANK_WEIGHT = 0.1
+
+FREELANCER_FACETS = ('city', 'sex', 'plan_type', 'age', 'skill', 'category')
+AGE_BUCKET_SIZE = 10
+
 def get_profile(*, user:BaseUser) -> Profile:
     return Profile.objects.get(user=user)
 
 def get_freelancers() -> QuerySet[Profile]:
-    return Profile.objects.all().order_by('-score')
+    return Profile.objects.defer('search_vector').order_by('-score', '-id')
 
-def my_followers(*, profile:Profile) -> QuerySet[Subscription]:
-    cached_data = cache.get(f'followers_{profile}')
-    if cached_data:
-        return cached_data
-    else:
-        followers = Subscription.objects.only(
-            'follower'
-        ).select_related('follower').filter(target=profile)
-        cache.set(key=f'followers_{profile}', value=followers, timeout=None)
-        return followers
-
-def my_followings(*, profile:Profile) -> QuerySet[Subscription]:
-    cached_data = cache.get(f'followings_{profile}')
-    if cached_data:
-        return cached_data
+def search_freelancers(
+        *, query:str, skill:str|None=None, city:str|None=None
+) -> QuerySet[Profile]:
+    """
+    Freelancers matching `query` through the full-text vector of their
+    bio/city or through the trigram similarity of their skill names,
+    ranked by text rank + best skill similarity + log-scaled score.
+    """
+    search_query = SearchQuery(query, config='simple', search_type='websearch')
+    # The skill catalog is small, so similarities are computed once here
+    # and inlined, instead of once per candidate profile.
+    skill_similarities = dict(Skill.objects.filter(published=True).annotate(
+        similarity=TrigramSimilarity('name', query)
+    ).filter(
+        similarity__gt=SKILL_SIMILARITY_THRESHOLD
+    ).values_list('id', 'similarity'))
+
+    candidates = Profile.objects.filter(search_vector=search_query).values('id')
+    skill_rank = Value(0.0)
+    if skill_similarities:
+        # Union of the two index-backed candidate sets instead of an OR,
+        # which would make Postgres scan the whole profile table.
+        candidates = candidates.union(ProfileSkill.objects.filter(
+            skill_id__in=skill_similarities
+        ).values('profile_id'))
+        skill_rank = Coalesce(Subquery(ProfileSkill.objects.filter(
+            profile_id=OuterRef('pk'), skill_id__in=skill_similarities
+        ).annotate(similarity=Case(
+            *[
+                When(skill_id=skill_id, then=Value(similarity))
+                for skill_id, similarity in skill_similarities.items()
+            ],
+            output_field=FloatField()
+        )).order_by('-similarity').values('similarity')[:1]), Value(0.0))
+
+    freelancers = Profile.objects.filter(id__in=candidates).defer('search_vector')
+    if skill:
+        freelancers = freelancers.filter(Exists(ProfileSkill.objects.filter(
+            profile_id=OuterRef('pk'), skill_id__slug=skill
+        )))
+    if city:
+        freelancers = freelancers.filter(city__iexact=city)
+
+    return freelancers.annotate(
+        rank=ExpressionWrapper(
+            SearchRank(F('search_vector'), search_query)
+            + skill_rank
+            + SCORE_RANK_WEIGHT * Ln(F('score') + 1),
+            output_field=FloatField()
+        )
+    ).order_by('-rank', '-id')
+
+def filter_freelancers(
+        *, skill:str|None=None, category:str|None=None, city:str|None=None,
+        sex:str|None=None, plan_type:str|None=None,
+        min_age:int|None=None, max_age:int|None=None
+) -> QuerySet[Profile]:
+    freelancers = Profile.objects.defer('search_vector')
+    if skill:
+        freelancers = freelancers.filter(Exists(ProfileSkill.objects.filter(
+            profile_id=OuterRef('pk'), skill_id__slug=skill
+        )))
+    if category:
+        freelancers = freelancers.filter(Exists(ProfileSkill.objects.filter(
+            profile_id=OuterRef('pk'), skill_id__category__slug=category
+        )))
+    if city:
+        freelancers = freelancers.filter(city__iexact=city)
+    if sex:
+        freelancers = freelancers.filter(sex=sex)
+    if plan_type:
+        freelancers = freelancers.filter(plan_type=plan_type)
+    if min_age is not None:
+        freelancers = freelancers.filter(age__gte=min_age)
+    if max_age is not None:
+        freelancers = freelancers.filter(age__lte=max_age)
+    return freelancers.order_by('-score', '-id')
+
+def _column(alias:str, model, field:str) -> str:
+    return f'{alias}.{model._meta.get_field(field).column}'
+
+def freelancer_facets(*, freelancers:QuerySet[Profile]) -> dict:
+    """
+    Count the given freelancers per value of every facet in one query,
+    using GROUPING SETS over profiles joined with their published skills.
+    Returns {'count': total, 'facets': {facet: {value: count}}}.
+    """
+    matched_sql, params = freelancers.order_by().values('id').query.sql_with_params()
+    # Column names come from the models too, so renaming a field fails
+    # loudly here instead of leaving the SQL behind.
+    p, ps, s, c = (
+        partial(_column, alias, model) for alias, model in (
+            ('p', Profile), ('ps', ProfileSkill), ('s', Skill), ('c', Category)
+        )
+    )
+    age_bucket = f"({p('age')} / {AGE_BUCKET_SIZE}) * {AGE_BUCKET_SIZE}"
+    columns = [p('city'), p('sex'), p('plan_type'), age_bucket, s('slug'), c('slug')]
+    sql = f'''
+        SELECT GROUPING({', '.join(columns)}), {', '.join(columns)}, COUNT(DISTINCT {p('id')})
+        FROM {Profile._meta.db_table} p
+        LEFT JOIN {ProfileSkill._meta.db_table} ps ON {ps('profile_id')} = {p('id')}
+        LEFT JOIN {Skill._meta.db_table} s ON {s('id')} = {ps('skill_id')} AND {s('published')}
+        LEFT JOIN {Category._meta.db_table} c ON {c('id')} = {s('category')} AND {c('published')}
+        WHERE {p('id')} IN ({matched_sql})
+        GROUP BY GROUPING SETS ((), {', '.join(f'({column})' for column in columns)})
+    '''
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        rows = cursor.fetchall()
+
+    # GROUPING() sets the bit of every column a row is *not* grouped by,
+    # leftmost column first; the all-ones row is the grand total.
+    all_bits = (1 << len(columns)) - 1
+    facet_of_mask = {
+        all_bits ^ (1 << (len(columns) - 1 - index)): facet
+        for index, facet in enumerate(FREELANCER_FACETS)
+    }
+    result = {'count': 0, 'facets': {facet: {} for facet in FREELANCER_FACETS}}
+    for mask, *values, count in rows:
+        if mask == all_bits:
+            result['count'] = count
+            continue
+        facet = facet_of_mask[mask]
+        value = values[FREELANCER_FACETS.index(facet)]
+        if value is None:
+            continue
+        if facet == 'age':
+            value = f'{value}-{value + AGE_BUCKET_SIZE - 1}'
+        result['facets'][facet][value] = count
+    return result
+
+def leaderboard(
+        *, skill:str|None=None, category:str|None=None,
+        limit:int=10, around:str|None=None, radius:int=5
+) -> list[Profile]:
+    """
+    The best freelancers overall, of a skill or of a category, or the
+    ones ranked around the profile with the uuid `around`. Every profile
+    gets its 1-based `rank`.
+    """
+    board = GLOBAL_BOARD
+    if skill is not None:
+        board = skill_board(Skill.objects.values_list('id', flat=True).get(slug=skill))
+    elif category is not None:
+        board = category_board(Category.objects.values_list('id', flat=True).get(slug=category))
+
+    if around is not None:
+        profile_id = Profile.objects.values_list('id', flat=True).get(uuid=around)
+        entries = neighbors(profile_id=profile_id, board=board, radius=radius)
     else:
-        followings = Subscription.objects.only(
-            'target'
-        ).select_related('target').filter(follower=profile)
-        cache.set(key=f'followings_{profile}', value=followings, timeout=None)
-        return followings
+        entries = top(board=board, limit=limit)
+
+    profiles = Profile.objects.defer('search_vector').in_bulk(
+        [profile_id for _, profile_id, _ in entries]
+    )
+    ranked = []
+    for rank, profile_id, _ in entries:
+        if profile_id in profiles:
+            profiles[profile_id].rank = rank
+            ranked.append(profiles[profile_id])
+    return ranked
+
+def my_followers(*, profile:Profile, hydrate:bool=True) -> ProfileIdList:
+    return followers_of(profile=profile, hydrate=hydrate)
+
+def my_followings(*, profile:Profile, hydrate:bool=True) -> ProfileIdList:
+    return followings_of(profile=profile, hydrate=hydrate)
 
 def my_skills(*, user:BaseUser) -> QuerySet[Skill]:
     # TODO: caching
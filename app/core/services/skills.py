@@ -1,58 +1,184 @@
+from collections.abc import Iterable
+from itertools import islice
+
 from django.utils.text import slugify
 from django.core.exceptions import ValidationError
-from django.db import transaction
-from django.core.cache import cache
+from django.db import (
+    connection,
+    transaction
+)
 from rest_framework import serializers
 
+from core.catalog_cache import bump_catalog_version
 from skill.models import (
     Skill,
     Category
 )
 
 def create_category(*, name:str) -> Category:
-    return Category.objects.create(name=name, slug=slugify(name))
+    category = Category.objects.create(name=name, slug=slugify(name))
+    bump_catalog_version()
+    return category
 
 def create_skill(*, name:str, category:Category) -> Skill:
-    return Skill.objects.create(name=name, category=category, slug=slugify(name))
+    skill = Skill.objects.create(name=name, category=category, slug=slugify(name))
+    bump_catalog_version()
+    return skill
 
-@transaction.atomic
-def publish_category(*, slug:str) -> None:
-    category = Category.objects.filter(slug=slug).only('published')
-    if category:
-        category.update(published=True)
-        cache.set(
-            key='category_choices',
-            value=list(Category.objects.filter(published=True).values_list('name', flat=True)),
-            timeout=None
-        )
-    else:
+def _set_published(*, model, slugs:Iterable[str], published:bool, cascade:bool=False) -> dict:
+    """
+    Set `published` of every `model` row with one of `slugs` in one UPDATE,
+    and with `cascade` of every skill of those categories in the same
+    statement. Raises when a slug matches nothing, which rolls the whole
+    batch back.
+    """
+    slugs = sorted(set(slugs))
+    table = model._meta.db_table
+    # Skills are updated from the ids the categories UPDATE returns, so a
+    # cascade is still a single statement.
+    cascade_sql = f''',
+        skills AS (
+            UPDATE {Skill._meta.db_table} SET published = %s, updated_at = now()
+            WHERE category_id IN (SELECT id FROM updated)
+            RETURNING 1
+        )''' if cascade else ''
+    sql = f'''
+        WITH updated AS (
+            UPDATE {table} SET published = %s, updated_at = now()
+            WHERE slug = ANY(%s)
+            RETURNING id, slug
+        ){cascade_sql}
+        SELECT
+            (SELECT array_agg(DISTINCT slug) FROM updated),
+            (SELECT COUNT(*) FROM updated),
+            {'(SELECT COUNT(*) FROM skills)' if cascade else '0'}
+    '''
+    params = [published, slugs] + ([published] if cascade else [])
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        found, updated, cascaded = cursor.fetchone()
+
+    missing = set(slugs) - set(found or ())
+    if missing:
         raise ValidationError(
-            {'detail': 'There is no category with the given slug.'}
+            {'detail': f'There is no {model._meta.model_name} with the slugs >> {sorted(missing)}'}
         )
+    return {'updated': updated, 'cascaded': cascaded}
+
+@transaction.atomic
+def publish_categories(*, slugs:Iterable[str], cascade:bool=False) -> dict:
+    """
+    Publish the categories with `slugs`, and all of their skills with
+    `cascade`. The catalog cache is bumped once for the whole batch, on
+    commit, so no reader can cache the new version from the rows before.
+    """
+    counts = _set_published(model=Category, slugs=slugs, published=True, cascade=cascade)
+    transaction.on_commit(bump_catalog_version)
+    return counts
+
+@transaction.atomic
+def unpublish_categories(*, slugs:Iterable[str], cascade:bool=False) -> dict:
+    counts = _set_published(model=Category, slugs=slugs, published=False, cascade=cascade)
+    transaction.on_commit(bump_catalog_version)
+    return counts
+
+@transaction.atomic
+def publish_skills(*, slugs:Iterable[str]) -> dict:
+    counts = _set_published(model=Skill, slugs=slugs, published=True)
+    transaction.on_commit(bump_catalog_version)
+    return counts
+
+@transaction.atomic
+def unpublish_skills(*, slugs:Iterable[str]) -> dict:
+    counts = _set_published(model=Skill, slugs=slugs, published=False)
+    transaction.on_commit(bump_catalog_version)
+    return counts
+
+def publish_category(*, slug:str) -> None:
+    publish_categories(slugs=[slug])
 
 def publish_skill(*, slug:str) -> None:
-    skill = Skill.objects.filter(slug=slug).only('published')
-    if skill:
-        skill.update(published=True)
-    else:
-        raise ValidationError(
-            {'detail': 'There is no skill with the given slug.'}
+    publish_skills(slugs=[slug])
+
+@transaction.atomic
+def import_catalog(*, rows:Iterable[dict], batch_size:int=1000) -> int:
+    """
+    Upsert skills and their categories from `rows` of `name`, `category`
+    and optionally `published` and `category_published`, matching both
+    by name. A publish state is only written when the row has it, so
+    rows without one leave existing skills and categories as they are
+    and create new ones unpublished; a category takes the state of the
+    first row naming it. Categories are resolved once per batch for the
+    names not seen yet and skills are upserted with one INSERT ... ON
+    CONFLICT per batch (two when only some rows have a state); the
+    catalog cache is bumped once at the end. Returns the number of rows
+    imported.
+    """
+    category_ids = {}
+    imported = 0
+    rows = iter(rows)
+    while batch := list(islice(rows, batch_size)):
+        missing = {row['category'] for row in batch} - category_ids.keys()
+        category_ids.update(
+            Category.objects.filter(name__in=missing).values_list('name', 'id')
         )
+        new_categories, stated_categories = {}, {}
+        for row in batch:
+            name = row['category']
+            if name not in missing or name in stated_categories:
+                continue
+            if 'category_published' in row:
+                new_categories.pop(name, None)
+                stated_categories[name] = Category(
+                    name=name, slug=slugify(name), published=row['category_published']
+                )
+            elif name not in category_ids:
+                new_categories[name] = Category(name=name, slug=slugify(name))
+        for category in Category.objects.bulk_create(new_categories.values()):
+            category_ids[category.name] = category.id
+        for category in Category.objects.bulk_create(
+            stated_categories.values(), update_conflicts=True, unique_fields=['name'],
+            update_fields=['published', 'updated_at']
+        ):
+            category_ids[category.name] = category.id
+
+        # One row per name, an upsert can't touch the same row twice.
+        skills = {
+            row['name']: (
+                Skill(
+                    name=row['name'], slug=slugify(row['name']),
+                    category_id=category_ids[row['category']],
+                    published=row.get('published', False)
+                ),
+                'published' in row
+            )
+            for row in batch
+        }
+        for stated in (True, False):
+            Skill.objects.bulk_create(
+                [skill for skill, has_state in skills.values() if has_state is stated],
+                update_conflicts=True, unique_fields=['name'],
+                update_fields=['slug', 'category', 'updated_at'] + (['published'] if stated else [])
+            )
+        imported += len(batch)
+
+    bump_catalog_version()
+    return imported
+
+def export_catalog() -> Iterable[dict]:
+    """Every skill with its category, in the shape `import_catalog` takes."""
+    for name, category, published, category_published in Skill.objects.values_list(
+        'name', 'category__name', 'published', 'category__published'
+    ).order_by('id').iterator(chunk_size=2000):
+        yield {
+            'name': name,
+            'category': category,
+            'published': published,
+            'category_published': category_published,
+        }
 
 def unpublish_category(*, slug:str) -> None:
-    category = Category.objects.filter(slug=slug).only('published')
-    if category:
-        category.update(published=False)
-    else:
-        raise ValidationError(
-            {'detail': 'There is no category with the given slug.'}
-        )
+    unpublish_categories(slugs=[slug])
 
 def unpublish_skill(*, slug:str) -> None:
-    skill = Skill.objects.filter(slug=slug).only('published')
-    if skill:
-        skill.update(published=False)
-    else:
-        raise ValidationError(
-            {'detail': 'There is no skill with the given slug.'}
-        )
+    unpublish_skills(slugs=[slug])
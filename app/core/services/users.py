@@ -3,11 +3,54 @@ Layer for users services Business logics.
 """
 import random
 
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
 from django.db import transaction
-from django.core.cache import cache
+from django.db.models import (
+    F,
+    Count,
+    OuterRef,
+    Subquery
+)
+from django.db.models.functions import Coalesce
+from django.core.exceptions import ValidationError
 from rest_framework.exceptions import APIException
 from rest_framework import serializers
 
+from core.otp import (
+    store_otp,
+    consume_otp
+)
+from core.authentication import revoke_user_tokens
+from core.hashers import submit_password_hash
+from core.images import (
+    render_thumbnails,
+    thumbnail_path
+)
+from core.jobs import job
+from core.leaderboard import (
+    GLOBAL_BOARD,
+    add_to_boards,
+    category_board,
+    remove_from_boards,
+    skill_board,
+    sync_profile
+)
+from core.profile_cache import (
+    get_profile_detail,
+    aget_profile_detail,
+    invalidate_profiles,
+    invalidate_all_profiles
+)
+from core.profile_views import (
+    record_profile_view,
+    arecord_profile_view
+)
+from core.social_graph import (
+    add_subscription,
+    remove_subscription
+)
 from skill.models import Skill
 from users.models import (
     BaseUser,
@@ -23,17 +66,25 @@ def otp_generator():
 
 
 def create_user(*, phone_number:str, password:str) -> BaseUser:
-    user = BaseUser.objects.create_user(
-        phone_number=phone_number,
-        password=password
-    )
-    user.full_clean()
+    """
+    Validate the user once, hashing the password on the hashers pool
+    in the meantime.
+    """
+    password_hash = submit_password_hash(password)
+    user = BaseUser(phone_number=phone_number)
+    try:
+        user.full_clean(exclude=['password'])
+    except ValidationError:
+        password_hash.cancel()
+        raise
+    user.password = password_hash.result()
+    user.save()
     return user
 
 @transaction.atomic
 def create_profile(*, user:BaseUser, email:str|None) -> Profile:
     profile = Profile.objects.create(user=user, email=email)
-    cache.set(key=f'{profile}', value=profile, timeout=None)
+    add_to_boards(profile_id=profile.id, score=profile.score, boards={GLOBAL_BOARD})
     return profile
 
 def update_profile(
@@ -44,18 +95,61 @@ def update_profile(
 
     profile_obj.email = email or profile_obj.email
     profile_obj.bio = bio or profile_obj.bio
-    profile_obj.image = image or profile_obj.image
+    replaced_files = []
+    if image:
+        # The previous image and its thumbnails are out of date from now on.
+        if profile_obj.image:
+            replaced_files = [profile_obj.image.name, *profile_obj.thumbnails.values()]
+        profile_obj.image = image
+        profile_obj.thumbnails = {}
     profile_obj.age = age or profile_obj.age
     profile_obj.sex = sex or profile_obj.sex
     profile_obj.city = city or profile_obj.city
 
     profile_obj.save()
+    invalidate_profiles(profile_obj.uuid)
+    if image:
+        generate_profile_thumbnails.delay(
+            profile_id=profile_obj.id, image_name=profile_obj.image.name
+        )
+    if replaced_files:
+        delete_files.delay(names=replaced_files)
     return profile_obj
 
+@job(max_retries=3)
+def generate_profile_thumbnails(*, profile_id:int, image_name:str) -> None:
+    """Runs on the jobs worker, unless the image was replaced meanwhile."""
+    if not Profile.objects.filter(id=profile_id, image=image_name).exists():
+        return
+    with default_storage.open(image_name) as image_file:
+        thumbnails = render_thumbnails(
+            image_file, sizes=settings.PROFILE_THUMBNAIL_SIZES
+        )
+
+    paths = {}
+    for size, content in thumbnails.items():
+        path = thumbnail_path(image_name, size)
+        default_storage.delete(path)
+        paths[size] = default_storage.save(path, ContentFile(content))
+    if not Profile.objects.filter(id=profile_id, image=image_name).update(thumbnails=paths):
+        # Replaced while rendering, nothing will ever point at them.
+        delete_files(names=list(paths.values()))
+
+@job(max_retries=3)
+def delete_files(*, names:list[str]) -> None:
+    """Delete replaced files from the storage, off the request path."""
+    for name in names:
+        default_storage.delete(name)
+
+@job(max_retries=3, sensitive=('otp',))
+def deliver_otp(*, phone_number:str, otp:int) -> None:
+    """Runs on the jobs worker, out of the request and its transaction."""
+    # TODO: Sending OTP via sms...
+
 def send_otp(*, phone_number:str) -> None:
     otp = otp_generator()
-    cache.set(key=f'otp_{otp}_{phone_number}', value=otp, timeout=60*2)
-    # TODO: Sending OTP via sms...
+    store_otp(phone_number=phone_number, otp=otp)
+    deliver_otp.delay(phone_number=phone_number, otp=otp)
 
 def resend_otp(*, phone_number:str) -> None:
     try:
@@ -73,16 +167,18 @@ def register(*, phone_number:str, email:str, password:str) -> BaseUser:
     create_profile(user=user, email=email)
     return user
 
-def profile_detail(*, uuid:str) ->Profile:
-    profile_object = cache.get(uuid)
-    if profile_object:
-        profile_object.views += 1
-        cache.set(key=profile_object, value=profile_object, timeout=None)
-        return profile_object
-    else:
-        profile = Profile.objects.get(uuid=uuid)
-        return profile
-    # TODO:Create a scheduling for inserting profile data into database with celery and rabbitmq
+def profile_detail(*, uuid:str, serialize) -> dict:
+    """The serialized profile, `serialize` turning it into a dict on a cache miss."""
+    profile = get_profile_detail(uuid=uuid, serialize=serialize)
+    # Views are counted in Redis and flushed by `manage.py flush_profile_views`.
+    profile['views'] += record_profile_view(uuid=uuid)
+    return profile
+
+async def aprofile_detail(*, uuid:str, serialize) -> dict:
+    """Async `profile_detail`, for the ASGI views."""
+    profile = await aget_profile_detail(uuid=uuid, serialize=serialize)
+    profile['views'] += await arecord_profile_view(uuid=uuid)
+    return profile
 
 @transaction.atomic
 def subscribe(*, follower:Profile, target_uuid:str) -> Subscription:
@@ -101,11 +197,19 @@ def subscribe(*, follower:Profile, target_uuid:str) -> Subscription:
     subscription.full_clean()
     subscription.save()
 
-    cache.delete(f'followings_{follower}')
-    cache.delete(f'followers_{target_user}')
+    Profile.objects.filter(id=target_user.id).update(
+        followers_count=F('followers_count') + 1
+    )
+    Profile.objects.filter(id=follower.id).update(
+        followings_count=F('followings_count') + 1
+    )
+    invalidate_profiles(target_user.uuid, follower.uuid)
+
+    transaction.on_commit(lambda: add_subscription(subscription=subscription))
 
     return subscription
 
+@transaction.atomic
 def unsubscribe(*, un_follower:Profile, target_uuid:str) -> Subscription:
     """
     Deleting subscription method by passing two arguments:
@@ -126,39 +230,145 @@ def unsubscribe(*, un_follower:Profile, target_uuid:str) -> Subscription:
         raise APIException(
             'The target user has not already been followed.'
         )
-    subscription.delete()
-    # TODO:Caching
-
-def verify_otp(*, otp:int) -> None:
-    cached_data = cache.keys(f'otp_{otp}_*') # 'otp_{otp}_{phone_number}'
-    if cached_data: # Probably there is one cache data with this pattern so it doesn't take too long to process
-        for otp_key in cached_data:
-            phone_number = otp_key.split('_')[2]
-            user = BaseUser.objects.get(phone_number=phone_number)
-            user.is_active = True
-            user.save()
-            cache.delete(f'otp_{otp}_{phone_number}')
+    # A concurrent unsubscribe may have deleted the row since, only the
+    # one that deleted it moves the counters.
+    deleted, _ = subscription.delete()
+    if not deleted:
+        raise APIException(
+            'The target user has not already been followed.'
+        )
+
+    Profile.objects.filter(id=target_user.id).update(
+        followers_count=F('followers_count') - 1
+    )
+    Profile.objects.filter(id=un_follower.id).update(
+        followings_count=F('followings_count') - 1
+    )
+    invalidate_profiles(target_user.uuid, un_follower.uuid)
+
+    transaction.on_commit(lambda: remove_subscription(
+        follower_id=un_follower.id, target_id=target_user.id
+    ))
+
+def reconcile_subscription_counts(*, batch_size:int=10000) -> int:
+    """
+    Recompute `followers_count`/`followings_count` from `Subscription`
+    with one UPDATE per id range. Returns the number of profiles updated.
+    """
+    def count_of(field:str) -> Coalesce:
+        return Coalesce(Subquery(
+            Subscription.objects.filter(**{field: OuterRef('pk')})
+            .order_by().values(field).annotate(count=Count('*')).values('count')
+        ), 0)
+
+    updated = 0
+    last_id = Profile.objects.order_by('-id').values_list('id', flat=True).first() or 0
+    for start in range(0, last_id, batch_size):
+        updated += Profile.objects.filter(
+            id__gt=start, id__lte=start + batch_size
+        ).update(
+            followers_count=count_of('target'),
+            followings_count=count_of('follower')
+        )
+    invalidate_all_profiles()
+    return updated
+
+def verify_otp(*, otp:int, phone_number:str) -> None:
+    if consume_otp(otp=otp, phone_number=phone_number):
+        BaseUser.objects.filter(
+            phone_number=phone_number
+        ).update(is_active=True)
     else:
         raise APIException('The OTP has been expired or not valid.Get a new one...')
 
+@transaction.atomic
+def update_score(*, profile_id:int, score:int) -> None:
+    uuid = Profile.objects.filter(id=profile_id).values_list('uuid', flat=True).get()
+    Profile.objects.filter(id=profile_id).update(score=score)
+    invalidate_profiles(uuid)
+    sync_profile(profile_id=profile_id, score=score)
+
+@transaction.atomic
+def deactivate_user(*, user_id:int) -> None:
+    """Deactivate the user, refusing the tokens it was already issued."""
+    BaseUser.objects.filter(id=user_id).update(is_active=False)
+    transaction.on_commit(lambda: revoke_user_tokens(user_id=user_id))
+
 @transaction.atomic
 def select_skill(*, user:BaseUser, slug:str) -> None:
     profile = Profile.objects.get(user=user)
     skill = Skill.objects.get(slug=slug)
     if skill.published:
         profile.skills.add(skill)
-        profile.save()
+        invalidate_profiles(profile.uuid)
+        add_to_boards(
+            profile_id=profile.id, score=profile.score,
+            boards={skill_board(skill.id), category_board(skill.category_id)}
+        )
     else:
         raise serializers.ValidationError(
             'The provided skill is not published yet.'
         )
 
+def select_skills(*, user:BaseUser, slugs:list[str]) -> dict[str, str]:
+    """
+    Select many skills at once, returning the outcome of every slug:
+    'selected', 'not_published' or 'not_found'. Already selected skills
+    are reported as 'selected' too.
+    """
+    profile_id, profile_uuid, score = Profile.objects.filter(
+        user=user
+    ).values_list('id', 'uuid', 'score').get()
+    skills = {
+        slug: (skill_id, published, category_id)
+        for skill_id, slug, published, category_id in Skill.objects.filter(
+            slug__in=set(slugs)
+        ).values_list('id', 'slug', 'published', 'category_id')
+    }
+
+    outcomes = {}
+    selected_ids = set()
+    boards = set()
+    for slug in slugs:
+        if slug not in skills:
+            outcomes[slug] = 'not_found'
+        elif not skills[slug][1]:
+            outcomes[slug] = 'not_published'
+        else:
+            outcomes[slug] = 'selected'
+            selected_ids.add(skills[slug][0])
+            boards |= {skill_board(skills[slug][0]), category_board(skills[slug][2])}
+
+    ProfileSkill.objects.bulk_create(
+        [
+            ProfileSkill(profile_id_id=profile_id, skill_id_id=skill_id)
+            for skill_id in selected_ids
+        ],
+        ignore_conflicts=True
+    )
+    invalidate_profiles(profile_uuid)
+    add_to_boards(profile_id=profile_id, score=score, boards=boards)
+    return outcomes
+
 @transaction.atomic
 def unselect_skill(*, user:BaseUser, slug:str) -> None:
     profile = Profile.objects.get(user=user)
-    user_skills = ProfileSkill.objects.filter(profile_id=profile).filter(skill_id__slug=slug)
-    if user_skills:
-        user_skills.delete()
+    user_skills = list(ProfileSkill.objects.filter(profile_id=profile).values_list(
+        'id', 'skill_id', 'skill_id__slug', 'skill_id__category_id'
+    ))
+    unselected = [row for row in user_skills if row[2] == slug]
+    if unselected:
+        ProfileSkill.objects.filter(id__in=[row[0] for row in unselected]).delete()
+        invalidate_profiles(profile.uuid)
+
+        # The category board keeps profiles with another skill of it.
+        kept_categories = {row[3] for row in user_skills if row[2] != slug}
+        boards = set()
+        for _, skill_id, _, category_id in unselected:
+            boards.add(skill_board(skill_id))
+            if category_id not in kept_categories:
+                boards.add(category_board(category_id))
+        remove_from_boards(profile_id=profile.id, boards=boards)
     else:
         raise serializers.ValidationError(
             'There is no selected skill with the provided slug.'
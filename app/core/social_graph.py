@@ -0,0 +1,181 @@
+"""
+Followers/followings cache kept in Redis sorted sets.
+
+    followers_{profile_id}  >> zset of follower profile ids
+    followings_{profile_id} >> zset of target profile ids
+
+    {set key}_version       >> bumped by every subscribe/unsubscribe
+    {set key}_loading_{id}  >> a set being loaded, renamed to the set key
+
+Members are scored by the subscription `created_at`, so ZREVRANGE returns
+a page newest first. A loaded set always holds the `SENTINEL` member with
+a -inf score, which tells an empty list apart from a missing key and lets
+`subscribe`/`unsubscribe` update loaded sets in place.
+
+A set is loaded from the rows under a key of its own and renamed to the
+set key only if its version hasn't moved since the rows were read; a
+subscription changing in between would otherwise be lost, its ZADD/ZREM
+having found no set yet, and the stale set kept for `GRAPH_TIMEOUT`.
+"""
+import uuid
+from functools import lru_cache
+
+from django.core.cache import cache
+from django_redis import get_redis_connection
+
+from users.models import (
+    Profile,
+    Subscription
+)
+
+SENTINEL = '-'
+GRAPH_TIMEOUT = 60 * 60 * 24
+# Loads of a set changing all the time give up after these many, reading
+# the last one once without keeping it.
+LOAD_ATTEMPTS = 3
+UNKEPT_TIMEOUT = 60
+
+# Only touching sets that are already loaded, a partial set would be
+# mistaken for the whole list; bumping the version either way.
+ZADD_IF_LOADED = """
+redis.call('incr', KEYS[2])
+redis.call('expire', KEYS[2], ARGV[3])
+if redis.call('exists', KEYS[1]) == 1 then
+    return redis.call('zadd', KEYS[1], ARGV[1], ARGV[2])
+end
+return 0
+"""
+ZREM_IF_LOADED = """
+redis.call('incr', KEYS[2])
+redis.call('expire', KEYS[2], ARGV[2])
+return redis.call('zrem', KEYS[1], ARGV[1])
+"""
+# Renaming the loaded set to the set key, unless the version moved since
+# its rows were read.
+SWAP_IF_UNCHANGED = """
+if (redis.call('get', KEYS[3]) or '') ~= ARGV[1] then
+    return 0
+end
+if redis.call('exists', KEYS[1]) == 1 then
+    redis.call('del', KEYS[2])
+else
+    redis.call('rename', KEYS[2], KEYS[1])
+end
+return 1
+"""
+
+
+def _followers_key(profile_id:int) -> str:
+    return cache.make_key(f'followers_{profile_id}')
+
+def _followings_key(profile_id:int) -> str:
+    return cache.make_key(f'followings_{profile_id}')
+
+def _version_key(key:str) -> str:
+    return f'{key}_version'
+
+@lru_cache(maxsize=None)
+def _script(source:str):
+    return get_redis_connection('default').register_script(source)
+
+
+class ProfileIdList:
+    """
+    Lazy, sliceable view over one of the sets, so the paginators can call
+    `count()` and slice it like a QuerySet. Slicing reads the ids of the
+    page only and hydrates them with a single `in_bulk`, or leaves them
+    as ids when `hydrate` is False, for serializers batching the load.
+    """
+
+    def __init__(self, *, key:str, loader, hydrate:bool=True) -> None:
+        self.key = key
+        self.loader = loader
+        self.hydrate = hydrate
+        self.client = get_redis_connection('default')
+
+    def _ensure_loaded(self) -> None:
+        if self.client.exists(self.key):
+            return
+        for attempt in range(1, LOAD_ATTEMPTS + 1):
+            version = self.client.get(_version_key(self.key)) or b''
+            loading_key = f'{self.key}_loading_{uuid.uuid4().hex}'
+            pipe = self.client.pipeline()
+            pipe.zadd(loading_key, {SENTINEL: float('-inf')})
+            for profile_id, created_at in self.loader():
+                pipe.zadd(loading_key, {profile_id: created_at.timestamp()})
+            pipe.expire(loading_key, GRAPH_TIMEOUT)
+            pipe.execute()
+            if _script(SWAP_IF_UNCHANGED)(
+                keys=[self.key, loading_key, _version_key(self.key)], args=[version]
+            ):
+                return
+            if attempt < LOAD_ATTEMPTS:
+                self.client.delete(loading_key)
+        # As right as the rows it was read from, only not kept for others.
+        self.client.expire(loading_key, UNKEPT_TIMEOUT)
+        self.key = loading_key
+
+    def count(self) -> int:
+        self._ensure_loaded()
+        return max(self.client.zcard(self.key) - 1, 0)
+
+    def __len__(self) -> int:
+        return self.count()
+
+    def __iter__(self):
+        return iter(self[0:len(self)])
+
+    def __getitem__(self, item):
+        if not isinstance(item, slice):
+            return self[item:item + 1][0]
+
+        start = item.start or 0
+        if item.stop is not None and item.stop <= start:
+            return []
+        stop = item.stop - 1 if item.stop is not None else -1
+
+        self._ensure_loaded()
+        ids = [
+            int(member) for member in self.client.zrevrange(self.key, start, stop)
+            if member.decode() != SENTINEL
+        ]
+        if not self.hydrate:
+            return ids
+        profiles = Profile.objects.in_bulk(ids)
+        return [profiles[profile_id] for profile_id in ids if profile_id in profiles]
+
+
+def followers_of(*, profile:Profile, hydrate:bool=True) -> ProfileIdList:
+    return ProfileIdList(
+        key=_followers_key(profile.id), hydrate=hydrate,
+        loader=lambda: Subscription.objects.filter(
+            target=profile
+        ).values_list('follower_id', 'created_at').iterator()
+    )
+
+def followings_of(*, profile:Profile, hydrate:bool=True) -> ProfileIdList:
+    return ProfileIdList(
+        key=_followings_key(profile.id), hydrate=hydrate,
+        loader=lambda: Subscription.objects.filter(
+            follower=profile
+        ).values_list('target_id', 'created_at').iterator()
+    )
+
+def add_subscription(*, subscription:Subscription) -> None:
+    score = subscription.created_at.timestamp()
+    for key, member in (
+        (_followers_key(subscription.target_id), subscription.follower_id),
+        (_followings_key(subscription.follower_id), subscription.target_id),
+    ):
+        _script(ZADD_IF_LOADED)(
+            keys=[key, _version_key(key)], args=[score, member, GRAPH_TIMEOUT]
+        )
+
+def remove_subscription(*, follower_id:int, target_id:int) -> None:
+    for key, member in (
+        (_followers_key(target_id), follower_id),
+        (_followings_key(follower_id), target_id),
+    ):
+        _script(ZREM_IF_LOADED)(
+            keys=[key, _version_key(key)], args=[member, GRAPH_TIMEOUT]
+        )
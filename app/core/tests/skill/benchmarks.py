@@ -0,0 +1,175 @@
+import itertools
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import (
+    RequestFactory,
+    TestCase
+)
+from rest_framework.request import Request
+
+from skill.apis import (
+    CategoryApiView,
+    PubCategoryApiView,
+    PubSkillApiView,
+    SkillApiView
+)
+from skill.models import (
+    Category,
+    Skill
+)
+from ...benchmarking import BenchmarkTestMixin
+from ...selectors.skills import (
+    category_choices,
+    get_all_categories,
+    get_all_skills,
+    get_published_skills,
+    published_categories_catalog,
+    published_skills_catalog
+)
+from ...services.skills import (
+    create_skill,
+    export_catalog,
+    import_catalog,
+    publish_categories,
+    publish_skills
+)
+
+
+class SkillBenchmarks(BenchmarkTestMixin):
+    """Run once per catalog size, in skills, by the TestCases below."""
+
+    @classmethod
+    def setUpTestData(cls) -> None:
+        cache.delete_pattern('*')
+        call_command(
+            'seed_perf', users=10, follows=2, categories=cls.dataset_size // 25,
+            seed=1, stdout=StringIO()
+        )
+        cls.category = Category.objects.order_by('id').first()
+        cls.category_slugs = list(Category.objects.values_list('slug', flat=True))
+        cls.skill_slugs = list(Skill.objects.order_by('id').values_list('slug', flat=True)[:100])
+        cls.rows = list(itertools.islice(export_catalog(), 100))
+        cls.names = itertools.count()
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cache.delete_pattern('*')
+        super().tearDownClass()
+
+    def request(self):
+        return Request(RequestFactory().get('/'))
+
+    def test_get_all_skills(self):
+        self.assertWithinBaseline('selectors.skills.get_all_skills', lambda: list(get_all_skills()))
+
+    def test_get_all_categories(self):
+        self.assertWithinBaseline(
+            'selectors.skills.get_all_categories', lambda: list(get_all_categories())
+        )
+
+    def test_get_published_skills(self):
+        self.assertWithinBaseline(
+            'selectors.skills.get_published_skills',
+            lambda: list(get_published_skills(category=self.category))
+        )
+
+    def test_published_skills_catalog(self):
+        self.assertWithinBaseline(
+            'selectors.skills.published_skills_catalog', published_skills_catalog
+        )
+
+    def test_category_choices(self):
+        self.assertWithinBaseline('selectors.skills.category_choices', category_choices)
+
+    def test_create_skill(self):
+        self.assertWithinBaseline(
+            'services.skills.create_skill',
+            lambda: create_skill(name=f'Benchmark {next(self.names)}', category=self.category)
+        )
+
+    # The bulk writes update the same rows every round, within the one
+    # transaction of the test; a few rounds keep the dead rows they leave
+    # from slowing the later ones down.
+    def test_publish_skills(self):
+        self.assertWithinBaseline(
+            'services.skills.publish_skills',
+            lambda: publish_skills(slugs=self.skill_slugs), rounds=5
+        )
+
+    def test_publish_categories_with_cascade(self):
+        self.assertWithinBaseline(
+            'services.skills.publish_categories',
+            lambda: publish_categories(slugs=self.category_slugs, cascade=True), rounds=5
+        )
+
+    def test_import_catalog(self):
+        self.assertWithinBaseline(
+            'services.skills.import_catalog', lambda: import_catalog(rows=self.rows), rounds=5
+        )
+
+    def test_export_catalog(self):
+        self.assertWithinBaseline(
+            'services.skills.export_catalog', lambda: list(export_catalog())
+        )
+
+    def test_pub_skill_serializer(self):
+        skills = published_skills_catalog()
+        request = self.request()
+        self.assertWithinBaseline(
+            'serializers.PubSkillApiView.OutputSkillSerializer',
+            lambda: PubSkillApiView.OutputSkillSerializer(
+                skills, many=True, context={'request': request}
+            ).data
+        )
+
+    def test_pub_category_serializer(self):
+        categories = published_categories_catalog()
+        request = self.request()
+        self.assertWithinBaseline(
+            'serializers.PubCategoryApiView.OutputCategorySerializer',
+            lambda: PubCategoryApiView.OutputCategorySerializer(
+                categories, many=True, context={'request': request}
+            ).data
+        )
+
+    def test_category_serializer(self):
+        categories = list(get_all_categories())
+        request = self.request()
+        self.assertWithinBaseline(
+            'serializers.CategoryApiView.OutputCategorySerializer',
+            lambda: CategoryApiView.OutputCategorySerializer(
+                categories, many=True, context={'request': request}
+            ).data
+        )
+
+    def test_skill_serializer(self):
+        skills = list(get_all_skills())
+        request = self.request()
+        self.assertWithinBaseline(
+            'serializers.SkillApiView.OutputSkillSerializer',
+            lambda: SkillApiView.OutputSkillSerializer(
+                skills, many=True, context={'request': request}
+            ).data
+        )
+
+    def test_input_skill_serializer(self):
+        def validate() -> bool:
+            return SkillApiView.InputSkillSerializer(
+                data={'name': 'Benchmark', 'category': self.category.name}
+            ).is_valid()
+
+        self.assertWithinBaseline('serializers.SkillApiView.InputSkillSerializer', validate)
+
+
+class SkillBenchmarks100(SkillBenchmarks, TestCase):
+    dataset_size = 100
+
+
+class SkillBenchmarks1000(SkillBenchmarks, TestCase):
+    dataset_size = 1000
+
+
+class SkillBenchmarks5000(SkillBenchmarks, TestCase):
+    dataset_size = 5000
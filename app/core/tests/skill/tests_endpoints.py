@@ -1,9 +1,11 @@
-from django.test import TestCase
+from asgiref.sync import sync_to_async
+from django.test import TestCase, AsyncRequestFactory
 from django.core.cache import cache
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APIClient
 
+from skill import apis
 from users.models import BaseUser
 from skill.models import (
     Category,
@@ -11,7 +13,8 @@ from skill.models import (
 )
 from ...services.skills import (
     create_category,
-    create_skill
+    create_skill,
+    publish_skill
 )
 
 CATEGORY_URL = reverse('skill:categories')
@@ -40,6 +43,29 @@ class TestPublicSkillEndpoints(TestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(len(response.data), 2)
 
+    def test_list_published_skills_with_etag(self):
+        cat = create_category(name='Backend Developer')
+        skill = create_skill(name='Django', category=cat)
+        publish_skill(slug=skill.slug)
+
+        response = self.client.get(PUB_SKILL_URL)
+        etag = response['ETag']
+
+        self.assertEqual(response.data[0]['name'], 'Django')
+        self.assertTrue(response.data[0]['select_user_skill_url'].startswith('http://testserver/'))
+
+        response = self.client.get(PUB_SKILL_URL, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response.content, b'')
+
+        publish_skill(slug=create_skill(name='FastAPI', category=cat).slug)
+        response = self.client.get(PUB_SKILL_URL, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(len(response.data), 2)
+
     def test_list_published_categories_with_unauthenticated_user_successfully(self):
         cat1 = create_category(name='Backend Development')
         cat1.published = True
@@ -121,6 +147,25 @@ class TestPublicSkillEndpoints(TestCase):
 
         self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
 
+    async def test_async_published_skills_with_etag(self):
+        cat = await sync_to_async(create_category)(name='Backend Developer')
+        skill = await sync_to_async(create_skill)(name='Django', category=cat)
+        await sync_to_async(publish_skill)(slug=skill.slug)
+        factory = AsyncRequestFactory()
+
+        response = await apis.AsyncPubSkillApiView.as_view()(factory.get(PUB_SKILL_URL))
+        expected = await sync_to_async(self.client.get)(PUB_SKILL_URL)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.content, expected.content)
+        self.assertEqual(response['ETag'], expected['ETag'])
+
+        response = await apis.AsyncPubSkillApiView.as_view()(
+            factory.get(PUB_SKILL_URL, headers={'If-None-Match': expected['ETag']})
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
 
 class TestPrivateSkillEndpoints(TestCase):
     
@@ -186,11 +231,6 @@ class TestPrivateSkillEndpoints(TestCase):
             'name': 'FastAPI',
             'category': 'Backend'
         }
-        cache.set(
-            key='category_choices',
-            value=list(Category.objects.filter(published=True).values_list('name', flat=True)),
-            timeout=None
-        )
         response = self.admin_client.post(SKILL_URL, payload)
 
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
@@ -320,3 +360,25 @@ class TestPrivateSkillEndpoints(TestCase):
         self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
         sample_skill.refresh_from_db()
         self.assertFalse(sample_skill.published)
+
+    def test_bulk_unpublish_categories_with_cascade_successfully(self):
+        sample_category = create_category(name='Backend')
+        sample_skill = create_skill(category=sample_category, name='Django')
+        Category.objects.update(published=True)
+        Skill.objects.update(published=True)
+
+        url = reverse('skill:unpublish_categories')
+        response = self.admin_client.post(
+            url, {'slugs': [sample_category.slug], 'cascade': True}, format='json'
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, {'updated': 1, 'cascaded': 1})
+        sample_skill.refresh_from_db()
+        self.assertFalse(sample_skill.published)
+
+    def test_bulk_publish_skills_with_normal_user_unsuccessfully(self):
+        url = reverse('skill:publish_skills')
+        response = self.normal_client.post(url, {'slugs': ['django']}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
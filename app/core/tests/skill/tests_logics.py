@@ -1,3 +1,8 @@
+import os
+import tempfile
+
+from django.core.exceptions import ValidationError
+from django.core.management import call_command
 from django.test import TestCase
 
 from skill.models import (
@@ -8,11 +13,18 @@ from ...services.skills import (
     create_category,
     create_skill,
     publish_category,
-    publish_skill
+    publish_skill,
+    unpublish_skill,
+    publish_categories,
+    unpublish_categories,
+    publish_skills,
+    import_catalog
 )
 from ...selectors.skills import (
     get_published_categories,
     get_published_skills,
+    published_skills_catalog,
+    category_choices
 )
 
 class TestSkillLogics(TestCase):
@@ -79,3 +91,111 @@ class TestSkillLogics(TestCase):
         publish_skill(slug=sample_skill.slug)
         sample_skill.refresh_from_db()
         self.assertTrue(sample_skill.published)
+
+    def test_published_skills_catalog_cached_until_skill_writes(self):
+        category = create_category(name='Backend')
+        skill = create_skill(name='Django', category=category)
+        publish_skill(slug=skill.slug)
+
+        self.assertEqual(
+            published_skills_catalog(), ({'name': 'Django', 'slug': 'django'}, )
+        )
+        with self.assertNumQueries(0):
+            published_skills_catalog()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            unpublish_skill(slug=skill.slug)
+            # Readers keep the committed catalog until the commit.
+            self.assertEqual(len(published_skills_catalog()), 1)
+        self.assertEqual(published_skills_catalog(), ())
+
+    def test_publish_categories_cascades_in_one_statement(self):
+        backend = create_category(name='Backend')
+        frontend = create_category(name='Frontend')
+        for name, category in (('Django', backend), ('Flask', backend), ('React', frontend)):
+            create_skill(name=name, category=category)
+
+        # The UPDATE of both tables, in a savepoint.
+        with self.captureOnCommitCallbacks(execute=True), self.assertNumQueries(1 + 2):
+            counts = publish_categories(slugs=['backend', 'frontend'], cascade=True)
+
+        self.assertEqual(counts, {'updated': 2, 'cascaded': 3})
+        self.assertFalse(Skill.objects.filter(published=False).exists())
+        self.assertEqual(sorted(category_choices()), ['Backend', 'Frontend'])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            unpublish_categories(slugs=['frontend'])
+        self.assertEqual(category_choices(), ('Backend', ))
+        self.assertTrue(Skill.objects.get(name='React').published)
+
+    def test_publish_skills_with_unknown_slug_rolls_back(self):
+        category = create_category(name='Backend')
+        create_skill(name='Django', category=category)
+
+        with self.assertRaises(ValidationError):
+            publish_skills(slugs=['django', 'rails'])
+        self.assertFalse(Skill.objects.get(name='Django').published)
+
+    def test_import_catalog_upserts_in_batches(self):
+        create_category(name='Backend')
+        rows = [
+            {'name': 'Django', 'category': 'Backend', 'published': True},
+            {'name': 'React', 'category': 'Frontend'},
+            {'name': 'Vue', 'category': 'Frontend', 'published': True},
+            {'name': 'Django', 'category': 'Web', 'published': False},
+        ]
+
+        # Per batch, the lookup of the new category names and the inserts
+        # of categories and skills, the first batch upserting the skills
+        # with and without a publish state apart; plus the savepoint pair.
+        with self.assertNumQueries(4 + 3 + 2):
+            self.assertEqual(import_catalog(rows=rows, batch_size=2), 4)
+
+        django = Skill.objects.select_related('category').get(name='Django')
+        self.assertEqual((django.category.name, django.published), ('Web', False))
+        self.assertEqual(Category.objects.count(), 3)
+        self.assertEqual(Skill.objects.count(), 3)
+        self.assertEqual(published_skills_catalog(), ({'name': 'Vue', 'slug': 'vue'}, ))
+
+    def test_import_catalog_keeps_publish_state_rows_leave_out(self):
+        category = create_category(name='Backend')
+        publish_category(slug=category.slug)
+        publish_skill(slug=create_skill(name='Django', category=category).slug)
+        create_category(name='Frontend')
+
+        import_catalog(rows=[
+            {'name': 'Django', 'category': 'Backend'},
+            {'name': 'React', 'category': 'Frontend', 'category_published': True},
+        ])
+
+        self.assertEqual(
+            list(Skill.objects.order_by('name').values_list(
+                'name', 'published', 'category__name', 'category__published'
+            )),
+            [('Django', True, 'Backend', True), ('React', False, 'Frontend', True)]
+        )
+
+    def test_export_then_import_catalog_commands(self):
+        category = create_category(name='Backend')
+        publish_category(slug=category.slug)
+        publish_skill(slug=create_skill(name='Django', category=category).slug)
+        create_skill(name='Flask', category=category)
+        directory = tempfile.mkdtemp()
+        self.addCleanup(lambda: [os.remove(os.path.join(directory, name)) for name in os.listdir(directory)])
+
+        for file_format in ('csv', 'jsonl'):
+            path = os.path.join(directory, f'catalog.{file_format}')
+            call_command('export_catalog', path, format=file_format, stderr=open(os.devnull, 'w'))
+            Skill.objects.all().delete()
+            Category.objects.all().delete()
+            call_command('import_catalog', path, stdout=open(os.devnull, 'w'))
+            # Onto the existing catalog, the publish states are restored too.
+            unpublish_categories(slugs=[category.slug], cascade=True)
+            call_command('import_catalog', path, stdout=open(os.devnull, 'w'))
+
+            self.assertEqual(
+                list(Skill.objects.order_by('name').values_list(
+                    'name', 'published', 'category__name', 'category__published'
+                )),
+                [('Django', True, 'Backend', True), ('Flask', False, 'Backend', True)]
+            )
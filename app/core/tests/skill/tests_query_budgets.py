@@ -0,0 +1,68 @@
+from django.test import TestCase
+from django.urls import reverse
+from django.core.cache import cache
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from users.models import BaseUser
+from ...query_inspection import QueryBudgetTestMixin
+from ...services.skills import (
+    create_category,
+    create_skill,
+    publish_category,
+    publish_skill
+)
+
+
+class TestSkillQueryBudgets(QueryBudgetTestMixin, TestCase):
+    """Every endpoint stays within the `query_budget` of its view, with
+    enough rows around that an N+1 would show."""
+
+    def setUp(self) -> None:
+        self.client = APIClient()
+        admin = BaseUser.objects.create_superuser(
+            phone_number='09131111111', password='1234@example.com'
+        )
+        self.client.force_authenticate(admin)
+        for category_index in range(3):
+            category = create_category(name=f'Category {category_index}')
+            publish_category(slug=category.slug)
+            for skill_index in range(3):
+                skill = create_skill(category=category, name=f'Skill {category_index}{skill_index}')
+                publish_skill(slug=skill.slug)
+        cache.delete_pattern('*')
+
+    def tearDown(self) -> None:
+        cache.delete_pattern('*')
+
+    def test_endpoints_within_budget(self):
+        self.assertEndpointWithinBudget('get', reverse('skill:categories'))
+        self.assertEndpointWithinBudget('get', reverse('skill:skills'))
+        self.assertEndpointWithinBudget('get', reverse('skill:pub_categories'))
+        self.assertEndpointWithinBudget('get', reverse('skill:pub_skills'))
+        self.assertEndpointWithinBudget(
+            'post', reverse('skill:categories'), {'name': 'Design'},
+            status_code=status.HTTP_201_CREATED
+        )
+        self.assertEndpointWithinBudget('get', reverse('skill:category_detail', args=['design']))
+        self.assertEndpointWithinBudget(
+            'post', reverse('skill:skills'), {'name': 'Figma', 'category': 'Design'},
+            status_code=status.HTTP_201_CREATED
+        )
+        self.assertEndpointWithinBudget(
+            'delete', reverse('skill:unpublish_category', args=['design']),
+            status_code=status.HTTP_204_NO_CONTENT
+        )
+        self.assertEndpointWithinBudget(
+            'delete', reverse('skill:unpublish_skill', args=['skill-00']),
+            status_code=status.HTTP_204_NO_CONTENT
+        )
+        self.assertEndpointWithinBudget('get', reverse('skill:skill_detail', args=['skill-00']))
+        self.assertEndpointWithinBudget(
+            'post', reverse('skill:unpublish_categories'),
+            {'slugs': ['category-0', 'category-1'], 'cascade': True}, format='json'
+        )
+        self.assertEndpointWithinBudget(
+            'post', reverse('skill:publish_skills'),
+            {'slugs': ['skill-00', 'skill-01']}, format='json'
+        )
@@ -0,0 +1,36 @@
+import os
+import time
+from unittest.mock import patch
+
+from django.test import TestCase
+
+from users.models import Profile
+from ..benchmarking import BenchmarkTestMixin
+
+
+class TestBenchmarkBaselines(BenchmarkTestMixin, TestCase):
+    dataset_size = 1
+    rounds = 3
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        # Neither record these made-up baselines nor skip their checks
+        # when the suite runs with BENCHMARK_SAVE set.
+        cls.enterClassContext(patch.dict(os.environ))
+        os.environ.pop('BENCHMARK_SAVE', None)
+        super().setUpClass()
+
+    def test_more_queries_than_the_baseline_fail(self):
+        self.baselines = {'count[1]': {'min_ms': 1000, 'queries': 0}}
+
+        self.assertWithinBaseline('count', lambda: None)
+        with self.assertRaisesMessage(AssertionError, 'ran 1 queries, 0 in its baseline'):
+            self.assertWithinBaseline('count', Profile.objects.count)
+
+    def test_slower_than_the_baseline_fails(self):
+        self.baselines = {'count[1]': {'min_ms': 0, 'queries': 1}}
+
+        with self.assertRaisesMessage(AssertionError, 'in its baseline'):
+            self.assertWithinBaseline(
+                'count', lambda: (Profile.objects.count(), time.sleep(0.01))
+            )
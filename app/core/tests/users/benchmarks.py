@@ -0,0 +1,220 @@
+import itertools
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import (
+    RequestFactory,
+    TestCase
+)
+
+from skill.models import Skill
+from users.apis import (
+    LeaderboardApiView,
+    ListFreelancersApiView,
+    ListMyFollowersApiView,
+    MySkillsApiView,
+    ProfileDetailApiView,
+    RegistrationApiView
+)
+from users.models import (
+    Profile,
+    Subscription
+)
+from ...batching import (
+    get_loader,
+    prefetch
+)
+from ...benchmarking import BenchmarkTestMixin
+from ...selectors.users import (
+    filter_freelancers,
+    freelancer_facets,
+    get_freelancers,
+    leaderboard,
+    my_followers,
+    my_skills,
+    search_freelancers
+)
+from ...services.users import (
+    profile_detail,
+    reconcile_subscription_counts,
+    register,
+    select_skills,
+    subscribe,
+    unselect_skill,
+    unsubscribe,
+    update_score
+)
+
+
+class UsersBenchmarks(BenchmarkTestMixin):
+    """Run once per dataset size by the TestCases below."""
+
+    @classmethod
+    def setUpTestData(cls) -> None:
+        cache.delete_pattern('*')
+        call_command(
+            'seed_perf', users=cls.dataset_size, follows=10, categories=4,
+            seed=1, stdout=StringIO()
+        )
+        cls.popular = Profile.objects.order_by('-followers_count', 'id').first()
+        cls.profile = Profile.objects.select_related('user').order_by('id').first()
+        cls.target = Profile.objects.exclude(
+            id=cls.profile.id
+        ).exclude(
+            id__in=Subscription.objects.filter(follower=cls.profile).values('target')
+        ).order_by('id').first()
+        cls.skill = Skill.objects.exclude(skill_profile=cls.profile).order_by('id').first()
+        cls.phone_numbers = itertools.count()
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cache.delete_pattern('*')
+        super().tearDownClass()
+
+    def request(self):
+        return RequestFactory().get('/')
+
+    def test_get_freelancers(self):
+        self.assertWithinBaseline(
+            'selectors.users.get_freelancers', lambda: list(get_freelancers()[:20])
+        )
+
+    def test_filter_freelancers(self):
+        self.assertWithinBaseline(
+            'selectors.users.filter_freelancers',
+            lambda: list(filter_freelancers(city='Tehran', sex='F')[:20])
+        )
+
+    def test_search_freelancers(self):
+        self.assertWithinBaseline(
+            'selectors.users.search_freelancers',
+            lambda: list(search_freelancers(query='backend developer')[:20])
+        )
+
+    def test_freelancer_facets(self):
+        self.assertWithinBaseline(
+            'selectors.users.freelancer_facets',
+            lambda: freelancer_facets(freelancers=filter_freelancers(city='Tehran'))
+        )
+
+    def test_leaderboard(self):
+        self.assertWithinBaseline('selectors.users.leaderboard', lambda: leaderboard(limit=20))
+
+    def test_my_followers(self):
+        self.assertWithinBaseline(
+            'selectors.users.my_followers', lambda: my_followers(profile=self.popular)[0:15]
+        )
+
+    def test_register(self):
+        # Hashing the password is most of it.
+        self.assertWithinBaseline(
+            'services.users.register',
+            lambda: register(
+                phone_number=f'0914{next(self.phone_numbers):07d}', email=None,
+                password='1234@example.com'
+            ),
+            rounds=5
+        )
+
+    def test_profile_detail(self):
+        self.assertWithinBaseline(
+            'services.users.profile_detail',
+            lambda: profile_detail(uuid=self.profile.uuid, serialize=ProfileDetailApiView.serialize)
+        )
+
+    def test_subscribe_and_unsubscribe(self):
+        def subscribe_and_unsubscribe() -> None:
+            subscribe(follower=self.profile, target_uuid=self.target.uuid)
+            unsubscribe(un_follower=self.profile, target_uuid=self.target.uuid)
+
+        self.assertWithinBaseline(
+            'services.users.subscribe_and_unsubscribe', subscribe_and_unsubscribe
+        )
+
+    def test_select_and_unselect_skill(self):
+        def select_and_unselect() -> None:
+            select_skills(user=self.profile.user, slugs=[self.skill.slug])
+            unselect_skill(user=self.profile.user, slug=self.skill.slug)
+
+        self.assertWithinBaseline('services.users.select_and_unselect_skill', select_and_unselect)
+
+    def test_update_score(self):
+        self.assertWithinBaseline(
+            'services.users.update_score',
+            lambda: update_score(profile_id=self.profile.id, score=42)
+        )
+
+    def test_reconcile_subscription_counts(self):
+        self.assertWithinBaseline(
+            'services.users.reconcile_subscription_counts',
+            reconcile_subscription_counts, rounds=3
+        )
+
+    def test_freelancer_serializer(self):
+        profiles = list(get_freelancers()[:20])
+        request = self.request()
+        self.assertWithinBaseline(
+            'serializers.ListFreelancersApiView.OutputFreelancerSerializer',
+            lambda: ListFreelancersApiView.OutputFreelancerSerializer(
+                profiles, many=True, context={'request': request}
+            ).data
+        )
+
+    def test_leaderboard_serializer(self):
+        profiles = leaderboard(limit=20)
+        request = self.request()
+        self.assertWithinBaseline(
+            'serializers.LeaderboardApiView.OutputLeaderboardSerializer',
+            lambda: LeaderboardApiView.OutputLeaderboardSerializer(
+                profiles, many=True, context={'request': request}
+            ).data
+        )
+
+    def test_profile_serializer(self):
+        self.assertWithinBaseline(
+            'serializers.ProfileDetailApiView.serialize',
+            lambda: ProfileDetailApiView.serialize(self.profile)
+        )
+
+    def test_followers_serializer(self):
+        ids = my_followers(profile=self.popular, hydrate=False)[0:15]
+
+        def serialize():
+            # A new request each time, so the loader doesn't keep the rows.
+            request = self.request()
+            serializer = ListMyFollowersApiView.SubscriptionSerializer(
+                ids, many=True, context={'request': request}
+            )
+            prefetch(serializer, ids, loader=get_loader(request))
+            return serializer.data
+
+        self.assertWithinBaseline(
+            'serializers.ListMyFollowersApiView.SubscriptionSerializer', serialize
+        )
+
+    def test_my_skills_serializer(self):
+        self.assertWithinBaseline(
+            'serializers.MySkillsApiView.MySkillsSerializer',
+            lambda: MySkillsApiView.MySkillsSerializer(
+                my_skills(user=self.profile.user), many=True
+            ).data
+        )
+
+    def test_register_serializer(self):
+        self.assertWithinBaseline(
+            'serializers.RegistrationApiView.OutputRegisterSerializer',
+            lambda: RegistrationApiView.OutputRegisterSerializer(self.profile.user).data
+        )
+
+
+class UsersBenchmarks100(UsersBenchmarks, TestCase):
+    dataset_size = 100
+
+
+class UsersBenchmarks1000(UsersBenchmarks, TestCase):
+    dataset_size = 1000
+
+
+class UsersBenchmarks5000(UsersBenchmarks, TestCase):
+    dataset_size = 5000
@@ -0,0 +1,83 @@
+from django.test import TestCase, RequestFactory
+from rest_framework import serializers
+
+from skill.models import (
+    Category,
+    Skill
+)
+from users.models import (
+    Profile,
+    ProfileSkill
+)
+from ...batching import (
+    BatchedField,
+    get_loader,
+    prefetch
+)
+from ...services.skills import (
+    create_category,
+    create_skill,
+    publish_skill
+)
+from ...services.users import (
+    register,
+    select_skills
+)
+
+
+class SkillSerializer(serializers.Serializer):
+    name = serializers.CharField()
+    category = BatchedField(source='category_id', model=Category, attribute='name')
+
+
+class ProfileSkillSerializer(serializers.Serializer):
+    email = BatchedField(source='profile_id_id', model=Profile, attribute='email')
+    skill = BatchedField(source='skill_id_id', model=Skill, serializer=SkillSerializer)
+
+
+class TestBatchedFields(TestCase):
+
+    def test_prefetch_loads_one_batch_per_model_and_level(self):
+        for name in ('Backend', 'Frontend'):
+            category = create_category(name=name)
+            skill = create_skill(category=category, name=f'{name} skill')
+            publish_skill(slug=skill.slug)
+        slugs = list(Skill.objects.values_list('slug', flat=True))
+        for index in range(3):
+            user = register(
+                phone_number=f'0913111111{index}', email=f'user{index}@example.com',
+                password='1234@example.com'
+            )
+            select_skills(user=user, slugs=slugs)
+        rows = list(ProfileSkill.objects.order_by('id'))
+        request = RequestFactory().get('/')
+
+        serializer = ProfileSkillSerializer(rows, many=True, context={'request': request})
+        # Profiles and skills, then the categories of the skills.
+        with self.assertNumQueries(3):
+            prefetch(serializer, rows, loader=get_loader(request))
+            data = serializer.data
+
+        self.assertEqual(len(data), 6)
+        self.assertEqual(data[0]['email'], 'user0@example.com')
+        self.assertEqual(
+            {(row['skill']['name'], row['skill']['category']) for row in data},
+            {('Backend skill', 'Backend'), ('Frontend skill', 'Frontend')}
+        )
+
+    def test_rows_loaded_with_some_fields_loaded_again_for_the_others(self):
+        ids = [create_category(name=name).id for name in ('Backend', 'Frontend', 'Design')]
+        loader = get_loader(RequestFactory().get('/'))
+        for pk in ids:
+            loader.want(Category, pk, fields=('name',))
+        loader.resolve()
+
+        with self.assertNumQueries(1):
+            for pk in ids:
+                loader.want(Category, pk)
+            loader.resolve()
+            published = [loader.get(Category, pk).published for pk in ids]
+            names = [loader.get(Category, pk, fields=('name',)).name for pk in ids]
+
+        self.assertEqual(published, [False] * 3)
+        self.assertEqual(names, ['Backend', 'Frontend', 'Design'])
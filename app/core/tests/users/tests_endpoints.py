@@ -1,10 +1,33 @@
-from django.test import TestCase
+import io
+import json
+import os
+import shutil
+import tempfile
+from base64 import urlsafe_b64encode
+
+from asgiref.sync import sync_to_async
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, AsyncRequestFactory, override_settings
 from django.urls import reverse
 from django.core.cache import cache
 from unittest.mock import patch
 from rest_framework.test import APIClient
 from rest_framework import status
+from rest_framework_simplejwt.tokens import (
+    AccessToken,
+    RefreshToken
+)
+
+from PIL import Image
 
+from core.authentication import revoke_user_tokens
+from core.jobs import (
+    Worker,
+    get_queue
+)
+from core.otp import consume_otp
+from core.rate_limit import get_rate_limiter
+from users import apis
 from skill.models import Skill
 from users.models import (
     BaseUser,
@@ -17,8 +40,10 @@ from ...services.skills import (
     publish_skill
 )
 from ...services.users import (
+    deactivate_user,
     register,
-    subscribe
+    subscribe,
+    update_score
 )
 
 REGISTRATION_URL = reverse('users:registration')
@@ -29,6 +54,9 @@ FOLLOWINGS_URL = reverse('users:followings')
 VERIFICATION_URL = reverse('users:verification')
 RESEND_OTP_URL = reverse('users:resend_otp')
 MY_SKILLS = reverse('users:my_skills')
+SELECT_SKILLS_URL = reverse('users:select_skills')
+JWT_LOGIN_URL = reverse('users:jwt_login')
+JWT_REFRESH_URL = reverse('users:jwt_refresh')
 
 
 class TestPublicUserEndpoints(TestCase):
@@ -36,6 +64,7 @@ class TestPublicUserEndpoints(TestCase):
 
     def setUp(self) -> None:
         self.client = APIClient()
+        get_rate_limiter().reset()
     
     def tearDown(self) -> None:
         cache.delete_pattern('*')
@@ -79,6 +108,22 @@ class TestPublicUserEndpoints(TestCase):
             ).exists()
         )
     
+    def test_registration_endpoint_with_taken_phone_number(self):
+        register(
+            phone_number='09131111111', email=None, password='1234@example.com'
+        )
+        payload = {
+            'phone_number': '09131111111',
+            'password': '1234@example.com',
+            'confirm_password': '1234@example.com',
+        }
+
+        response = self.client.post(REGISTRATION_URL, payload, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('phone_number', response.data)
+        self.assertEqual(BaseUser.objects.count(), 1)
+
     def test_retrieve_profile_successfully(self):
         response = self.client.get(GET_PROFILE_URL)
 
@@ -100,6 +145,164 @@ class TestPublicUserEndpoints(TestCase):
         response = self.client.get(GET_FREELANCERS_URL)
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_get_freelancers_list_with_cursor_pagination(self):
+        for index, score in enumerate([50, 80, 80, 10, 80]):
+            user = register(
+                phone_number=f'0913111111{index}', email=None, password='1234@example.com'
+            )
+            Profile.objects.filter(user=user).update(score=score)
+        expected = list(
+            Profile.objects.order_by('-score', '-id').values_list('uuid', flat=True)
+        )
+
+        uuids = []
+        url = f'{GET_FREELANCERS_URL}?limit=2'
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertNotIn('count', response.data)
+            uuids += [row['absolute_url'].rstrip('/').split('/')[-1] for row in response.data['results']]
+            last_page = response.data
+            url = response.data['next']
+
+        self.assertEqual(uuids, expected)
+
+        response = self.client.get(last_page['previous'])
+        self.assertEqual(
+            [row['absolute_url'].rstrip('/').split('/')[-1] for row in response.data['results']],
+            expected[2:4]
+        )
+
+    def test_search_freelancers_endpoint(self):
+        user = register(
+            phone_number='09131111111', email=None, password='1234@example.com'
+        )
+        Profile.objects.filter(user=user).update(bio='Senior backend developer')
+
+        response = self.client.get(reverse('users:freelancers_search'), {'q': 'backend'})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['count'], 1)
+
+        response = self.client.get(reverse('users:freelancers_search'))
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_leaderboard_endpoint(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            for index, score in enumerate([50, 80, 10]):
+                user = register(
+                    phone_number=f'0913111111{index}', email=None, password='1234@example.com'
+                )
+                update_score(profile_id=user.profile.id, score=score)
+
+        response = self.client.get(reverse('users:leaderboard'), {'limit': 2})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [(row['rank'], row['score']) for row in response.data], [(1, 80), (2, 50)]
+        )
+
+        response = self.client.get(reverse('users:leaderboard'), {'limit': 0})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_leaderboard_endpoint_with_unknown_or_both_filters(self):
+        for params in ({'skill': 'missing'}, {'category': 'missing'}, {'around': 'missing'}):
+            response = self.client.get(reverse('users:leaderboard'), params)
+
+            self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND, params)
+
+        response = self.client.get(
+            reverse('users:leaderboard'), {'skill': 'django', 'category': 'backend'}
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_faceted_freelancers_endpoint(self):
+        user = register(
+            phone_number='09131111111', email=None, password='1234@example.com'
+        )
+        Profile.objects.filter(user=user).update(city='Tehran', sex='M')
+        register(
+            phone_number='09132222222', email=None, password='1234@example.com'
+        )
+
+        response = self.client.get(reverse('users:freelancers_facets'), {'sex': 'M'})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['count'], 1)
+        self.assertEqual(len(response.data['results']), 1)
+        self.assertEqual(response.data['facets']['city'], {'Tehran': 1})
+
+        response = self.client.get(reverse('users:freelancers_facets'), {'sex': 'X'})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    async def test_async_read_views_match_sync_ones(self):
+        for index, score in enumerate([50, 80, 10]):
+            user = await sync_to_async(register)(
+                phone_number=f'0913111111{index}', email=None, password='1234@example.com'
+            )
+            await Profile.objects.filter(user=user).aupdate(score=score)
+        profile = await Profile.objects.aget(user=user)
+        factory = AsyncRequestFactory()
+
+        response = await apis.AsyncListFreelancersApiView.as_view()(
+            factory.get(GET_FREELANCERS_URL, {'limit': 2})
+        )
+        expected = await sync_to_async(self.client.get)(GET_FREELANCERS_URL, {'limit': 2})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(json.loads(response.content), expected.json())
+
+        url = reverse('users:profile_detail', args=[profile.uuid])
+        response = await apis.AsyncProfileDetailApiView.as_view()(
+            factory.get(url), uuid=profile.uuid
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(json.loads(response.content)['views'], 1)
+
+        response = await apis.AsyncProfileDetailApiView.as_view()(
+            factory.get(url), uuid='missing'
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+    def test_verify_otp_throttled_by_phone_number(self):
+        payload = {'otp': 111111, 'phone_number': '09131111111'}
+
+        for _ in range(10):
+            response = self.client.post(VERIFICATION_URL, payload)
+            self.assertNotEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        response = self.client.post(VERIFICATION_URL, payload)
+
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertIn('Retry-After', response)
+
+        response = self.client.post(VERIFICATION_URL, {**payload, 'phone_number': '09132222222'})
+
+        self.assertNotEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+    def test_throttled_endpoints_reject_a_body_that_is_not_an_object(self):
+        for url in (REGISTRATION_URL, VERIFICATION_URL, RESEND_OTP_URL):
+            response = self.client.post(url, [1, 2], format='json')
+
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, url)
+
+    def test_get_freelancers_list_with_invalid_cursor(self):
+        response = self.client.get(f'{GET_FREELANCERS_URL}?cursor=invalid')
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_get_freelancers_list_with_tampered_cursor(self):
+        for position in (['abc', 1], [{'score': 1}, 1], [None, 1], [1, [2]]):
+            cursor = urlsafe_b64encode(json.dumps({'p': position, 'r': False}).encode()).decode()
+            response = self.client.get(f'{GET_FREELANCERS_URL}?cursor={cursor}')
+
+            self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND, position)
     
     def test_list_my_followers_with_unauthenticated_user(self):
         response = self.client.get(FOLLOWERS_URL)
@@ -140,7 +343,31 @@ class TestPublicUserEndpoints(TestCase):
             phone_number=phone_number, email=None, password='1234@example.com'
         )
 
-        self.assertTrue(cache.get(f'otp_{otp}_{phone_number}'))
+        self.assertTrue(consume_otp(otp=otp, phone_number=phone_number))
+
+    @patch('core.services.users.otp_generator')
+    def test_verify_otp_endpoint_activates_user(self, mocked):
+        mocked.return_value = 123456
+        user = register(
+            phone_number='09131111111', email=None, password='1234@example.com'
+        )
+
+        payload = {'otp': 123456, 'phone_number': '09131111111'}
+        response = self.client.post(VERIFICATION_URL, payload)
+        user.refresh_from_db()
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(user.is_active)
+
+        response = self.client.post(VERIFICATION_URL, payload)
+
+        self.assertEqual(response.status_code, status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+    def test_verify_otp_endpoint_requires_phone_number(self):
+        response = self.client.post(VERIFICATION_URL, {'otp': 123456})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('phone_number', response.data)
 
     def test_select_skills_with_unauthenticated_user_unsuccessfully(self):
         sample_category = create_category(name='Backend Development')
@@ -199,6 +426,93 @@ class TestPrivateUserEndpoints(TestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(self.user_obj.profile.email, payload['email'])
     
+    def sample_image(self, *, width:int, height:int, noise:bool=False) -> SimpleUploadedFile:
+        if noise:
+            image = Image.frombytes('RGB', (width, height), os.urandom(width * height * 3))
+        else:
+            image = Image.new('RGB', (width, height), color=(200, 30, 30))
+        buffer = io.BytesIO()
+        image.save(buffer, 'PNG')
+        return SimpleUploadedFile('avatar.png', buffer.getvalue(), content_type='image/png')
+
+    def test_uploaded_image_thumbnails_listed_once_rendered(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        get_queue.cache_clear()
+
+        with override_settings(MEDIA_ROOT=media_root):
+            with self.captureOnCommitCallbacks(execute=True):
+                response = self.client.patch(
+                    GET_PROFILE_URL, {'image': self.sample_image(width=800, height=600)},
+                    format='multipart'
+                )
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(
+                self.client.get(GET_FREELANCERS_URL).data['results'][0]['thumbnails'], {}
+            )
+
+            Worker().run(burst=True)
+            thumbnails = self.client.get(GET_FREELANCERS_URL).data['results'][0]['thumbnails']
+
+        self.assertEqual(set(thumbnails), {'96', '320'})
+        self.user_obj.profile.refresh_from_db()
+        with Image.open(
+            os.path.join(media_root, self.user_obj.profile.thumbnails['320'])
+        ) as thumbnail:
+            self.assertEqual((thumbnail.format, thumbnail.size), ('WEBP', (320, 240)))
+
+    def test_replaced_image_and_thumbnails_deleted(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        get_queue.cache_clear()
+
+        with override_settings(MEDIA_ROOT=media_root):
+            with self.captureOnCommitCallbacks(execute=True):
+                self.client.patch(
+                    GET_PROFILE_URL, {'image': self.sample_image(width=400, height=300)},
+                    format='multipart'
+                )
+            Worker().run(burst=True)
+            self.user_obj.profile.refresh_from_db()
+            previous = [
+                self.user_obj.profile.image.name, *self.user_obj.profile.thumbnails.values()
+            ]
+
+            with self.captureOnCommitCallbacks(execute=True):
+                self.client.patch(
+                    GET_PROFILE_URL, {'image': self.sample_image(width=400, height=300)},
+                    format='multipart'
+                )
+            Worker().run(burst=True)
+            self.user_obj.profile.refresh_from_db()
+            current = [
+                self.user_obj.profile.image.name, *self.user_obj.profile.thumbnails.values()
+            ]
+
+        self.assertEqual(len(previous), 3)
+        self.assertFalse(any(os.path.exists(os.path.join(media_root, name)) for name in previous))
+        self.assertTrue(all(os.path.exists(os.path.join(media_root, name)) for name in current))
+
+    @override_settings(MAX_PROFILE_IMAGE_DIMENSION=100)
+    def test_image_over_max_dimensions_refused(self):
+        response = self.client.patch(
+            GET_PROFILE_URL, {'image': self.sample_image(width=101, height=50)},
+            format='multipart'
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('image', response.data)
+
+    @override_settings(MAX_PROFILE_IMAG_SIZE_MB=0.01)
+    def test_image_over_max_size_refused_while_streaming(self):
+        response = self.client.patch(
+            GET_PROFILE_URL, {'image': self.sample_image(width=100, height=100, noise=True)},
+            format='multipart'
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('image', response.data)
+
     def test_subscribe_endpoint_successfully(self):
         sample_user = register(
             phone_number='09131234567',
@@ -313,6 +627,29 @@ class TestPrivateUserEndpoints(TestCase):
             Skill.objects.filter(profile_skill_sk__profile_id=self.user_obj.profile)
         )
 
+    def test_select_many_skills_with_authenticated_user(self):
+        sample_category = create_category(name='Backend')
+        skill1 = create_skill(category=sample_category, name='Django')
+        skill2 = create_skill(category=sample_category, name='FastAPI')
+        skill3 = create_skill(category=sample_category, name='Go')
+        publish_skill(slug=skill1.slug)
+        publish_skill(slug=skill2.slug)
+        self.client.get(reverse('users:select_skill', args=[skill1.slug]))
+
+        payload = {'slugs': [skill1.slug, skill2.slug, skill3.slug, 'rust']}
+        response = self.client.post(SELECT_SKILLS_URL, payload, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['outcomes'], {
+            skill1.slug: 'selected',
+            skill2.slug: 'selected',
+            skill3.slug: 'not_published',
+            'rust': 'not_found'
+        })
+        self.assertEqual(
+            ProfileSkill.objects.filter(profile_id=self.user_obj.profile).count(), 2
+        )
+
     def test_get_only_my_skills_with_authenticated_user_successfully(self):
         sample_category = create_category(name='Backend')
         skill1 = create_skill(category=sample_category, name='Django')
@@ -384,3 +721,64 @@ class TestPrivateUserEndpoints(TestCase):
         #     sample_skill1,
         #     Skill.objects.filter(profile_skill_sk__profile_id=self.user_obj.profile)
         # )
+
+
+class TestJwtAuthentication(TestCase):
+    """Requests authenticated by the claims of the token."""
+
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.user = register(
+            phone_number='09131111111', email=None, password='1234@example.com'
+        )
+        BaseUser.objects.filter(id=self.user.id).update(is_active=True)
+        response = self.client.post(
+            JWT_LOGIN_URL, {'phone_number': '09131111111', 'password': '1234@example.com'}
+        )
+        self.tokens = response.data
+
+    def tearDown(self) -> None:
+        cache.delete_pattern('*')
+
+    def authenticate(self, access:str) -> None:
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {access}')
+
+    def test_authenticating_does_not_select_the_user_or_profile(self):
+        self.authenticate(self.tokens['access'])
+        response = self.client.get(FOLLOWERS_URL)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse([
+            sql for sql in response.query_report.queries
+            if 'FROM "users_baseuser"' in sql or 'FROM "users_profile"' in sql
+        ])
+
+    def test_tokens_issued_without_claims_still_authenticate(self):
+        self.authenticate(str(RefreshToken.for_user(self.user).access_token))
+        response = self.client.get(FOLLOWERS_URL)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_deactivated_user_tokens_are_refused(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            deactivate_user(user_id=self.user.id)
+        self.authenticate(self.tokens['access'])
+        response = self.client.get(FOLLOWERS_URL)
+        refresh_response = self.client.post(
+            JWT_REFRESH_URL, {'refresh': self.tokens['refresh']}
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(refresh_response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_refreshed_access_token_carries_current_claims(self):
+        BaseUser.objects.filter(id=self.user.id).update(is_admin=True)
+        response = self.client.post(JWT_REFRESH_URL, {'refresh': self.tokens['refresh']})
+
+        self.assertTrue(AccessToken(response.data['access'])['is_admin'])
+
+    def test_revoked_refresh_token_refused(self):
+        revoke_user_tokens(user_id=self.user.id)
+        response = self.client.post(JWT_REFRESH_URL, {'refresh': self.tokens['refresh']})
+
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
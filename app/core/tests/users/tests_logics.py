@@ -1,26 +1,102 @@
-from django.test import TestCase
+import json
+from io import StringIO
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from django.contrib import admin
+from django.contrib.auth.hashers import make_password
+from django.core.management import call_command
+from django.db.models import Sum
+from django.test import TestCase, override_settings
 from django.core.exceptions import ValidationError
 from django.core.cache import cache
+from django_redis import get_redis_connection
+from rest_framework.exceptions import APIException
 
+from users.admin import ProfileAdmin
+from users.apis import ProfileDetailApiView
 from users.models import (
     BaseUser,
-    Profile
+    Profile,
+    ProfileSkill,
+    Subscription
 )
 from ...selectors.users import (
+    leaderboard,
     get_profile,
     get_freelancers,
+    search_freelancers,
+    filter_freelancers,
+    freelancer_facets,
     my_followers,
     my_followings
 )
+from ...jobs import (
+    RedisQueue,
+    Worker,
+    get_queue,
+    job,
+    make_payload,
+    noop
+)
+from ...rate_limit import RedisRateLimiter
+from ...authentication import (
+    ClaimsTokenObtainPairSerializer,
+    user_from_claims
+)
+from ...leaderboard import (
+    GLOBAL_BOARD,
+    category_board,
+    skill_board,
+    neighbors,
+    rank_of,
+    rebuild,
+    top
+)
+from ...profile_cache import (
+    invalidate_all_profiles,
+    profile_cache_stats,
+    profile_cache_version,
+    reset_profile_cache_stats
+)
+from ...profile_views import (
+    flush_profile_views,
+    pending_profile_views
+)
+from ...otp import (
+    store_otp,
+    consume_otp,
+    otp_attempts,
+    otp_phone_key
+)
 from ...services.users import (
     register,
     update_profile,
     profile_detail,
     subscribe,
-    unsubscribe
+    unsubscribe,
+    verify_otp,
+    reconcile_subscription_counts,
+    select_skills,
+    unselect_skill,
+    update_score
+)
+from ...services.skills import (
+    create_category,
+    create_skill,
+    publish_category,
+    publish_skill
 )
 
 
+serialize = ProfileDetailApiView.serialize
+
+
+@job(max_retries=1, backoff=0, sensitive=('phone_number',))
+def failing_job(*, phone_number:str) -> None:
+    raise ConnectionError(phone_number)
+
+
 class TestUsersLogics(TestCase):
 
     def setUp(self) -> None:
@@ -76,13 +152,28 @@ class TestUsersLogics(TestCase):
         self.assertEqual(self.sample_user.profile.email, edited_email)
 
     def test_profile_detail(self):
-        profile_detail(uuid=self.sample_user.profile.uuid)
+        profile_detail(uuid=self.sample_user.profile.uuid, serialize=serialize)
 
         self.assertTrue(Profile.objects.filter(
             uuid=self.sample_user.profile.uuid
         ).exists())
         self.assertEqual(Profile.objects.all().count(), 1)
 
+    def test_profile_views_flushed_into_database(self):
+        uuid = self.sample_user.profile.uuid
+        for _ in range(3):
+            profile = profile_detail(uuid=uuid, serialize=serialize)
+
+        self.assertEqual(profile['views'], 3)
+        self.assertEqual(Profile.objects.get(uuid=uuid).views, 0)
+
+        flushed = flush_profile_views(batch_size=1)
+
+        self.assertEqual(flushed, 3)
+        self.assertEqual(Profile.objects.get(uuid=uuid).views, 3)
+        self.assertEqual(pending_profile_views(uuid=uuid), 0)
+        self.assertEqual(profile_detail(uuid=uuid, serialize=serialize)['views'], 4)
+
     def test_subscribe_logic(self):
         user1 = register(
             phone_number='09132222222', email=None, password='1234@example.com'
@@ -152,3 +243,507 @@ class TestUsersLogics(TestCase):
         queryset = my_followings(profile=self.sample_user.profile)
 
         self.assertEqual(len(queryset), 2)
+
+    def test_verify_otp(self):
+        store_otp(phone_number=self.phone_number, otp=111111)
+        verify_otp(otp=111111, phone_number=self.phone_number)
+
+        self.sample_user.refresh_from_db()
+        self.assertTrue(self.sample_user.is_active)
+        with self.assertRaises(APIException):
+            verify_otp(otp=111111, phone_number=self.phone_number)
+
+    def test_consume_otp_ignores_replaced_code(self):
+        store_otp(phone_number=self.phone_number, otp=111111)
+        store_otp(phone_number=self.phone_number, otp=222222)
+
+        self.assertFalse(consume_otp(otp=111111, phone_number=self.phone_number))
+        self.assertTrue(consume_otp(otp=222222, phone_number=self.phone_number))
+
+    def test_consume_otp_only_for_its_phone_number(self):
+        store_otp(phone_number=self.phone_number, otp=111111)
+
+        self.assertFalse(consume_otp(otp=111111, phone_number='09132222222'))
+        self.assertTrue(consume_otp(otp=111111, phone_number=self.phone_number))
+
+    def test_failed_attempt_keeps_otp_expiry(self):
+        store_otp(phone_number=self.phone_number, otp=111111)
+        consume_otp(otp=222222, phone_number=self.phone_number)
+
+        ttl = get_redis_connection('default').ttl(otp_phone_key(self.phone_number))
+        self.assertGreater(ttl, 0)
+
+    def test_failed_attempt_on_expired_otp_stores_nothing(self):
+        consume_otp(otp=222222, phone_number='09132222222')
+
+        self.assertFalse(
+            get_redis_connection('default').exists(otp_phone_key('09132222222'))
+        )
+
+    @override_settings(OTP_MAX_ATTEMPTS=2)
+    def test_consume_otp_burned_after_max_attempts(self):
+        store_otp(phone_number=self.phone_number, otp=111111)
+
+        consume_otp(otp=222222, phone_number=self.phone_number)
+        self.assertEqual(otp_attempts(phone_number=self.phone_number), 1)
+        consume_otp(otp=333333, phone_number=self.phone_number)
+
+        self.assertFalse(consume_otp(otp=111111, phone_number=self.phone_number))
+
+    def test_cached_followers_updated_by_subscriptions(self):
+        user1 = register(
+            phone_number='09133333333', email=None, password='1234@example.com'
+        )
+        user2 = register(
+            phone_number='09132222222', email=None, password='1234@example.com'
+        )
+        self.assertEqual(len(my_followers(profile=self.sample_user.profile)), 0)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            subscribe(follower=user1.profile, target_uuid=self.sample_user.profile.uuid)
+        with self.captureOnCommitCallbacks(execute=True):
+            subscribe(follower=user2.profile, target_uuid=self.sample_user.profile.uuid)
+
+        followers = my_followers(profile=self.sample_user.profile)
+        self.assertEqual(followers.count(), 2)
+        self.assertEqual(followers[0:1], [user2.profile])
+        self.assertEqual(followers[1:2], [user1.profile])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            unsubscribe(un_follower=user2.profile, target_uuid=self.sample_user.profile.uuid)
+
+        self.assertEqual(list(my_followers(profile=self.sample_user.profile)), [user1.profile])
+        self.assertEqual(list(my_followings(profile=user2.profile)), [])
+
+    def test_unsubscribe_while_followers_load_not_lost(self):
+        user1 = register(
+            phone_number='09133333333', email=None, password='1234@example.com'
+        )
+        subscribe(follower=user1.profile, target_uuid=self.sample_user.profile.uuid)
+        followers = my_followers(profile=self.sample_user.profile)
+        load = followers.loader
+        loads = []
+
+        def loader():
+            rows = list(load())
+            if not loads:
+                # Unsubscribed, and its ZREM run, once the rows were read.
+                with self.captureOnCommitCallbacks(execute=True):
+                    unsubscribe(un_follower=user1.profile, target_uuid=self.sample_user.profile.uuid)
+            loads.append(rows)
+            return iter(rows)
+
+        followers.loader = loader
+
+        self.assertEqual(followers.count(), 0)
+        self.assertEqual(len(loads), 2)
+        self.assertEqual(len(my_followers(profile=self.sample_user.profile)), 0)
+
+    def test_subscription_counts_maintained_and_reconciled(self):
+        user1 = register(
+            phone_number='09132222222', email=None, password='1234@example.com'
+        )
+        subscribe(follower=self.sample_user.profile, target_uuid=user1.profile.uuid)
+        subscribe(follower=user1.profile, target_uuid=self.sample_user.profile.uuid)
+        unsubscribe(un_follower=self.sample_user.profile, target_uuid=user1.profile.uuid)
+
+        sample_profile = Profile.objects.get(user=self.sample_user)
+        user1_profile = Profile.objects.get(user=user1)
+        self.assertEqual(sample_profile.followers_count, 1)
+        self.assertEqual(sample_profile.followings_count, 0)
+        self.assertEqual(user1_profile.followers_count, 0)
+        self.assertEqual(user1_profile.followings_count, 1)
+
+        Profile.objects.update(followers_count=7, followings_count=7)
+        self.assertEqual(reconcile_subscription_counts(batch_size=1), 2)
+
+        self.assertEqual(
+            list(Profile.objects.order_by('id').values_list('followers_count', 'followings_count')),
+            [(1, 0), (0, 1)]
+        )
+
+    def test_concurrent_unsubscribe_counted_once(self):
+        user1 = register(
+            phone_number='09132222222', email=None, password='1234@example.com'
+        )
+        subscribe(follower=self.sample_user.profile, target_uuid=user1.profile.uuid)
+        # The row another unsubscribe deleted after this one read it.
+        stale = Subscription.objects.get(follower=self.sample_user.profile)
+        Subscription.objects.filter(id=stale.id).delete()
+
+        with patch.object(Subscription.objects, 'get', return_value=stale):
+            with self.assertRaises(APIException):
+                unsubscribe(un_follower=self.sample_user.profile, target_uuid=user1.profile.uuid)
+
+        self.assertEqual(Profile.objects.get(user=user1).followers_count, 1)
+        self.assertEqual(Profile.objects.get(user=self.sample_user).followings_count, 1)
+
+    def test_select_skills_in_three_queries(self):
+        category = create_category(name='Backend')
+        slugs = []
+        for index in range(30):
+            skill = create_skill(category=category, name=f'Skill {index}')
+            publish_skill(slug=skill.slug)
+            slugs.append(skill.slug)
+
+        with self.assertNumQueries(3):
+            outcomes = select_skills(user=self.sample_user, slugs=slugs)
+
+        self.assertEqual(set(outcomes.values()), {'selected'})
+        self.assertEqual(self.sample_user.profile.skills.count(), 30)
+
+    def test_search_freelancers_by_text_and_skill(self):
+        category = create_category(name='Backend')
+        django = create_skill(category=category, name='Django')
+        publish_skill(slug=django.slug)
+        writer = register(
+            phone_number='09132222222', email=None, password='1234@example.com'
+        )
+        coder = register(
+            phone_number='09133333333', email=None, password='1234@example.com'
+        )
+        Profile.objects.filter(user=writer).update(bio='Technical writer', city='Shiraz')
+        Profile.objects.filter(user=coder).update(bio='Backend developer', city='Tehran')
+        select_skills(user=coder, slugs=[django.slug])
+
+        self.assertEqual(
+            [profile.user_id for profile in search_freelancers(query='writer')], [writer.id]
+        )
+        self.assertEqual(
+            [profile.user_id for profile in search_freelancers(query='djngo')], [coder.id]
+        )
+        self.assertEqual(
+            list(search_freelancers(query='developer', city='shiraz')), []
+        )
+        self.assertEqual(
+            [profile.user_id for profile in search_freelancers(query='tehran', skill=django.slug)],
+            [coder.id]
+        )
+
+    def test_freelancer_facets_in_one_query(self):
+        category = create_category(name='Backend')
+        publish_category(slug=category.slug)
+        django = create_skill(category=category, name='Django')
+        publish_skill(slug=django.slug)
+        coder = register(
+            phone_number='09132222222', email=None, password='1234@example.com'
+        )
+        Profile.objects.filter(user=self.sample_user).update(city='Tehran', sex='F', age=24)
+        Profile.objects.filter(user=coder).update(city='Tehran', sex='M', age=31, plan_type='GOLD')
+        select_skills(user=coder, slugs=[django.slug])
+
+        with self.assertNumQueries(1):
+            facets = freelancer_facets(freelancers=filter_freelancers(city='tehran'))
+
+        self.assertEqual(facets['count'], 2)
+        self.assertEqual(facets['facets']['sex'], {'F': 1, 'M': 1})
+        self.assertEqual(facets['facets']['age'], {'20-29': 1, '30-39': 1})
+        self.assertEqual(facets['facets']['plan_type'], {'FREE': 1, 'GOLD': 1})
+        self.assertEqual(facets['facets']['skill'], {django.slug: 1})
+        self.assertEqual(facets['facets']['category'], {category.slug: 1})
+
+        facets = freelancer_facets(
+            freelancers=filter_freelancers(category=category.slug, max_age=40)
+        )
+        self.assertEqual(facets['count'], 1)
+        self.assertEqual(facets['facets']['city'], {'Tehran': 1})
+
+    def test_otp_delivered_by_job_after_commit(self):
+        get_queue.cache_clear()
+
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            register(phone_number='09132222222', email=None, password=self.password)
+        self.assertEqual(len(get_queue()), 0)
+
+        for callback in callbacks:
+            callback()
+        self.assertEqual(len(get_queue()), 1)
+
+        worker = Worker()
+        worker.run(burst=True)
+
+        self.assertEqual(worker.processed, 1)
+        self.assertEqual(len(get_queue()), 0)
+
+    def test_failing_job_retried_then_failed(self):
+        get_queue.cache_clear()
+        with self.captureOnCommitCallbacks(execute=True):
+            failing_job.delay(phone_number=self.phone_number)
+
+        worker = Worker()
+        with self.assertLogs('core.jobs', level='WARNING'):
+            worker.run(burst=True)
+
+        self.assertEqual((worker.processed, worker.retried, worker.failed), (0, 1, 1))
+        self.assertEqual(len(get_queue().failed), 1)
+        self.assertEqual(json.loads(get_queue().failed[0])['kwargs'], {'phone_number': '***'})
+
+    def test_unregistered_job_refused(self):
+        get_queue.cache_clear()
+        payload = make_payload(failing_job, {'phone_number': self.phone_number})
+        get_queue().push(payload.replace('failing_job', 'make_password'))
+
+        worker = Worker()
+        with self.assertLogs('core.jobs', level='ERROR'):
+            worker.run(burst=True)
+
+        self.assertEqual((worker.processed, worker.failed), (0, 1))
+
+    def test_redis_queue_requeues_the_jobs_of_a_dead_worker(self):
+        queue = RedisQueue()
+        self.addCleanup(lambda: cache.delete_pattern('jobs_*'))
+        queue.push(make_payload(noop, {}))
+        # Died while running it.
+        self.assertIsNotNone(queue.pop(timeout=1, worker='worker-1'))
+        self.assertEqual(len(queue), 0)
+
+        worker = Worker(queue, name='worker-1')
+        worker.run(burst=True)
+
+        self.assertEqual(worker.processed, 1)
+        self.assertEqual(queue.recover(worker='worker-1'), 0)
+
+    def test_redis_rate_limiter_sliding_window(self):
+        limiter = RedisRateLimiter()
+
+        waits = [limiter.hit('verify_09131111111', limit=3, window=60) for _ in range(4)]
+
+        self.assertEqual(waits[:3], [0, 0, 0])
+        self.assertTrue(0 < waits[3] <= 60)
+        self.assertEqual(limiter.hit('verify_09132222222', limit=3, window=60), 0)
+
+    def test_register_hashes_with_argon2_and_upgrades_legacy_hashes(self):
+        self.assertTrue(self.sample_user.password.startswith('argon2$argon2id$'))
+        self.assertTrue(self.sample_user.check_password(self.password))
+
+        self.sample_user.password = make_password(self.password, hasher='pbkdf2_sha256')
+        self.sample_user.save()
+
+        self.assertTrue(self.sample_user.check_password(self.password))
+        self.sample_user.refresh_from_db()
+        self.assertTrue(self.sample_user.password.startswith('argon2$'))
+
+    def test_user_from_claims_loads_other_fields_when_touched(self):
+        user = register(phone_number='09131111112', email=None, password='1234@example.com')
+        token = ClaimsTokenObtainPairSerializer.get_token(user).access_token
+
+        with self.assertNumQueries(0):
+            claims_user = user_from_claims(token)
+            self.assertEqual(claims_user.id, user.id)
+            self.assertEqual(claims_user.profile.uuid, user.profile.uuid)
+            self.assertFalse(claims_user.is_admin)
+        with self.assertNumQueries(1):
+            self.assertEqual(claims_user.phone_number, '09131111112')
+
+
+class TestProfileCache(TestCase):
+    """The cached profile detail never outlives a write to the profile."""
+
+    def setUp(self) -> None:
+        self.user = register(
+            phone_number='09131111111', email=None, password='1234@example.com'
+        )
+        self.uuid = self.user.profile.uuid
+        reset_profile_cache_stats()
+
+    def tearDown(self) -> None:
+        cache.delete_pattern('*')
+
+    def detail(self) -> dict:
+        with self.captureOnCommitCallbacks(execute=True):
+            return profile_detail(uuid=self.uuid, serialize=serialize)
+
+    def test_detail_cached_as_dict_and_counted(self):
+        self.detail()
+        with self.assertNumQueries(0):
+            self.detail()
+
+        self.assertIsInstance(cache.get(f'profile_detail_{profile_cache_version()}_{self.uuid}'), dict)
+        self.assertEqual(
+            profile_cache_stats(), {'hits': 1, 'misses': 1, 'hit_ratio': 0.5}
+        )
+
+    def test_update_profile_not_stale(self):
+        self.detail()
+        with self.captureOnCommitCallbacks(execute=True):
+            update_profile(
+                user=self.user, email=None, bio='Edited bio',
+                image=None, age=30, sex=None, city=None
+            )
+
+        self.assertEqual(self.detail()['bio'], 'Edited bio')
+        self.assertEqual(self.detail()['age'], 30)
+
+    def test_subscription_counts_not_stale(self):
+        follower = register(
+            phone_number='09132222222', email=None, password='1234@example.com'
+        )
+        self.detail()
+        with self.captureOnCommitCallbacks(execute=True):
+            subscribe(follower=follower.profile, target_uuid=self.uuid)
+        self.assertEqual(self.detail()['followers_count'], 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            unsubscribe(un_follower=follower.profile, target_uuid=self.uuid)
+        self.assertEqual(self.detail()['followers_count'], 0)
+
+        Profile.objects.filter(uuid=self.uuid).update(followers_count=7)
+        with self.captureOnCommitCallbacks(execute=True):
+            reconcile_subscription_counts()
+        self.assertEqual(self.detail()['followers_count'], 0)
+
+    def test_skill_writes_invalidate(self):
+        category = create_category(name='Backend')
+        skill = create_skill(category=category, name='Django')
+        publish_skill(slug=skill.slug)
+
+        self.detail()
+        with self.captureOnCommitCallbacks(execute=True):
+            select_skills(user=self.user, slugs=[skill.slug])
+        self.assertIsNone(cache.get(f'profile_detail_{profile_cache_version()}_{self.uuid}'))
+
+        self.detail()
+        with self.captureOnCommitCallbacks(execute=True):
+            unselect_skill(user=self.user, slug=skill.slug)
+        self.assertIsNone(cache.get(f'profile_detail_{profile_cache_version()}_{self.uuid}'))
+
+    def test_invalidate_all_profiles_moves_to_a_new_version(self):
+        self.detail()
+        version = profile_cache_version()
+        with self.captureOnCommitCallbacks(execute=True):
+            invalidate_all_profiles()
+
+        self.assertGreater(profile_cache_version(), version)
+        with self.assertNumQueries(1):
+            self.detail()
+
+    def test_views_not_lost_across_flushes(self):
+        for _ in range(2):
+            self.detail()
+        flush_profile_views()
+
+        self.assertEqual(self.detail()['views'], 3)
+
+
+class TestLeaderboard(TestCase):
+
+    def setUp(self) -> None:
+        self.profiles = []
+        with self.captureOnCommitCallbacks(execute=True):
+            for index in range(4):
+                user = register(
+                    phone_number=f'0913111111{index}', email=None, password='1234@example.com'
+                )
+                self.profiles.append(user.profile)
+        category = create_category(name='Backend')
+        self.skills = []
+        for name in ('Django', 'FastAPI'):
+            skill = create_skill(category=category, name=name)
+            publish_skill(slug=skill.slug)
+            self.skills.append(skill)
+        self.category = category
+
+    def tearDown(self) -> None:
+        cache.delete_pattern('*')
+
+    def set_scores(self, *scores:int) -> None:
+        with self.captureOnCommitCallbacks(execute=True):
+            for profile, score in zip(self.profiles, scores):
+                update_score(profile_id=profile.id, score=score)
+
+    def test_top_rank_and_neighbors(self):
+        self.set_scores(10, 40, 40, 5)
+        ids = [profile.id for profile in self.profiles]
+
+        # Ties are ranked by descending id, like the freelancers list.
+        self.assertEqual(
+            top(limit=3), [(1, ids[2], 40), (2, ids[1], 40), (3, ids[0], 10)]
+        )
+        self.assertEqual(rank_of(profile_id=ids[3]), 4)
+        self.assertEqual(
+            [entry[1] for entry in neighbors(profile_id=ids[1], radius=1)],
+            [ids[2], ids[1], ids[0]]
+        )
+        self.assertEqual(
+            [profile.id for profile in Profile.objects.order_by('-score', '-id')],
+            [entry[1] for entry in top(limit=4)]
+        )
+
+    def test_skill_and_category_boards_follow_selections(self):
+        user = self.profiles[0].user
+        with self.captureOnCommitCallbacks(execute=True):
+            select_skills(user=user, slugs=[skill.slug for skill in self.skills])
+        self.set_scores(25)
+        category = category_board(self.category.id)
+
+        self.assertEqual(top(board=skill_board(self.skills[1].id), limit=5), [(1, self.profiles[0].id, 25)])
+        self.assertEqual(rank_of(profile_id=self.profiles[0].id, board=category), 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            unselect_skill(user=user, slug=self.skills[1].slug)
+        self.assertIsNone(rank_of(profile_id=self.profiles[0].id, board=skill_board(self.skills[1].id)))
+        self.assertEqual(rank_of(profile_id=self.profiles[0].id, board=category), 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            unselect_skill(user=user, slug=self.skills[0].slug)
+        self.assertIsNone(rank_of(profile_id=self.profiles[0].id, board=category))
+
+    def test_rebuild_matches_maintained_boards(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            select_skills(user=self.profiles[1].user, slugs=[self.skills[0].slug])
+        self.set_scores(3, 7, 1, 9)
+        expected = top(limit=10), top(board=skill_board(self.skills[0].id), limit=10)
+        cache.delete(GLOBAL_BOARD)
+        cache.set(skill_board(999), 'stale')
+
+        self.assertEqual(rebuild(chunk_size=2), 4)
+        self.assertEqual(
+            (top(limit=10), top(board=skill_board(self.skills[0].id), limit=10)), expected
+        )
+        self.assertFalse(cache.has_key(skill_board(999)))
+
+    def test_leaderboard_selector_hydrates_profiles_with_rank(self):
+        self.set_scores(10, 20, 30, 40)
+
+        freelancers = leaderboard(around=self.profiles[0].uuid, radius=1)
+
+        self.assertEqual(
+            [(profile.rank, profile.id) for profile in freelancers],
+            [(3, self.profiles[1].id), (4, self.profiles[0].id)]
+        )
+
+    def test_profile_created_in_admin_ranked(self):
+        user = BaseUser.objects.create(phone_number='09139999999')
+        profile = Profile(user=user, score=15)
+        form = SimpleNamespace(changed_data=['user', 'score'])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            ProfileAdmin(Profile, admin.site).save_model(None, profile, form, change=False)
+
+        self.assertEqual(rank_of(profile_id=profile.id), 1)
+
+
+class TestSeedPerf(TestCase):
+
+    def tearDown(self) -> None:
+        cache.delete_pattern('*')
+
+    def test_seed_perf_loads_a_consistent_dataset(self):
+        call_command(
+            'seed_perf', users=30, follows=4, skills=2, categories=2,
+            batch_size=7, seed=1, stdout=StringIO()
+        )
+
+        self.assertEqual(Profile.objects.count(), 30)
+        self.assertEqual(ProfileSkill.objects.count(), 60)
+        self.assertEqual(len(set(Profile.objects.values_list('uuid', flat=True))), 30)
+        # The counters were reconciled with the COPYed subscriptions.
+        counts = Profile.objects.aggregate(
+            followers=Sum('followers_count'), followings=Sum('followings_count')
+        )
+        self.assertEqual(counts['followers'], Subscription.objects.count())
+        self.assertEqual(counts['followings'], Subscription.objects.count())
+        self.assertEqual(top(limit=100)[-1][0], 30)
+        self.assertTrue(
+            BaseUser.objects.get(phone_number='06000000029').check_password('1234@example.com')
+        )
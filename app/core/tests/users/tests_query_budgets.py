@@ -0,0 +1,146 @@
+from django.test import TestCase
+from django.urls import reverse
+from django.core.cache import cache
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from users.models import (
+    BaseUser,
+    Profile
+)
+from ...leaderboard import rebuild
+from ...otp import store_otp
+from ...query_inspection import (
+    QueryBudgetTestMixin,
+    QueryRecorder,
+    fingerprint
+)
+from ...rate_limit import get_rate_limiter
+from ...services.skills import (
+    create_category,
+    create_skill,
+    publish_category,
+    publish_skill
+)
+from ...services.users import (
+    register,
+    subscribe,
+    select_skills
+)
+
+
+class TestQueryInspection(TestCase):
+
+    def test_fingerprint_masks_literals(self):
+        self.assertEqual(
+            fingerprint("SELECT * FROM t WHERE id = 12 AND name = 'it''s'"),
+            fingerprint("SELECT * FROM t WHERE id = 7 AND name = 'x'")
+        )
+        self.assertEqual(
+            fingerprint('SELECT * FROM t WHERE id IN (%s, %s, %s)'),
+            fingerprint('SELECT * FROM t WHERE id IN (%s)')
+        )
+
+    def test_recorder_flags_repeated_queries(self):
+        users = [
+            register(phone_number=f'0913111111{index}', email=None, password='1234@example.com')
+            for index in range(3)
+        ]
+        with QueryRecorder() as report:
+            for profile in Profile.objects.all():
+                profile.user.phone_number
+
+        self.assertEqual(report.count, 4)
+        self.assertEqual(list(report.repeated.values()), [len(users)])
+
+
+class TestUsersQueryBudgets(QueryBudgetTestMixin, TestCase):
+    """Every endpoint stays within the `query_budget` of its view, with
+    enough rows around that an N+1 would show."""
+
+    def setUp(self) -> None:
+        self.client = APIClient()
+        get_rate_limiter().reset()
+        self.user = register(
+            phone_number='09131111111', email=None, password='1234@example.com'
+        )
+        category = create_category(name='Backend')
+        publish_category(slug=category.slug)
+        self.slugs = []
+        for name in ('Django', 'FastAPI', 'Flask', 'Go'):
+            skill = create_skill(category=category, name=name)
+            publish_skill(slug=skill.slug)
+            self.slugs.append(skill.slug)
+
+        self.others = [
+            register(phone_number=f'0913222222{index}', email=None, password='1234@example.com')
+            for index in range(5)
+        ]
+        for other in self.others:
+            subscribe(follower=other.profile, target_uuid=self.user.profile.uuid)
+            subscribe(follower=self.user.profile, target_uuid=other.profile.uuid)
+            select_skills(user=other, slugs=self.slugs)
+        select_skills(user=self.user, slugs=self.slugs)
+        Profile.objects.update(bio='Backend developer', city='Tehran')
+
+    def tearDown(self) -> None:
+        cache.delete_pattern('*')
+
+    def test_public_endpoints_within_budget(self):
+        self.assertEndpointWithinBudget('get', reverse('users:freelancers_list'))
+        self.assertEndpointWithinBudget('get', reverse('users:freelancers_search'), {'q': 'backend'})
+        self.assertEndpointWithinBudget('get', reverse('users:freelancers_facets'), {'city': 'tehran'})
+        self.assertEndpointWithinBudget(
+            'get', reverse('users:profile_detail', args=[self.user.profile.uuid])
+        )
+        rebuild()
+        self.assertEndpointWithinBudget(
+            'get', reverse('users:leaderboard'),
+            {'skill': self.slugs[0], 'around': self.user.profile.uuid}
+        )
+        self.assertEndpointWithinBudget(
+            'post', reverse('users:registration'),
+            {'phone_number': '09133333333', 'password': '1234@example.com',
+             'confirm_password': '1234@example.com'}
+        )
+        self.assertEndpointWithinBudget(
+            'post', reverse('users:resend_otp'), {'phone_number': '09133333333'}
+        )
+        store_otp(phone_number='09133333333', otp=123456)
+        self.assertEndpointWithinBudget(
+            'post', reverse('users:verification'), {'otp': 123456, 'phone_number': '09133333333'}
+        )
+
+    def test_follow_lists_within_budget_on_a_cold_cache(self):
+        # A user without its profile cached, as token authentication gives.
+        self.client.force_authenticate(BaseUser.objects.get(id=self.user.id))
+        cache.delete_pattern('*')
+
+        self.assertEndpointWithinBudget('get', reverse('users:followers'))
+        self.assertEndpointWithinBudget('get', reverse('users:followings'))
+
+    def test_private_endpoints_within_budget(self):
+        self.client.force_authenticate(self.user)
+
+        self.assertEndpointWithinBudget('get', reverse('users:profile_me'))
+        self.assertEndpointWithinBudget('patch', reverse('users:profile_me'), {'bio': 'Go developer'})
+        self.assertEndpointWithinBudget('get', reverse('users:followers'))
+        self.assertEndpointWithinBudget('get', reverse('users:followings'))
+        self.assertEndpointWithinBudget('get', reverse('users:my_skills'))
+        self.assertEndpointWithinBudget(
+            'delete', reverse('users:unselect_skill', args=[self.slugs[0]]),
+            status_code=status.HTTP_204_NO_CONTENT
+        )
+        self.assertEndpointWithinBudget('get', reverse('users:select_skill', args=[self.slugs[0]]))
+        self.assertEndpointWithinBudget('post', reverse('users:select_skills'), {'slugs': self.slugs})
+        target = register(
+            phone_number='09134444444', email=None, password='1234@example.com'
+        )
+        self.assertEndpointWithinBudget(
+            'get', reverse('users:subscription', args=[target.profile.uuid]),
+            status_code=status.HTTP_201_CREATED
+        )
+        self.assertEndpointWithinBudget(
+            'delete', reverse('users:subscription', args=[target.profile.uuid]),
+            status_code=status.HTTP_204_NO_CONTENT
+        )
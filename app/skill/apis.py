@@ -6,11 +6,17 @@ from rest_framework import (
 from rest_framework.exceptions import APIException
 from rest_framework.views import APIView
 from rest_framework.response import Response
+from rest_framework.renderers import JSONRenderer
 from drf_spectacular.utils import extend_schema
 
+from core.async_api import AsyncAPIView
+from core.catalog_cache import (
+    get_rendered_catalog,
+    aget_rendered_catalog
+)
+from core.responses import conditional_response
 from core.selectors.skills import (
     get_published_categories,
-    get_published_skills,
     get_all_categories,
     get_all_skills,
     category_choices
@@ -21,7 +27,11 @@ from core.services.skills import (
     publish_category,
     publish_skill,
     unpublish_category,
-    unpublish_skill
+    unpublish_skill,
+    publish_categories,
+    publish_skills,
+    unpublish_categories,
+    unpublish_skills
 )
 from .models import (
     Skill,
@@ -31,69 +41,113 @@ from .permission import IsAdmin
 
 
 class PubCategoryApiView(APIView):
+    query_budget = 1
 
 
-    class OutputCategorySerializer(serializers.ModelSerializer):
+    class OutputCategorySerializer(serializers.Serializer):
+        name = serializers.CharField()
         unpublish_url = serializers.SerializerMethodField()
 
-        class Meta:
-            model = Category
-            fields = ('name', 'unpublish_url')
-
         def get_unpublish_url(self, category):
             request = self.context.get('request')
-            path = reverse('skill:unpublish_category', args=[category.slug])
+            path = reverse('skill:unpublish_category', args=[category['slug']])
             return request.build_absolute_uri(path)
 
+    def render(self, categories):
+        return JSONRenderer().render(self.OutputCategorySerializer(
+            categories, many=True, context={'request': self.request}
+        ).data)
+
     @extend_schema(responses=OutputCategorySerializer)
     def get(self, request, *args, **kwargs):
         try:
-            categories = get_published_categories(name=None)
+            body, etag = get_rendered_catalog(
+                'published_categories', request=request, render=self.render
+            )
         except Exception as ex:
             raise APIException(
                 f'Database Error >> {ex}'
             )
-        response = self.OutputCategorySerializer(categories, many=True, context={'request': request}).data
 
-        return Response(response, status=status.HTTP_200_OK)
+        return conditional_response(request=request, body=body, etag=etag)
 
 
 
 class PubSkillApiView(APIView):
+    query_budget = 1
 
 
-    class OutputSkillSerializer(serializers.ModelSerializer):
+    class OutputSkillSerializer(serializers.Serializer):
+        name = serializers.CharField()
         unpublish_url = serializers.SerializerMethodField()
         select_user_skill_url = serializers.SerializerMethodField()
 
-        class Meta:
-            model = Skill
-            fields = ('name', 'unpublish_url', 'select_user_skill_url')
-        
         def get_unpublish_url(self, skill):
             request = self.context.get('request')
-            path = reverse('skill:unpublish_skill', args=[skill.slug])
+            path = reverse('skill:unpublish_skill', args=[skill['slug']])
             return request.build_absolute_uri(path)
 
         def get_select_user_skill_url(self, skill):
             request = self.context.get('request')
-            path = reverse('users:select_skill', args=[skill.slug])
+            path = reverse('users:select_skill', args=[skill['slug']])
             return request.build_absolute_uri(path)
 
+    def render(self, skills):
+        return JSONRenderer().render(self.OutputSkillSerializer(
+            skills, many=True, context={'request': self.request}
+        ).data)
+
     @extend_schema(responses=OutputSkillSerializer)
     def get(self, request, *args, **kwargs):
         try:
-            skills = get_published_skills(category=None)
+            body, etag = get_rendered_catalog(
+                'published_skills', request=request, render=self.render
+            )
         except Exception as ex:
             raise APIException(
                 f'Database Error >> {ex}'
             )
-        response = self.OutputSkillSerializer(skills, many=True, context={'request': request}).data
-        return Response(response, status=status.HTTP_200_OK)
+
+        return conditional_response(request=request, body=body, etag=etag)
+
+
+class AsyncPubCategoryApiView(AsyncAPIView, PubCategoryApiView):
+    """`PubCategoryApiView` for the ASGI deployment."""
+
+    @extend_schema(responses=PubCategoryApiView.OutputCategorySerializer)
+    async def get(self, request, *args, **kwargs):
+        try:
+            body, etag = await aget_rendered_catalog(
+                'published_categories', request=request, render=self.render
+            )
+        except Exception as ex:
+            raise APIException(
+                f'Database Error >> {ex}'
+            )
+
+        return conditional_response(request=request, body=body, etag=etag)
+
+
+class AsyncPubSkillApiView(AsyncAPIView, PubSkillApiView):
+    """`PubSkillApiView` for the ASGI deployment."""
+
+    @extend_schema(responses=PubSkillApiView.OutputSkillSerializer)
+    async def get(self, request, *args, **kwargs):
+        try:
+            body, etag = await aget_rendered_catalog(
+                'published_skills', request=request, render=self.render
+            )
+        except Exception as ex:
+            raise APIException(
+                f'Database Error >> {ex}'
+            )
+
+        return conditional_response(request=request, body=body, etag=etag)
 
 
 class CategoryDetailApiView(APIView):
     permission_classes = [IsAdmin]
+    query_budget = 3
 
     def get(self, request, slug=None, *args, **kwargs):
         try:
@@ -107,6 +161,7 @@ class CategoryDetailApiView(APIView):
 
 class SkillDetailApiView(APIView):
     permission_classes = [IsAdmin]
+    query_budget = 3
 
     def get(self, request, slug=None, *args, **kwargs):
         try:
@@ -120,6 +175,7 @@ class SkillDetailApiView(APIView):
 
 class CategoryApiView(APIView):
     permission_classes = [IsAdmin]
+    query_budget = 2
 
 
     class InputCategorySerializer(serializers.Serializer):
@@ -178,18 +234,22 @@ class CategoryApiView(APIView):
 
 class SkillApiView(APIView):
     permission_classes = [IsAdmin]
+    query_budget = 4
 
 
     class InputSkillSerializer(serializers.Serializer):
-
-        CATEGORY_CHOICES = category_choices()
-
         name = serializers.CharField(max_length=250)
         category = serializers.ChoiceField(
-            choices=CATEGORY_CHOICES,
-            help_text=f'The category name must be in this list >> {CATEGORY_CHOICES}'
+            choices=(),
+            help_text='The name of a published category.'
         )
 
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            # Resolved per request, so categories published since the
+            # process started are accepted.
+            self.fields['category'].choices = category_choices()
+
 
     class OutputSkillSerializer(serializers.ModelSerializer):
         publish_url = serializers.SerializerMethodField()
@@ -239,6 +299,7 @@ class SkillApiView(APIView):
 
 class UnpublishCategoryApiView(APIView):
     permission_classes = [IsAdmin]
+    query_budget = 2
 
     def delete(self, request, slug, *args, **kwargs):
         try:
@@ -252,6 +313,7 @@ class UnpublishCategoryApiView(APIView):
 
 class UnpublishSkillApiView(APIView):
     permission_classes = [IsAdmin]
+    query_budget = 2
 
     def delete(self, request, slug, *args, **kwargs):
         try:
@@ -261,3 +323,69 @@ class UnpublishSkillApiView(APIView):
                 f'Database Error >> {ex}'
             )
         return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class BulkPublishCategoryApiView(APIView):
+    """Publishes many categories at once, and with `cascade` their skills."""
+    permission_classes = [IsAdmin]
+    query_budget = 2
+    service = staticmethod(publish_categories)
+
+
+    class InputBulkPublishSerializer(serializers.Serializer):
+        slugs = serializers.ListField(
+            child=serializers.CharField(max_length=250),
+            allow_empty=False, max_length=1000
+        )
+        cascade = serializers.BooleanField(default=False)
+
+
+    class OutputBulkPublishSerializer(serializers.Serializer):
+        updated = serializers.IntegerField()
+        cascaded = serializers.IntegerField()
+
+    @extend_schema(
+            request=InputBulkPublishSerializer,
+            responses=OutputBulkPublishSerializer
+    )
+    def post(self, request, *args, **kwargs):
+        serializer = self.InputBulkPublishSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        try:
+            counts = self.service(**serializer.validated_data)
+        except Exception as ex:
+            raise serializers.ValidationError(
+                f'Database Error >> {ex}'
+            )
+        response = self.OutputBulkPublishSerializer(counts).data
+        return Response(response, status=status.HTTP_200_OK)
+
+
+class BulkUnpublishCategoryApiView(BulkPublishCategoryApiView):
+    service = staticmethod(unpublish_categories)
+
+
+class BulkPublishSkillApiView(BulkPublishCategoryApiView):
+    query_budget = 1
+    service = staticmethod(publish_skills)
+
+
+    # Named apart, the schema would show it as the category one.
+    class InputBulkPublishSkillSerializer(serializers.Serializer):
+        slugs = serializers.ListField(
+            child=serializers.CharField(max_length=250),
+            allow_empty=False, max_length=1000
+        )
+
+    InputBulkPublishSerializer = InputBulkPublishSkillSerializer
+
+    @extend_schema(
+            request=InputBulkPublishSkillSerializer,
+            responses=BulkPublishCategoryApiView.OutputBulkPublishSerializer
+    )
+    def post(self, request, *args, **kwargs):
+        return super().post(request, *args, **kwargs)
+
+
+class BulkUnpublishSkillApiView(BulkPublishSkillApiView):
+    service = staticmethod(unpublish_skills)
@@ -0,0 +1,50 @@
+import csv
+import json
+import sys
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.services.skills import export_catalog
+
+COLUMNS = ('name', 'category', 'published', 'category_published')
+
+
+class Command(BaseCommand):
+    help = (
+        'Stream every skill with its category as CSV or JSONL, in the '
+        'shape import_catalog reads.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'path', nargs='?', default='-', help="File to write, stdout by default."
+        )
+        parser.add_argument('--format', choices=['csv', 'jsonl'], default='csv')
+
+    def handle(self, *args, **options):
+        path = options['path']
+        stream = sys.stdout if path == '-' else open(path, 'w', newline='', encoding='utf-8')
+        start = time.perf_counter()
+        exported = 0
+        try:
+            if options['format'] == 'csv':
+                writer = csv.DictWriter(stream, fieldnames=COLUMNS)
+                writer.writeheader()
+                for row in export_catalog():
+                    writer.writerow(row)
+                    exported += 1
+            else:
+                for row in export_catalog():
+                    stream.write(json.dumps(row) + '\n')
+                    exported += 1
+        finally:
+            if stream is not sys.stdout:
+                stream.close()
+        elapsed = time.perf_counter() - start
+
+        # Kept off stdout, which may be the export itself.
+        self.stderr.write(
+            f'Exported {exported} rows in {elapsed:.2f}s '
+            f'({exported / elapsed if elapsed else 0:.0f} rows/s).'
+        )
@@ -0,0 +1,73 @@
+import csv
+import json
+import sys
+import time
+
+from django.core.management.base import (
+    BaseCommand,
+    CommandError
+)
+
+from core.services.skills import import_catalog
+
+TRUE_VALUES = ('1', 'true', 'yes')
+
+
+def read_csv(stream):
+    for row in csv.DictReader(stream):
+        item = {'name': row['name'], 'category': row['category']}
+        # A blank or missing cell leaves the publish state as it is.
+        for column in ('published', 'category_published'):
+            value = (row.get(column) or '').strip().lower()
+            if value:
+                item[column] = value in TRUE_VALUES
+        yield item
+
+def read_jsonl(stream):
+    for line in stream:
+        if line.strip():
+            yield json.loads(line)
+
+
+class Command(BaseCommand):
+    help = (
+        'Upsert categories and skills from a CSV or JSONL file with the '
+        'columns name, category, published and category_published, '
+        'streaming it in batches. The publish columns are optional: a '
+        'blank or missing one leaves existing skills and categories as '
+        'they are and creates new ones unpublished.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="File to import, '-' for stdin.")
+        parser.add_argument(
+            '--format', choices=['csv', 'jsonl'], default=None,
+            help='Format of the file, guessed from its extension by default.'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Skills upserted per INSERT statement.'
+        )
+
+    def handle(self, *args, **options):
+        path = options['path']
+        file_format = options['format'] or path.rsplit('.', 1)[-1].lower()
+        if file_format not in ('csv', 'jsonl'):
+            raise CommandError('Pass --format csv or --format jsonl.')
+        read = read_csv if file_format == 'csv' else read_jsonl
+
+        stream = sys.stdin if path == '-' else open(path, newline='', encoding='utf-8')
+        start = time.perf_counter()
+        try:
+            imported = import_catalog(rows=read(stream), batch_size=options['batch_size'])
+        except KeyError as ex:
+            raise CommandError(f'Missing column {ex}.')
+        finally:
+            if stream is not sys.stdin:
+                stream.close()
+        elapsed = time.perf_counter() - start
+
+        self.stdout.write(
+            f'Imported {imported} rows in {elapsed:.2f}s '
+            f'({imported / elapsed if elapsed else 0:.0f} rows/s).'
+        )
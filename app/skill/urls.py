@@ -1,14 +1,26 @@
+from django.conf import settings
 from django.urls import path
 
 from . import apis
 
 app_name = 'skill'
 
+if settings.ASYNC_READ_VIEWS:
+    PubCategoryApiView = apis.AsyncPubCategoryApiView
+    PubSkillApiView = apis.AsyncPubSkillApiView
+else:
+    PubCategoryApiView = apis.PubCategoryApiView
+    PubSkillApiView = apis.PubSkillApiView
+
 urlpatterns = [
     path('categories/all/', apis.CategoryApiView.as_view(), name='categories'),
     path('skills/all/', apis.SkillApiView.as_view(), name='skills'),
-    path('categories/published/', apis.PubCategoryApiView.as_view(), name='pub_categories'),
-    path('skills/published/', apis.PubSkillApiView.as_view(), name='pub_skills'),
+    path('categories/publish/', apis.BulkPublishCategoryApiView.as_view(), name='publish_categories'),
+    path('categories/unpublish/', apis.BulkUnpublishCategoryApiView.as_view(), name='unpublish_categories'),
+    path('skills/publish/', apis.BulkPublishSkillApiView.as_view(), name='publish_skills'),
+    path('skills/unpublish/', apis.BulkUnpublishSkillApiView.as_view(), name='unpublish_skills'),
+    path('categories/published/', PubCategoryApiView.as_view(), name='pub_categories'),
+    path('skills/published/', PubSkillApiView.as_view(), name='pub_skills'),
     path('category/<str:slug>/publish/', apis.CategoryDetailApiView.as_view(), name='category_detail'),
     path('skill/<str:slug>/publish/', apis.SkillDetailApiView.as_view(), name='skill_detail'),
     path('category/<str:slug>/unpublish/', apis.UnpublishCategoryApiView.as_view(), name='unpublish_category'),
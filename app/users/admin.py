@@ -1,5 +1,12 @@
 from django.contrib import admin
 
+from core.authentication import revoke_user_tokens
+from core.leaderboard import (
+    boards_of,
+    remove_from_boards,
+    sync_profile
+)
+from core.profile_cache import invalidate_profiles
 from .models import (
     BaseUser,
     Profile,
@@ -7,7 +14,41 @@ from .models import (
     ProfileSkill
 )
 
-admin.site.register(BaseUser)
-admin.site.register(Profile)
-admin.site.register(Subscription)
-admin.site.register(ProfileSkill)
+
+@admin.register(Subscription)
+class SubscriptionAdmin(admin.ModelAdmin):
+    # `Subscription.__str__` reads both users' phone numbers.
+    list_select_related = ('follower__user', 'target__user')
+
+
+@admin.register(ProfileSkill)
+class ProfileSkillAdmin(admin.ModelAdmin):
+    # `ProfileSkill.__str__` reads the user's phone number and the skill name.
+    list_select_related = ('profile_id__user', 'skill_id')
+
+
+@admin.register(BaseUser)
+class BaseUserAdmin(admin.ModelAdmin):
+
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        # The tokens already issued still claim the old flags.
+        if change and {'is_active', 'is_admin'} & set(form.changed_data):
+            revoke_user_tokens(user_id=obj.id)
+
+
+@admin.register(Profile)
+class ProfileAdmin(admin.ModelAdmin):
+
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        invalidate_profiles(obj.uuid)
+        # New profiles join the global board, as `create_profile` does.
+        if not change or 'score' in form.changed_data:
+            sync_profile(profile_id=obj.id, score=obj.score)
+
+    def delete_model(self, request, obj):
+        boards = boards_of(obj.id)
+        super().delete_model(request, obj)
+        invalidate_profiles(obj.uuid)
+        remove_from_boards(profile_id=obj.id, boards=boards)
@@ -1,22 +1,44 @@
+from django.core.exceptions import (
+    ObjectDoesNotExist,
+    ValidationError
+)
+from django.core.files.storage import default_storage
 from django.core.validators import MinLengthValidator
 from django.urls import reverse
 from rest_framework.views import APIView
 from rest_framework import status
 from rest_framework.response import Response
-from rest_framework.exceptions import APIException
+from rest_framework.exceptions import (
+    APIException,
+    NotFound
+)
+from rest_framework.fields import get_error_detail
 from rest_framework import (
     serializers,
     permissions
 )
 from drf_spectacular.utils import extend_schema
 
+from core.async_api import AsyncAPIView
+from core.batching import BatchedField
+from core.images import ImageUploadHandler
+from core.rate_limit import (
+    IpThrottle,
+    PhoneNumberThrottle
+)
 from core.pagination import (
     LimitOffsetPagination,
+    KeysetPagination,
+    aget_paginated_response_context,
     get_paginated_response_context
 )
 from core.selectors.users import (
     get_profile,
     get_freelancers,
+    search_freelancers,
+    filter_freelancers,
+    freelancer_facets,
+    leaderboard,
     my_followers,
     my_followings,
     my_skills
@@ -25,24 +47,27 @@ from core.services.users import (
     register,
     update_profile,
     profile_detail,
+    aprofile_detail,
     subscribe,
     unsubscribe,
     verify_otp,
     resend_otp,
     select_skill,
+    select_skills,
     unselect_skill
 )
 from skill.models import Skill
 from .models import (
     BaseUser,
-    Profile,
-    Subscription
+    Profile
 )
 from .validators import (
     phone_validator,
     letter_validator,
     number_validator,
-    special_character_validator
+    special_character_validator,
+    profile_image_size_validator,
+    profile_image_dimensions_validator
 )
 
 
@@ -52,11 +77,15 @@ class ProfileSerializer(serializers.ModelSerializer):
         model = Profile
         fields = (
             'email', 'bio', 'image', 'age', 'plan_type',
-            'balance', 'score', 'sex', 'city', 'views'
+            'balance', 'score', 'sex', 'city', 'views',
+            'followers_count', 'followings_count'
         )
 
 
 class RegistrationApiView(APIView):
+    query_budget = 3
+    throttle_classes = [IpThrottle, PhoneNumberThrottle]
+    throttle_scope = 'registration'
 
     class InputRegisterSerializer(serializers.Serializer):
         phone_number = serializers.CharField(
@@ -73,16 +102,6 @@ class RegistrationApiView(APIView):
         )
         confirm_password = serializers.CharField(write_only=True)
 
-        def validate_phone_number(self, phone_number):
-            """Validating phone number to be unique."""
-            if BaseUser.objects.filter(
-                phone_number=phone_number
-            ).exists():
-                raise APIException(
-                    'The provided phone number has already been taken.'
-                )
-            return phone_number
-
         def validate(self, attrs):
             password = attrs.get('password')
             confirm_password = attrs.get('confirm_password')
@@ -114,6 +133,9 @@ class RegistrationApiView(APIView):
                 email=serializer.validated_data.get('email'),
                 password=serializer.validated_data.get('password')
             )
+        except ValidationError as ex:
+            # The phone number is checked to be unique in `register`.
+            raise serializers.ValidationError(get_error_detail(ex))
         except Exception as ex:
             raise APIException(
                 f'Database Error >> {ex}'
@@ -126,12 +148,16 @@ class RegistrationApiView(APIView):
 
 class ProfileMeApiView(APIView):
     permission_classes = [permissions.IsAuthenticated]
+    query_budget = 2
 
 
     class UpdateProfileSerializer(serializers.Serializer):
         email = serializers.EmailField(required=False)
         bio = serializers.CharField(max_length=1000, required=False)
-        image = serializers.ImageField(required=False)
+        image = serializers.ImageField(
+            required=False,
+            validators=[profile_image_size_validator, profile_image_dimensions_validator]
+        )
         age = serializers.IntegerField(required=False)
         sex = serializers.CharField(max_length=1, required=False)
         city = serializers.CharField(max_length=100, required=False)
@@ -150,6 +176,11 @@ class ProfileMeApiView(APIView):
                 )
             return age
 
+    def initialize_request(self, request, *args, **kwargs):
+        # Before the body is parsed, which happens on first access.
+        request.upload_handlers = [ImageUploadHandler(request)]
+        return super().initialize_request(request, *args, **kwargs)
+
     @extend_schema(responses=ProfileSerializer)
     def get(self, request, *args, **kwargs):
         try:
@@ -189,24 +220,46 @@ class ProfileMeApiView(APIView):
 
 
 class ProfileDetailApiView(APIView):
+    query_budget = 1
+
+    @staticmethod
+    def serialize(profile:Profile) -> dict:
+        return ProfileSerializer(profile).data
 
     @extend_schema(
             responses=ProfileSerializer
     )
     def get(self, request, uuid, *args, **kwargs):
         try:
-            profile = profile_detail(uuid=uuid)
+            response = profile_detail(uuid=uuid, serialize=self.serialize)
+        except Exception as ex:
+            raise APIException(
+                f'Database Error >> {ex}'
+            )
+
+        return Response(response, status=status.HTTP_200_OK)
+
+
+class AsyncProfileDetailApiView(AsyncAPIView, ProfileDetailApiView):
+    """`ProfileDetailApiView` for the ASGI deployment."""
+
+    @extend_schema(
+            responses=ProfileSerializer
+    )
+    async def get(self, request, uuid, *args, **kwargs):
+        try:
+            response = await aprofile_detail(uuid=uuid, serialize=self.serialize)
         except Exception as ex:
             raise APIException(
                 f'Database Error >> {ex}'
             )
 
-        response = ProfileSerializer(profile).data
         return Response(response, status=status.HTTP_200_OK)
 
 
 class SubscriptionApiView(APIView):
     permission_classes = [permissions.IsAuthenticated]
+    query_budget = 7
 
     def get(self, request, uuid, *args, **kwargs):
         try:
@@ -233,18 +286,22 @@ class SubscriptionApiView(APIView):
 
 class ListFreelancersApiView(APIView):
     """List all freelancers sorted by their score."""
+    query_budget = 1
 
-    class Pagination(LimitOffsetPagination):
+    class Pagination(KeysetPagination):
+        ordering = ('-score', '-id')
         default_limit = 20
+        include_count = False
 
 
     class OutputFreelancerSerializer(serializers.ModelSerializer):
         absolute_url = serializers.SerializerMethodField()
+        thumbnails = serializers.SerializerMethodField()
 
         class Meta:
             model = Profile
             fields = (
-                'email', 'bio', 'image',
+                'email', 'bio', 'image', 'thumbnails',
                 'score', 'absolute_url'
             )
 
@@ -253,6 +310,14 @@ class ListFreelancersApiView(APIView):
                 path = reverse('users:profile_detail', args=[profile.uuid])
                 return request.build_absolute_uri(path)
 
+        def get_thumbnails(self, profile) -> dict[str, str]:
+            """Empty until the thumbnails of a new image are rendered."""
+            request = self.context.get('request')
+            return {
+                size: request.build_absolute_uri(default_storage.url(path))
+                for size, path in profile.thumbnails.items()
+            }
+
     @extend_schema(responses=OutputFreelancerSerializer)
     def get(self, request, *args, **kwargs):
         try:
@@ -271,26 +336,179 @@ class ListFreelancersApiView(APIView):
         )
 
 
+class AsyncListFreelancersApiView(AsyncAPIView, ListFreelancersApiView):
+    """`ListFreelancersApiView` for the ASGI deployment."""
+
+    @extend_schema(responses=ListFreelancersApiView.OutputFreelancerSerializer)
+    async def get(self, request, *args, **kwargs):
+        try:
+            freelancers = get_freelancers()
+        except Exception as ex:
+            raise APIException(
+                f'Database Error >> {ex}'
+            )
+
+        return await aget_paginated_response_context(
+            pagination_class=self.Pagination,
+            serializer_class=self.OutputFreelancerSerializer,
+            queryset=freelancers,
+            request=request,
+            view=self
+        )
+
+
+class SearchFreelancersApiView(APIView):
+    """Search freelancers by bio, city and skill names."""
+    query_budget = 3
+
+    class Pagination(LimitOffsetPagination):
+        default_limit = 20
+
+
+    class InputSearchSerializer(serializers.Serializer):
+        q = serializers.CharField(max_length=200)
+        skill = serializers.CharField(max_length=250, required=False)
+        city = serializers.CharField(max_length=100, required=False)
+
+    @extend_schema(
+            parameters=[InputSearchSerializer],
+            responses=ListFreelancersApiView.OutputFreelancerSerializer
+    )
+    def get(self, request, *args, **kwargs):
+        serializer = self.InputSearchSerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        try:
+            freelancers = search_freelancers(
+                query=serializer.validated_data.get('q'),
+                skill=serializer.validated_data.get('skill'),
+                city=serializer.validated_data.get('city')
+            )
+        except Exception as ex:
+            raise APIException(
+                f'Database Error >> {ex}'
+            )
+
+        return get_paginated_response_context(
+            pagination_class=self.Pagination,
+            serializer_class=ListFreelancersApiView.OutputFreelancerSerializer,
+            queryset=freelancers,
+            request=request,
+            view=self
+        )
+
+
+class FacetedFreelancersApiView(APIView):
+    """Filtering freelancers, with the count of every facet value
+    among the filtered ones next to the first page."""
+    query_budget = 2
+
+
+    class InputFacetSerializer(serializers.Serializer):
+        skill = serializers.CharField(max_length=250, required=False)
+        category = serializers.CharField(max_length=250, required=False)
+        city = serializers.CharField(max_length=100, required=False)
+        sex = serializers.ChoiceField(choices=Profile.SEX, required=False)
+        plan_type = serializers.ChoiceField(choices=Profile.PLAN_CHOICES, required=False)
+        min_age = serializers.IntegerField(min_value=0, required=False)
+        max_age = serializers.IntegerField(min_value=0, required=False)
+
+    @extend_schema(
+            parameters=[InputFacetSerializer],
+            responses=ListFreelancersApiView.OutputFreelancerSerializer
+    )
+    def get(self, request, *args, **kwargs):
+        serializer = self.InputFacetSerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        try:
+            freelancers = filter_freelancers(**serializer.validated_data)
+            facets = freelancer_facets(freelancers=freelancers)
+        except Exception as ex:
+            raise APIException(
+                f'Database Error >> {ex}'
+            )
+
+        response = get_paginated_response_context(
+            pagination_class=ListFreelancersApiView.Pagination,
+            serializer_class=ListFreelancersApiView.OutputFreelancerSerializer,
+            queryset=freelancers,
+            request=request,
+            view=self
+        )
+        response.data['count'] = facets['count']
+        response.data['facets'] = facets['facets']
+        return response
+
+
+class LeaderboardApiView(APIView):
+    """Top freelancers by score, overall or of a skill or category, or
+    the ones ranked around the freelancer with the `around` uuid."""
+    query_budget = 3
+
+
+    class InputLeaderboardSerializer(serializers.Serializer):
+        skill = serializers.CharField(max_length=250, required=False)
+        category = serializers.CharField(max_length=250, required=False)
+        limit = serializers.IntegerField(min_value=1, max_value=100, default=10)
+        around = serializers.CharField(required=False)
+        radius = serializers.IntegerField(min_value=1, max_value=50, default=5)
+
+        def validate(self, attrs):
+            if 'skill' in attrs and 'category' in attrs:
+                raise serializers.ValidationError(
+                    'Rank by either a skill or a category, not both.'
+                )
+            return attrs
+
+
+    class OutputLeaderboardSerializer(ListFreelancersApiView.OutputFreelancerSerializer):
+        rank = serializers.IntegerField()
+
+        class Meta(ListFreelancersApiView.OutputFreelancerSerializer.Meta):
+            fields = ('rank',) + ListFreelancersApiView.OutputFreelancerSerializer.Meta.fields
+
+    @extend_schema(
+            parameters=[InputLeaderboardSerializer],
+            responses=OutputLeaderboardSerializer(many=True)
+    )
+    def get(self, request, *args, **kwargs):
+        serializer = self.InputLeaderboardSerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        try:
+            freelancers = leaderboard(**serializer.validated_data)
+        except ObjectDoesNotExist as ex:
+            # An unknown skill, category or `around` profile.
+            raise NotFound(str(ex))
+        except Exception as ex:
+            raise APIException(
+                f'Database Error >> {ex}'
+            )
+
+        response = self.OutputLeaderboardSerializer(
+            freelancers, many=True, context={'request': request}
+        ).data
+        return Response(response, status=status.HTTP_200_OK)
+
+
 class ListMyFollowersApiView(APIView):
     """Listing all my followers with
     pagination by default_limit 15 page."""
     permission_classes = [permissions.IsAuthenticated]
+    # The profile, then the ids of its set when Redis has none yet, then the page.
+    query_budget = 3
 
 
     class Pagination(LimitOffsetPagination):
         default_limit = 15
 
 
-    class SubscriptionSerializer(serializers.ModelSerializer):
-        follower = serializers.CharField(source='follower.email')
-        class Meta:
-            model = Subscription
-            fields = ['follower']
+    class SubscriptionSerializer(serializers.Serializer):
+        # Rendered from the profile ids of the page, loaded in one batch.
+        follower = BatchedField(source='*', model=Profile, attribute='email')
     
     @extend_schema(responses=SubscriptionSerializer)
     def get(self, request, *args, **kwargs):
         try:
-            followers = my_followers(profile=request.user.profile)
+            followers = my_followers(profile=request.user.profile, hydrate=False)
         except Exception as ex:
             raise APIException(
                 f'Database Error >> {ex}'
@@ -308,22 +526,22 @@ class ListMyFollowingsApiView(APIView):
     """Listing all my followings with
     pagination by default_limit 15 page."""
     permission_classes = [permissions.IsAuthenticated]
+    # The profile, then the ids of its set when Redis has none yet, then the page.
+    query_budget = 3
 
 
     class Pagination(LimitOffsetPagination):
         default_limit = 15
 
 
-    class SubscriptionSerializer(serializers.ModelSerializer):
-        target = serializers.CharField(source='target.email')
-        class Meta:
-            model = Subscription
-            fields = ['target']
+    class SubscriptionSerializer(serializers.Serializer):
+        # Rendered from the profile ids of the page, loaded in one batch.
+        target = BatchedField(source='*', model=Profile, attribute='email')
 
     @extend_schema(responses=SubscriptionSerializer)
     def get(self, request, *args, **kwargs):
         try:
-            followings = my_followings(profile=request.user.profile)
+            followings = my_followings(profile=request.user.profile, hydrate=False)
         except Exception as ex:
             raise APIException(
                 f'Database Error >> {ex}'
@@ -339,16 +557,25 @@ class ListMyFollowingsApiView(APIView):
 
 
 class OtpVerificationApiView(APIView):
+    query_budget = 1
+    throttle_classes = [IpThrottle, PhoneNumberThrottle]
+    throttle_scope = 'otp_verify'
 
 
     class InputOtpSerializer(serializers.Serializer):
         otp = serializers.IntegerField(required=True)
+        phone_number = serializers.CharField(
+            validators = [phone_validator], required=True
+        )
 
     @extend_schema(request=InputOtpSerializer)
     def post(self, request, *args, **kwargs):
         serializer = self.InputOtpSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
-        verify_otp(otp=serializer.validated_data.get('otp'))
+        verify_otp(
+            otp=serializer.validated_data.get('otp'),
+            phone_number=serializer.validated_data.get('phone_number')
+        )
         return Response(
             {'detail': 'The account has been verified successfully.'},
             status=status.HTTP_200_OK
@@ -356,6 +583,9 @@ class OtpVerificationApiView(APIView):
 
 
 class ResendOtpApiView(APIView):
+    query_budget = 1
+    throttle_classes = [IpThrottle, PhoneNumberThrottle]
+    throttle_scope = 'otp_resend'
 
 
     class InputResendOtpSerializer(serializers.Serializer):
@@ -378,6 +608,7 @@ class ResendOtpApiView(APIView):
 
 class SelectSkillApiView(APIView):
     permission_classes = [permissions.IsAuthenticated]
+    query_budget = 4
 
     def get(self, request, slug, *args, **kwargs):
         try:
@@ -392,8 +623,45 @@ class SelectSkillApiView(APIView):
         return Response(status=status.HTTP_200_OK)
 
 
+class SelectSkillsApiView(APIView):
+    """Selecting many skills by their slugs in one request."""
+    permission_classes = [permissions.IsAuthenticated]
+    query_budget = 3
+
+
+    class InputSelectSkillsSerializer(serializers.Serializer):
+        slugs = serializers.ListField(
+            child=serializers.CharField(max_length=250),
+            allow_empty=False, max_length=100
+        )
+
+
+    class OutputSelectSkillsSerializer(serializers.Serializer):
+        outcomes = serializers.DictField(child=serializers.CharField())
+
+    @extend_schema(
+            request=InputSelectSkillsSerializer,
+            responses=OutputSelectSkillsSerializer
+    )
+    def post(self, request, *args, **kwargs):
+        serializer = self.InputSelectSkillsSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        try:
+            outcomes = select_skills(
+                user=request.user,
+                slugs=serializer.validated_data.get('slugs')
+            )
+        except Exception as ex:
+            raise serializers.ValidationError(
+                f'Database Error >> {ex}'
+            )
+        response = self.OutputSelectSkillsSerializer({'outcomes': outcomes}).data
+        return Response(response, status=status.HTTP_200_OK)
+
+
 class MySkillsApiView(APIView):
     permission_classes = [permissions.IsAuthenticated]
+    query_budget = 1
 
 
     class MySkillsSerializer(serializers.ModelSerializer):
@@ -418,6 +686,7 @@ class MySkillsApiView(APIView):
 
 class UnselectSkillApiView(APIView):
     permission_classes = [permissions.IsAuthenticated]
+    query_budget = 3
 
     def delete(self, request, slug, *args, **kwargs):
         try:
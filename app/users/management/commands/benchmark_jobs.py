@@ -0,0 +1,49 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.jobs import (
+    Worker,
+    get_queue,
+    make_payload,
+    noop
+)
+
+BATCH_SIZE = 1_000
+
+
+class Command(BaseCommand):
+    help = (
+        'Measure the job queue throughput: enqueue no-op jobs into the '
+        'configured queue, then drain it with one worker. Run it while no '
+        'other worker is consuming the queue.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--jobs', type=int, default=100_000,
+            help='No-op jobs to enqueue and run.'
+        )
+
+    def handle(self, *args, **options):
+        queue = get_queue()
+        count = options['jobs']
+
+        start = time.perf_counter()
+        for offset in range(0, count, BATCH_SIZE):
+            queue.push(*[
+                make_payload(noop, {})
+                for _ in range(min(BATCH_SIZE, count - offset))
+            ])
+        enqueue_seconds = time.perf_counter() - start
+
+        worker = Worker(queue)
+        start = time.perf_counter()
+        worker.run(burst=True)
+        run_seconds = time.perf_counter() - start
+
+        self.stdout.write(f'Enqueued {count / enqueue_seconds:.0f} jobs/sec.')
+        self.stdout.write(
+            f'Processed {worker.processed / run_seconds:.0f} jobs/sec '
+            f'({worker.processed} jobs).'
+        )
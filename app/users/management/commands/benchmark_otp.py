@@ -0,0 +1,84 @@
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.test.utils import override_settings
+from django_redis import get_redis_connection
+
+from core.otp import (
+    queue_store_otp,
+    consume_otp,
+    store_otp,
+    otp_phone_key
+)
+
+BATCH_SIZE = 10_000
+
+
+class Command(BaseCommand):
+    help = (
+        'Measure OTP verification latency while the number of '
+        'outstanding OTPs grows. Writes into the configured Redis.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes', nargs='+', type=int,
+            default=[1_000, 10_000, 100_000, 1_000_000],
+            help='Outstanding OTP counts to measure at.'
+        )
+        parser.add_argument(
+            '--samples', type=int, default=1_000,
+            help='Verifications timed at every size.'
+        )
+
+    def handle(self, *args, **options):
+        client = get_redis_connection('default')
+        seeded = []
+
+        self.stdout.write(f"{'outstanding':>12} {'mean_us':>10} {'p99_us':>10}")
+        # Keeping the seeded OTPs alive for the whole run.
+        with override_settings(OTP_TIMEOUT_SECONDS=60 * 60):
+            try:
+                for size in sorted(options['sizes']):
+                    self._seed(client=client, seeded=seeded, size=size)
+                    timings = self._measure(samples=options['samples'])
+                    self.stdout.write(
+                        f'{size:>12} {statistics.mean(timings):>10.1f} '
+                        f'{statistics.quantiles(timings, n=100)[98]:>10.1f}'
+                    )
+            finally:
+                self._cleanup(client=client, seeded=seeded)
+
+    def _seed(self, *, client, seeded, size):
+        """Top the store up to `size` outstanding OTPs."""
+        pipe = client.pipeline(transaction=False)
+        for index in range(len(seeded), size):
+            phone_number = f'bench{index:07d}'
+            otp = random.randint(100000, 999999)
+            queue_store_otp(pipe=pipe, phone_number=phone_number, otp=otp)
+            seeded.append((phone_number, otp))
+            if index % BATCH_SIZE == 0:
+                pipe.execute()
+        pipe.execute()
+
+    def _measure(self, *, samples):
+        timings = []
+        for index in range(samples):
+            phone_number = f'bench_sample{index}'
+            otp = random.randint(100000, 999999)
+            store_otp(phone_number=phone_number, otp=otp)
+
+            start = time.perf_counter()
+            consume_otp(otp=otp, phone_number=phone_number)
+            timings.append((time.perf_counter() - start) * 1_000_000)
+        return timings
+
+    def _cleanup(self, *, client, seeded):
+        pipe = client.pipeline(transaction=False)
+        for index, (phone_number, _) in enumerate(seeded):
+            pipe.delete(otp_phone_key(phone_number))
+            if index % BATCH_SIZE == 0:
+                pipe.execute()
+        pipe.execute()
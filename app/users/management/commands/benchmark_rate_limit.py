@@ -0,0 +1,44 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+
+from core.rate_limit import get_rate_limiter
+
+
+class Command(BaseCommand):
+    help = (
+        'Measure the rate limiter checks/sec against the configured backend. '
+        'Writes rate_limit_benchmark_* keys into Redis, expiring with the window.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--checks', type=int, default=100_000,
+            help='Checks to run in total.'
+        )
+        parser.add_argument(
+            '--keys', type=int, default=1_000,
+            help='Distinct keys the checks are spread over.'
+        )
+        parser.add_argument(
+            '--threads', type=int, default=1,
+            help='Threads running checks at the same time.'
+        )
+
+    def handle(self, *args, **options):
+        limiter = get_rate_limiter()
+        keys = options['keys']
+
+        def check(index):
+            return limiter.hit(f'benchmark_{index % keys}', limit=10, window=60)
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options['threads']) as executor:
+            waits = list(executor.map(check, range(options['checks'])))
+        elapsed = time.perf_counter() - start
+
+        self.stdout.write(
+            f"{options['checks'] / elapsed:.0f} checks/sec, "
+            f'{sum(1 for wait in waits if wait)} throttled.'
+        )
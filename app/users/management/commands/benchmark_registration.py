@@ -0,0 +1,73 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import override_settings
+
+from core.jobs import get_queue
+from core.services.users import register
+from users.models import BaseUser
+
+PHONE_PREFIX = '07'
+HASHERS = {
+    'pbkdf2': 'django.contrib.auth.hashers.PBKDF2PasswordHasher',
+    'argon2': 'core.hashers.Argon2PasswordHasher',
+    'scrypt': 'core.hashers.ScryptPasswordHasher',
+}
+
+
+class Command(BaseCommand):
+    help = (
+        'Measure registrations/sec with every password hasher. Creates users '
+        'with phone numbers starting with 07 and deletes them afterwards; the '
+        'OTP jobs go to an in-memory queue.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--registrations', type=int, default=200,
+            help='Registrations per hasher.'
+        )
+        parser.add_argument(
+            '--threads', type=int, default=os.cpu_count() or 1,
+            help='Concurrent registrations, like request threads.'
+        )
+        parser.add_argument(
+            '--hashers', nargs='+', choices=HASHERS, default=list(HASHERS),
+            help='Hashers to measure, the first one is the baseline.'
+        )
+
+    def handle(self, *args, **options):
+        cores = os.cpu_count() or 1
+        self.stdout.write(f"{'hasher':>8} {'reg/s':>8} {'reg/s/core':>11}")
+
+        for name in options['hashers']:
+            with override_settings(
+                PASSWORD_HASHERS=[HASHERS[name]], JOBS_BACKEND='core.jobs.LocalQueue'
+            ):
+                get_queue.cache_clear()
+                rate = self._measure(
+                    count=options['registrations'], threads=options['threads']
+                )
+            get_queue.cache_clear()
+            self.stdout.write(f'{name:>8} {rate:>8.1f} {rate / cores:>11.1f}')
+
+    def _register(self, index:int) -> None:
+        try:
+            register(
+                phone_number=f'{PHONE_PREFIX}{index:09d}', email=None,
+                password='1234@example.com'
+            )
+        finally:
+            connection.close()
+
+    def _measure(self, *, count:int, threads:int) -> float:
+        BaseUser.objects.filter(phone_number__startswith=PHONE_PREFIX).delete()
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            list(executor.map(self._register, range(count)))
+        elapsed = time.perf_counter() - start
+        BaseUser.objects.filter(phone_number__startswith=PHONE_PREFIX).delete()
+        return count / elapsed
@@ -0,0 +1,123 @@
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import (
+    connection,
+    transaction
+)
+
+from core.selectors.users import search_freelancers
+from skill.models import (
+    Category,
+    Skill
+)
+from users.models import (
+    BaseUser,
+    Profile,
+    ProfileSkill
+)
+
+PHONE_PREFIX = '08'
+BATCH_SIZE = 10_000
+CITIES = [
+    'Tehran', 'Isfahan', 'Shiraz', 'Tabriz', 'Mashhad',
+    'Yazd', 'Rasht', 'Kerman', 'Qom', 'Ahvaz'
+]
+SKILLS = [
+    'Django', 'FastAPI', 'Flask', 'React', 'Vue', 'Angular', 'Go',
+    'Rust', 'Kotlin', 'Swift', 'PostgreSQL', 'Redis', 'Docker',
+    'Kubernetes', 'Figma', 'Photoshop', 'Copywriting', 'SEO'
+]
+WORDS = [
+    'backend', 'frontend', 'developer', 'designer', 'senior', 'junior',
+    'freelancer', 'api', 'mobile', 'web', 'cloud', 'devops', 'data',
+    'writer', 'startup', 'remote', 'experienced', 'fullstack'
+]
+QUERIES = [
+    'django', 'backend developer', 'react designer', 'tehran',
+    'kubernetes devops', 'senior mobile', 'pyhton', 'copywriter'
+]
+
+
+class Command(BaseCommand):
+    help = (
+        'Seed synthetic freelancers (phone numbers starting with 08) and '
+        'measure search_freelancers latency on them.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--profiles', type=int, default=1_000_000,
+            help='Synthetic profiles to have in the database before measuring.'
+        )
+        parser.add_argument(
+            '--repeat', type=int, default=20,
+            help='Runs per query.'
+        )
+        parser.add_argument(
+            '--limit', type=int, default=20,
+            help='Page size fetched by every search.'
+        )
+
+    def handle(self, *args, **options):
+        self._seed(count=options['profiles'])
+
+        self.stdout.write(f"{'query':>20} {'mean_ms':>10} {'p95_ms':>10}")
+        for query in QUERIES:
+            timings = []
+            for _ in range(options['repeat']):
+                start = time.perf_counter()
+                list(search_freelancers(query=query)[:options['limit']])
+                timings.append((time.perf_counter() - start) * 1000)
+            self.stdout.write(
+                f'{query:>20} {statistics.mean(timings):>10.2f} '
+                f'{statistics.quantiles(timings, n=20)[18]:>10.2f}'
+            )
+
+        queryset = search_freelancers(query=QUERIES[1])[:options['limit']]
+        self.stdout.write(queryset.explain(analyze=True))
+
+    def _skill_ids(self) -> list[int]:
+        category, _ = Category.objects.get_or_create(
+            name='Benchmark', defaults={'slug': 'benchmark', 'published': True}
+        )
+        for name in SKILLS:
+            Skill.objects.get_or_create(
+                name=name,
+                defaults={'slug': name.lower(), 'category': category, 'published': True}
+            )
+        return list(Skill.objects.filter(published=True).values_list('id', flat=True))
+
+    def _seed(self, *, count:int) -> None:
+        existing = BaseUser.objects.filter(phone_number__startswith=PHONE_PREFIX).count()
+        if existing >= count:
+            return
+        skill_ids = self._skill_ids()
+
+        for start in range(existing, count, BATCH_SIZE):
+            stop = min(start + BATCH_SIZE, count)
+            with transaction.atomic():
+                users = BaseUser.objects.bulk_create([
+                    BaseUser(phone_number=f'{PHONE_PREFIX}{index:09d}', password='!', is_active=True)
+                    for index in range(start, stop)
+                ])
+                profiles = Profile.objects.bulk_create([
+                    Profile(
+                        user=user,
+                        bio=' '.join(random.choices(WORDS, k=12)),
+                        city=random.choice(CITIES),
+                        score=int(random.paretovariate(1.5))
+                    )
+                    for user in users
+                ])
+                ProfileSkill.objects.bulk_create([
+                    ProfileSkill(profile_id=profile, skill_id_id=skill_id)
+                    for profile in profiles
+                    for skill_id in random.sample(skill_ids, k=min(3, len(skill_ids)))
+                ])
+            self.stdout.write(f'Seeded {stop}/{count} profiles.')
+
+        with connection.cursor() as cursor:
+            cursor.execute(f'ANALYZE {Profile._meta.db_table}')
@@ -0,0 +1,66 @@
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+# Every process loads the URLconf, which imports every view module.
+TARGETS = {
+    'manage.py': [sys.executable, 'manage.py', 'check'],
+    'worker': [
+        sys.executable, '-c',
+        'import os; '
+        'os.environ.setdefault("DJANGO_SETTINGS_MODULE", "app.settings"); '
+        'from django.core.wsgi import get_wsgi_application; '
+        'from django.urls import get_resolver; '
+        'get_wsgi_application(); get_resolver().url_patterns'
+    ],
+}
+
+
+class Command(BaseCommand):
+    help = (
+        'Measure how long manage.py and a WSGI worker take to boot, with the '
+        'database reachable and with it pointed at a host that does not '
+        'exist. Booting in the second case shows nothing touches the '
+        'database at import time.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--runs', type=int, default=5,
+            help='Boots per target and database.'
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write(
+            f"{'target':>10} {'database':>12} {'median ms':>10} {'max ms':>8} {'boots':>6}"
+        )
+        for name, command in TARGETS.items():
+            for database, env in (
+                ('reachable', {}),
+                ('unreachable', {'DB_HOST': '/nonexistent'}),
+            ):
+                timings, booted = self._measure(command, env=env, runs=options['runs'])
+                self.stdout.write(
+                    f'{name:>10} {database:>12} {statistics.median(timings):>10.0f} '
+                    f"{max(timings):>8.0f} {'yes' if booted else 'no':>6}"
+                )
+
+    def _measure(self, command:list[str], *, env:dict, runs:int) -> tuple[list[float], bool]:
+        timings = []
+        booted = True
+        for _ in range(runs):
+            start = time.perf_counter()
+            result = subprocess.run(
+                command, cwd=settings.BASE_DIR, env={**os.environ, **env},
+                stdout=subprocess.DEVNULL, stderr=subprocess.PIPE
+            )
+            timings.append((time.perf_counter() - start) * 1000)
+            if result.returncode != 0:
+                booted = False
+                self.stderr.write(result.stderr.decode().strip().splitlines()[-1])
+        return timings, booted
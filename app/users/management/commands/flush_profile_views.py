@@ -0,0 +1,31 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.profile_views import flush_profile_views
+
+
+class Command(BaseCommand):
+    help = (
+        'Flush the profile views counted in Redis into the database. '
+        'With --interval it keeps running as a scheduler worker.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Profiles updated per UPDATE statement.'
+        )
+        parser.add_argument(
+            '--interval', type=int, default=None,
+            help='Seconds to sleep between flushes, runs once when omitted.'
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            flushed = flush_profile_views(batch_size=options['batch_size'])
+            self.stdout.write(f'Flushed {flushed} profile views.')
+
+            if options['interval'] is None:
+                return
+            time.sleep(options['interval'])
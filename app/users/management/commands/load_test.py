@@ -0,0 +1,253 @@
+import itertools
+import json
+import random
+import statistics
+import threading
+import time
+from collections import defaultdict
+from urllib.error import HTTPError
+from urllib.parse import urlsplit
+from urllib.request import (
+    Request,
+    urlopen
+)
+
+from django.core.management.base import (
+    BaseCommand,
+    CommandError
+)
+from django.db import connection
+from django.urls import reverse
+from django_redis import get_redis_connection
+
+from core.otp import otp_phone_key
+from users.models import (
+    BaseUser,
+    Profile
+)
+from .seed_perf import (
+    PHONE_PREFIX as SEEDED_PREFIX,
+    PASSWORD,
+    phone_number as seeded_phone_number
+)
+
+# Users registered by the registration scenario, deleted after the run.
+PHONE_PREFIX = '05'
+
+
+class Client:
+    """One simulated user, timing every request it sends."""
+
+    def __init__(self, *, base_url:str, stats) -> None:
+        self.base_url = base_url.rstrip('/')
+        self.stats = stats
+        self.token = None
+
+    def request(self, name:str, method:str, path:str, data:dict|None=None):
+        headers = {'Content-Type': 'application/json'}
+        if self.token:
+            headers['Authorization'] = f'Bearer {self.token}'
+        body = json.dumps(data).encode() if data is not None else None
+        request = Request(self.base_url + path, data=body, headers=headers, method=method)
+
+        start = time.perf_counter()
+        try:
+            with urlopen(request, timeout=30) as response:
+                payload, status = response.read(), response.status
+        except HTTPError as ex:
+            payload, status = ex.read(), ex.code
+        except OSError:
+            payload, status = b'', 0
+        self.stats.record(name, (time.perf_counter() - start) * 1000, status)
+        return status, payload
+
+
+class Stats:
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.timings = defaultdict(list)
+        self.statuses = defaultdict(lambda: defaultdict(int))
+
+    def record(self, name:str, elapsed_ms:float, status:int) -> None:
+        with self.lock:
+            self.timings[name].append(elapsed_ms)
+            self.statuses[name][status] += 1
+
+    def summary(self, *, elapsed:float) -> dict:
+        result = {}
+        for name, timings in sorted(self.timings.items()):
+            statuses = self.statuses[name]
+            # quantiles() wants two samples at least.
+            percentiles = statistics.quantiles(
+                timings * (2 if len(timings) == 1 else 1), n=100, method='inclusive'
+            )
+            result[name] = {
+                'requests': len(timings),
+                'rps': round(len(timings) / elapsed, 1),
+                'p50_ms': round(percentiles[49], 2),
+                'p90_ms': round(percentiles[89], 2),
+                'p95_ms': round(percentiles[94], 2),
+                'p99_ms': round(percentiles[98], 2),
+                'max_ms': round(max(timings), 2),
+                'throttled': statuses.get(429, 0),
+                'errors': sum(
+                    count for status, count in statuses.items()
+                    if status == 0 or (status >= 400 and status != 429)
+                ),
+            }
+        return result
+
+
+class Command(BaseCommand):
+    help = (
+        'Load test the API of a running server, e.g. `manage.py runserver`, '
+        'locust style: --users simulated users run the weighted scenarios '
+        'below for --duration seconds, and the throughput and latency '
+        'percentiles of every endpoint are printed as JSON. Seed the data '
+        'first with `manage.py seed_perf`. The OTP scenario reads the codes '
+        'from the Redis of the server, so run it with the same settings; '
+        'run the server with DISABLE_THROTTLES=1, or the registrations of '
+        'one IP get throttled.'
+    )
+
+    # Scenario >> weight.
+    SCENARIOS = {
+        'profile_detail': 30,
+        'freelancers_list': 20,
+        'catalog': 20,
+        'followers': 15,
+        'registration': 5,
+    }
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--base-url', default='http://localhost:8000',
+            help='Root URL of the server under test.'
+        )
+        parser.add_argument(
+            '--users', type=int, default=20,
+            help='Simulated users running at the same time.'
+        )
+        parser.add_argument(
+            '--duration', type=float, default=60,
+            help='Seconds to run for.'
+        )
+        parser.add_argument(
+            '--scenarios', nargs='+', choices=self.SCENARIOS, default=list(self.SCENARIOS),
+            help='Scenarios to run.'
+        )
+        parser.add_argument(
+            '--output', default=None,
+            help='Also write the results to this file, to compare runs.'
+        )
+
+    def handle(self, *args, **options):
+        seeded = BaseUser.objects.filter(phone_number__startswith=SEEDED_PREFIX).count()
+        if not seeded:
+            raise CommandError('Nothing seeded, run `manage.py seed_perf` first.')
+        self.seeded = seeded
+        self.uuids = list(
+            Profile.objects.filter(
+                user__phone_number__startswith=SEEDED_PREFIX
+            ).order_by('?').values_list('uuid', flat=True)[:1000]
+        )
+        self.phone_numbers = itertools.count()
+        self.lock = threading.Lock()
+        self._cleanup()
+        # The connection isn't shared with the threads.
+        connection.close()
+
+        stats = Stats()
+        scenarios = {name: self.SCENARIOS[name] for name in options['scenarios']}
+        deadline = time.monotonic() + options['duration']
+        threads = [
+            threading.Thread(
+                target=self._user,
+                kwargs={
+                    'client': Client(base_url=options['base_url'], stats=stats),
+                    'scenarios': scenarios, 'deadline': deadline,
+                }
+            )
+            for _ in range(options['users'])
+        ]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+        self._cleanup()
+
+        results = {
+            'options': {
+                name: options[name]
+                for name in ('base_url', 'users', 'duration', 'scenarios')
+            },
+            'seeded_users': seeded,
+            'endpoints': stats.summary(elapsed=elapsed),
+        }
+        output = json.dumps(results, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as file:
+                file.write(output)
+        self.stdout.write(output)
+
+    def _cleanup(self) -> None:
+        BaseUser.objects.filter(phone_number__startswith=PHONE_PREFIX).delete()
+
+    def _user(self, *, client:Client, scenarios:dict, deadline:float) -> None:
+        # Logged in as a random seeded user, like a returning visitor.
+        status, payload = client.request(
+            'jwt_login', 'POST', reverse('users:jwt_login'),
+            {'phone_number': seeded_phone_number(random.randrange(self.seeded)), 'password': PASSWORD}
+        )
+        if status == 200:
+            client.token = json.loads(payload)['access']
+
+        names, weights = list(scenarios), list(scenarios.values())
+        try:
+            while time.monotonic() < deadline:
+                getattr(self, f'_{random.choices(names, weights=weights)[0]}')(client)
+        finally:
+            connection.close()
+
+    def _profile_detail(self, client:Client) -> None:
+        client.request(
+            'profile_detail', 'GET',
+            reverse('users:profile_detail', args=[random.choice(self.uuids)])
+        )
+
+    def _freelancers_list(self, client:Client) -> None:
+        status, payload = client.request(
+            'freelancers_list', 'GET', reverse('users:freelancers_list')
+        )
+        # Following the cursor, as a visitor scrolling would.
+        next_url = json.loads(payload).get('next') if status == 200 else None
+        if next_url:
+            url = urlsplit(next_url)
+            client.request('freelancers_list_next', 'GET', f'{url.path}?{url.query}')
+
+    def _catalog(self, client:Client) -> None:
+        client.request('pub_categories', 'GET', reverse('skill:pub_categories'))
+        client.request('pub_skills', 'GET', reverse('skill:pub_skills'))
+
+    def _followers(self, client:Client) -> None:
+        client.request('followers', 'GET', reverse('users:followers'))
+        client.request('followings', 'GET', reverse('users:followings'))
+
+    def _registration(self, client:Client) -> None:
+        with self.lock:
+            phone_number = f'{PHONE_PREFIX}{next(self.phone_numbers):09d}'
+        status, _ = client.request(
+            'registration', 'POST', reverse('users:registration'),
+            {'phone_number': phone_number, 'password': PASSWORD, 'confirm_password': PASSWORD}
+        )
+        if status != 200:
+            return
+        otp = get_redis_connection('default').hget(otp_phone_key(phone_number), 'otp')
+        if otp is not None:
+            client.request(
+                'otp_verification', 'POST', reverse('users:verification'),
+                {'otp': int(otp), 'phone_number': phone_number}
+            )
@@ -0,0 +1,162 @@
+import json
+import os
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.error import HTTPError
+from urllib.request import urlopen
+
+from django.core.management.base import BaseCommand
+from django.urls import reverse
+
+from users.models import Profile
+
+
+def _tree_rss_kb(pid:int) -> int:
+    """Resident memory of `pid` and all its descendants, in KiB."""
+    parents = {}
+    for entry in os.listdir('/proc'):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f'/proc/{entry}/stat') as stat:
+                # The command name may hold spaces, the ppid follows it.
+                parents[int(entry)] = int(stat.read().rsplit(')', 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+
+    tree, pending = set(), [pid]
+    while pending:
+        current = pending.pop()
+        tree.add(current)
+        pending += [child for child, parent in parents.items() if parent == current]
+
+    total = 0
+    for process in tree:
+        try:
+            with open(f'/proc/{process}/status') as status:
+                for line in status:
+                    if line.startswith('VmRSS:'):
+                        total += int(line.split()[1])
+        except OSError:
+            continue
+    return total
+
+
+class _PeakRss(threading.Thread):
+
+    def __init__(self, pid:int) -> None:
+        super().__init__(daemon=True)
+        self.pid = pid
+        self.peak = 0
+        self.running = True
+
+    def run(self) -> None:
+        while self.running:
+            self.peak = max(self.peak, _tree_rss_kb(self.pid))
+            time.sleep(0.1)
+
+
+class Command(BaseCommand):
+    help = (
+        'Load test the profile and catalog read endpoints of a running '
+        'deployment and report latency percentiles and peak worker memory. '
+        'Run it once against the WSGI deployment, e.g. '
+        '`gunicorn app.wsgi -w 4 --threads 8`, and once against the ASGI one, '
+        '`ASYNC_READ_VIEWS=1 gunicorn app.asgi -w 4 -k uvicorn.workers.UvicornWorker`.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--base-url', default='http://localhost:8000',
+            help='Root URL of the deployment under test.'
+        )
+        parser.add_argument(
+            '--requests', type=int, default=2_000,
+            help='Requests sent to every endpoint.'
+        )
+        parser.add_argument(
+            '--concurrency', type=int, default=50,
+            help='Requests in flight at the same time.'
+        )
+        parser.add_argument(
+            '--pid', type=int, default=None,
+            help='Master process of the server, to sample its workers memory.'
+        )
+        parser.add_argument(
+            '--json', action='store_true',
+            help='Print the results as JSON.'
+        )
+
+    def handle(self, *args, **options):
+        uuids = list(Profile.objects.values_list('uuid', flat=True)[:100]) or ['missing']
+        endpoints = {
+            'profile_detail': [
+                reverse('users:profile_detail', args=[uuid]) for uuid in uuids
+            ],
+            'freelancers_list': [reverse('users:freelancers_list')],
+            'pub_categories': [reverse('skill:pub_categories')],
+            'pub_skills': [reverse('skill:pub_skills')],
+        }
+
+        sampler = None
+        if options['pid'] is not None:
+            sampler = _PeakRss(options['pid'])
+            sampler.start()
+
+        results = {}
+        for name, paths in endpoints.items():
+            urls = [
+                options['base_url'].rstrip('/') + paths[index % len(paths)]
+                for index in range(options['requests'])
+            ]
+            results[name] = self._run(urls=urls, concurrency=options['concurrency'])
+
+        if sampler is not None:
+            sampler.running = False
+            sampler.join()
+            results['peak_rss_mb'] = round(sampler.peak / 1024, 1)
+
+        if options['json']:
+            self.stdout.write(json.dumps(results, indent=2))
+            return
+
+        self.stdout.write(
+            f"{'endpoint':>18} {'req/s':>8} {'p50_ms':>8} {'p95_ms':>8} "
+            f"{'p99_ms':>8} {'errors':>7}"
+        )
+        for name in endpoints:
+            row = results[name]
+            self.stdout.write(
+                f"{name:>18} {row['rps']:>8.1f} {row['p50_ms']:>8.2f} "
+                f"{row['p95_ms']:>8.2f} {row['p99_ms']:>8.2f} {row['errors']:>7}"
+            )
+        if sampler is not None:
+            self.stdout.write(f"Peak worker memory: {results['peak_rss_mb']} MiB")
+
+    def _request(self, url:str) -> tuple[float, bool]:
+        start = time.perf_counter()
+        try:
+            with urlopen(url, timeout=30) as response:
+                response.read()
+            ok = True
+        except (HTTPError, OSError):
+            ok = False
+        return (time.perf_counter() - start) * 1000, ok
+
+    def _run(self, *, urls:list[str], concurrency:int) -> dict:
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            samples = list(executor.map(self._request, urls))
+        elapsed = time.perf_counter() - start
+
+        timings = [timing for timing, _ in samples]
+        percentiles = statistics.quantiles(timings, n=100)
+        return {
+            'rps': round(len(urls) / elapsed, 1),
+            'p50_ms': round(percentiles[49], 2),
+            'p95_ms': round(percentiles[94], 2),
+            'p99_ms': round(percentiles[98], 2),
+            'errors': sum(not ok for _, ok in samples),
+        }
@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from core.profile_cache import (
+    profile_cache_stats,
+    reset_profile_cache_stats
+)
+
+
+class Command(BaseCommand):
+    help = 'Report the hit ratio of the profile detail cache.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--reset', action='store_true',
+            help='Zero the counters after reporting them.'
+        )
+
+    def handle(self, *args, **options):
+        stats = profile_cache_stats()
+        self.stdout.write(
+            f"Hits: {stats['hits']}, misses: {stats['misses']}, "
+            f"hit ratio: {stats['hit_ratio']}"
+        )
+        if options['reset']:
+            reset_profile_cache_stats()
@@ -0,0 +1,26 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.leaderboard import rebuild
+
+
+class Command(BaseCommand):
+    help = (
+        'Rebuild the freelancer leaderboards in Redis from the database, '
+        'streaming the profiles and their skills in chunks. Score and '
+        'skill changes made while it runs are lost, so run it with them '
+        'stopped.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size', type=int, default=2000,
+            help='Rows fetched from the database and written to Redis at once.'
+        )
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        ranked = rebuild(chunk_size=options['chunk_size'])
+        elapsed = time.perf_counter() - start
+        self.stdout.write(f'Ranked {ranked} profiles in {elapsed:.2f}s.')
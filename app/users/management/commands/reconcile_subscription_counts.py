@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from core.services.users import reconcile_subscription_counts
+
+
+class Command(BaseCommand):
+    help = 'Recompute the followers/followings counters of every profile.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=10000,
+            help='Profiles updated per UPDATE statement.'
+        )
+
+    def handle(self, *args, **options):
+        updated = reconcile_subscription_counts(batch_size=options['batch_size'])
+        self.stdout.write(f'Reconciled {updated} profiles.')
@@ -0,0 +1,48 @@
+import socket
+
+from django.core.management.base import BaseCommand
+
+from core.jobs import Worker
+
+
+class Command(BaseCommand):
+    help = (
+        'Run the background jobs queued with `job.delay()`. '
+        'Logs the jobs/sec processed every --stats-interval seconds.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--burst', action='store_true',
+            help='Exit once the queue is empty instead of waiting for jobs.'
+        )
+        parser.add_argument(
+            '--stats-interval', type=int, default=60,
+            help='Seconds between two throughput reports.'
+        )
+        parser.add_argument(
+            '--name', default=socket.gethostname(),
+            help=(
+                'Name of the worker, unique among the running ones; the jobs '
+                'a worker was running when it died are queued again when one '
+                'of the same name starts.'
+            )
+        )
+
+    def handle(self, *args, **options):
+        worker = Worker(name=options['name'])
+        last = {'processed': 0, 'retried': 0, 'failed': 0}
+
+        def report(worker, seconds):
+            processed = worker.processed - last['processed']
+            self.stdout.write(
+                f'{processed / seconds:.1f} jobs/sec, {processed} processed, '
+                f"{worker.retried - last['retried']} retried, "
+                f"{worker.failed - last['failed']} failed."
+            )
+            last.update(processed=worker.processed, retried=worker.retried, failed=worker.failed)
+
+        worker.run(
+            burst=options['burst'], report=report,
+            report_interval=options['stats_interval']
+        )
@@ -0,0 +1,256 @@
+import io
+import random
+import time
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import (
+    BaseCommand,
+    CommandError
+)
+from django.db import (
+    connection,
+    transaction
+)
+from django.utils import timezone
+
+from core import leaderboard
+from core.catalog_cache import bump_catalog_version
+from core.services.users import reconcile_subscription_counts
+from skill.models import (
+    Category,
+    Skill
+)
+from users.models import (
+    BaseUser,
+    Profile,
+    ProfileSkill,
+    Subscription,
+    generate_uuid
+)
+
+# Seeded users log in with PASSWORD, `manage.py load_test` relies on both.
+PHONE_PREFIX = '06'
+PASSWORD = '1234@example.com'
+CITIES = [
+    'Tehran', 'Isfahan', 'Shiraz', 'Tabriz', 'Mashhad',
+    'Yazd', 'Rasht', 'Kerman', 'Qom', 'Ahvaz'
+]
+WORDS = [
+    'backend', 'frontend', 'developer', 'designer', 'senior', 'junior',
+    'freelancer', 'api', 'mobile', 'web', 'cloud', 'devops', 'data',
+    'writer', 'startup', 'remote', 'experienced', 'fullstack'
+]
+PLANS = ['FREE'] * 7 + ['BRONZE'] * 2 + ['SILVER', 'GOLD']
+
+
+def phone_number(index:int) -> str:
+    return f'{PHONE_PREFIX}{index:09d}'
+
+
+def _copy(model, fields:list[str], rows) -> None:
+    """COPY `rows`, tuples of the values of `fields`, into the table of `model`."""
+    columns = ', '.join(model._meta.get_field(field).column for field in fields)
+    buffer = io.StringIO()
+    for row in rows:
+        buffer.write('\t'.join(r'\N' if value is None else str(value) for value in row))
+        buffer.write('\n')
+    buffer.seek(0)
+    with connection.cursor() as cursor:
+        cursor.copy_expert(
+            f'COPY {model._meta.db_table} ({columns}) FROM STDIN', buffer
+        )
+
+
+class Command(BaseCommand):
+    help = (
+        'Seed a synthetic dataset for load tests: users with phone numbers '
+        f'starting with {PHONE_PREFIX} and password {PASSWORD}, their profiles '
+        'and skills, and a power-law follower graph where a few profiles get '
+        'most of the followers. The large tables are loaded with COPY.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--users', type=int, default=1_000_000,
+            help='Users, each with a profile, to seed.'
+        )
+        parser.add_argument(
+            '--follows', type=float, default=20,
+            help='Mean number of profiles every profile follows.'
+        )
+        parser.add_argument(
+            '--alpha', type=float, default=1.1,
+            help='Exponent of the follower distribution; higher is more skewed.'
+        )
+        parser.add_argument(
+            '--skills', type=int, default=3,
+            help='Skills selected by every profile.'
+        )
+        parser.add_argument(
+            '--categories', type=int, default=20,
+            help='Published categories, with 25 skills each.'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=50_000,
+            help='Rows per COPY and per transaction.'
+        )
+        parser.add_argument(
+            '--seed', type=int, default=None,
+            help='Random seed, to seed the same dataset again.'
+        )
+        parser.add_argument(
+            '--reset', action='store_true',
+            help='Delete the previously seeded users first.'
+        )
+
+    def handle(self, *args, **options):
+        random.seed(options['seed'])
+        if BaseUser.objects.filter(phone_number__startswith=PHONE_PREFIX).exists():
+            if not options['reset']:
+                raise CommandError('Already seeded, pass --reset to seed again.')
+            self._timed('reset', self._reset)
+
+        skill_ids = self._timed('catalog', self._catalog, categories=options['categories'])
+        profile_ids = self._timed(
+            'profiles', self._profiles, count=options['users'], skill_ids=skill_ids,
+            skills=options['skills'], batch_size=options['batch_size']
+        )
+        self._timed(
+            'subscriptions', self._subscriptions, profile_ids=profile_ids,
+            follows=options['follows'], alpha=options['alpha'],
+            batch_size=options['batch_size']
+        )
+        # Nothing above went through the services, so everything derived
+        # from the rows is rebuilt from them.
+        self._timed('counters', reconcile_subscription_counts)
+        self._timed('leaderboard', leaderboard.rebuild)
+        bump_catalog_version()
+        with connection.cursor() as cursor:
+            for model in (BaseUser, Profile, ProfileSkill, Subscription):
+                cursor.execute(f'ANALYZE {model._meta.db_table}')
+
+    def _timed(self, name:str, step, **kwargs):
+        start = time.perf_counter()
+        result = step(**kwargs)
+        self.stdout.write(f'{name:>14} {time.perf_counter() - start:>8.2f}s')
+        return result
+
+    def _reset(self) -> None:
+        users = BaseUser.objects.filter(phone_number__startswith=PHONE_PREFIX)
+        profiles = Profile.objects.filter(user__in=users).values('id')
+        with transaction.atomic():
+            # Raw deletes, the ORM would load every row to cascade.
+            for queryset in (
+                Subscription.objects.filter(follower__in=profiles),
+                Subscription.objects.filter(target__in=profiles),
+                ProfileSkill.objects.filter(profile_id__in=profiles),
+                Profile.objects.filter(user__in=users),
+                users,
+            ):
+                queryset._raw_delete(queryset.db)
+
+    def _catalog(self, *, categories:int) -> list[int]:
+        Category.objects.bulk_create([
+            Category(name=f'Seed category {index}', slug=f'seed-category-{index}', published=True)
+            for index in range(categories)
+        ], ignore_conflicts=True)
+        category_ids = Category.objects.filter(
+            slug__startswith='seed-category-'
+        ).values_list('id', flat=True)
+        Skill.objects.bulk_create([
+            Skill(
+                name=f'Seed skill {category_id}-{index}',
+                slug=f'seed-skill-{category_id}-{index}',
+                category_id=category_id, published=True
+            )
+            for category_id in category_ids
+            for index in range(25)
+        ], ignore_conflicts=True)
+        return list(
+            Skill.objects.filter(slug__startswith='seed-skill-').values_list('id', flat=True)
+        )
+
+    def _profiles(
+            self, *, count:int, skill_ids:list[int], skills:int, batch_size:int
+    ) -> list[int]:
+        # Hashing once, every user shares the password.
+        password = make_password(PASSWORD)
+        uuids = set()
+        profile_ids = []
+        for start in range(0, count, batch_size):
+            stop = min(start + batch_size, count)
+            now = timezone.now()
+            with transaction.atomic():
+                _copy(
+                    BaseUser,
+                    ['phone_number', 'password', 'is_active', 'is_admin',
+                     'is_superuser', 'created_at', 'updated_at'],
+                    (
+                        (phone_number(index), password, True, False, False, now, now)
+                        for index in range(start, stop)
+                    )
+                )
+                user_ids = BaseUser.objects.filter(
+                    phone_number__gte=phone_number(start),
+                    phone_number__lte=phone_number(stop - 1)
+                ).order_by('phone_number').values_list('id', flat=True)
+
+                rows = []
+                for user_id in user_ids:
+                    uuid = generate_uuid()
+                    while uuid in uuids:
+                        uuid = generate_uuid()
+                    uuids.add(uuid)
+                    rows.append((
+                        user_id, ' '.join(random.choices(WORDS, k=12)),
+                        random.choice(CITIES), random.randint(18, 65),
+                        random.choice('MF'), random.choice(PLANS), 0,
+                        int(random.paretovariate(1.5)), 0, 0, 0, '{}', uuid
+                    ))
+                _copy(
+                    Profile,
+                    ['user', 'bio', 'city', 'age', 'sex', 'plan_type', 'balance',
+                     'score', 'views', 'followers_count', 'followings_count',
+                     'thumbnails', 'uuid'],
+                    rows
+                )
+                batch_ids = list(Profile.objects.filter(
+                    user_id__in=user_ids
+                ).order_by('id').values_list('id', flat=True))
+
+                _copy(
+                    ProfileSkill, ['profile_id', 'skill_id'],
+                    (
+                        (profile_id, skill_id)
+                        for profile_id in batch_ids
+                        for skill_id in random.sample(skill_ids, k=min(skills, len(skill_ids)))
+                    )
+                )
+            profile_ids += batch_ids
+            self.stdout.write(f'Seeded {stop}/{count} profiles.')
+        return profile_ids
+
+    def _subscriptions(
+            self, *, profile_ids:list[int], follows:float, alpha:float, batch_size:int
+    ) -> None:
+        # Profiles are followed with a Zipf probability of their popularity
+        # rank, the ranks being shuffled so they don't follow the ids.
+        popular = random.sample(profile_ids, k=len(profile_ids))
+        cum_weights = []
+        total = 0.0
+        for rank in range(1, len(popular) + 1):
+            total += rank ** -alpha
+            cum_weights.append(total)
+
+        now = timezone.now()
+        rows = []
+        for follower_id in profile_ids:
+            count = min(int(random.expovariate(1 / follows)), len(popular) - 1)
+            targets = set(random.choices(popular, cum_weights=cum_weights, k=count))
+            targets.discard(follower_id)
+            rows += [(follower_id, target_id, now, now) for target_id in targets]
+            if len(rows) >= batch_size:
+                _copy(Subscription, ['follower', 'target', 'created_at', 'updated_at'], rows)
+                rows = []
+        if rows:
+            _copy(Subscription, ['follower', 'target', 'created_at', 'updated_at'], rows)
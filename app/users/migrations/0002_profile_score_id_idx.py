@@ -0,0 +1,18 @@
+# Generated by Django 5.0.2 on 2026-10-18 14:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('skill', '0001_initial'),
+        ('users', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='profile',
+            index=models.Index(fields=['score', 'id'], name='profile_score_id_idx'),
+        ),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 5.0.2 on 2026-10-18 14:57
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_subscription_counts(apps, schema_editor):
+    Profile = apps.get_model('users', 'Profile')
+    Subscription = apps.get_model('users', 'Subscription')
+
+    def count_of(field):
+        return Coalesce(Subquery(
+            Subscription.objects.filter(**{field: OuterRef('pk')})
+            .order_by().values(field).annotate(count=Count('*')).values('count')
+        ), 0)
+
+    Profile.objects.update(
+        followers_count=count_of('target'),
+        followings_count=count_of('follower')
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0002_profile_score_id_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='profile',
+            name='followers_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='profile',
+            name='followings_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(
+            backfill_subscription_counts, migrations.RunPython.noop
+        ),
+    ]
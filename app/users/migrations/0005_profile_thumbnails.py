@@ -0,0 +1,18 @@
+# Generated by Django 5.0.2 on 2026-10-18 16:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0004_profile_search_vector'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='profile',
+            name='thumbnails',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
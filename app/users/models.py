@@ -3,6 +3,11 @@ import uuid
 
 from django.db import models
 from django.contrib.auth.models import PermissionsMixin
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import (
+    SearchVector,
+    SearchVectorField
+)
 from django.contrib.auth.base_user import (
     BaseUserManager as BUM,
     AbstractBaseUser
@@ -121,6 +126,8 @@ class Profile(models.Model):
         validators=[profile_image_size_validator],
         upload_to=profile_img_path, null=True, blank=True
     )
+    # Paths of the WebP thumbnails of the image, by size.
+    thumbnails = models.JSONField(default=dict, blank=True)
     age = models.PositiveIntegerField(
         validators=[age_validator], null=True, blank=True
     )
@@ -134,10 +141,27 @@ class Profile(models.Model):
     sex = models.CharField(max_length=2, choices=SEX, null=True, blank=True)
     city = models.CharField(max_length=100, null=True, blank=True)
     views = models.PositiveIntegerField(default=0)
+    followers_count = models.PositiveIntegerField(default=0)
+    followings_count = models.PositiveIntegerField(default=0)
     skills = models.ManyToManyField(
         Skill, related_name='skill_profile', through='ProfileSkill'
     )
     uuid = models.CharField(max_length=None, default=generate_uuid, db_index=True)
+    search_vector = models.GeneratedField(
+        expression=(
+            SearchVector('city', weight='A', config='simple')
+            + SearchVector('bio', weight='B', config='simple')
+        ),
+        output_field=SearchVectorField(),
+        db_persist=True
+    )
+
+    class Meta:
+        indexes = [
+            # Backs the (score, id) keyset pagination of the freelancers list.
+            models.Index(fields=['score', 'id'], name='profile_score_id_idx'),
+            GinIndex(fields=['search_vector'], name='profile_search_vector_idx')
+        ]
 
     def __str__(self) -> str:
         return self.uuid
@@ -1,3 +1,4 @@
+from django.conf import settings
 from django.urls import path
 from rest_framework_simplejwt.views import (
     TokenObtainPairView,
@@ -9,26 +10,37 @@ from . import apis
 
 app_name = 'users'
 
+if settings.ASYNC_READ_VIEWS:
+    ProfileDetailApiView = apis.AsyncProfileDetailApiView
+    ListFreelancersApiView = apis.AsyncListFreelancersApiView
+else:
+    ProfileDetailApiView = apis.ProfileDetailApiView
+    ListFreelancersApiView = apis.ListFreelancersApiView
+
 urlpatterns = [
     path('registration/', apis.RegistrationApiView.as_view(), name='registration'),
 
     path('profile/me/', apis.ProfileMeApiView.as_view(), name='profile_me'),
-    path('profile/<str:uuid>/', apis.ProfileDetailApiView.as_view(), name='profile_detail'),
+    path('profile/<str:uuid>/', ProfileDetailApiView.as_view(), name='profile_detail'),
     path('profile/<str:uuid>/subscription/', apis.SubscriptionApiView.as_view(), name='subscription'),
-    path('freelancers/', apis.ListFreelancersApiView.as_view(), name='freelancers_list'),
+    path('freelancers/', ListFreelancersApiView.as_view(), name='freelancers_list'),
+    path('freelancers/search/', apis.SearchFreelancersApiView.as_view(), name='freelancers_search'),
+    path('freelancers/facets/', apis.FacetedFreelancersApiView.as_view(), name='freelancers_facets'),
+    path('freelancers/leaderboard/', apis.LeaderboardApiView.as_view(), name='leaderboard'),
     path('followers/', apis.ListMyFollowersApiView.as_view(), name='followers'),
     path('followings/', apis.ListMyFollowingsApiView.as_view(), name='followings'),
     path('otp/verification/', apis.OtpVerificationApiView.as_view(), name='verification'),
     path('otp/resend/', apis.ResendOtpApiView.as_view(), name='resend_otp'),
     path('profile/<str:slug>/select/', apis.SelectSkillApiView.as_view(), name='select_skill'),
     path('profile/skills/me/', apis.MySkillsApiView.as_view(), name='my_skills'),
+    path('profile/skills/bulk-select/', apis.SelectSkillsApiView.as_view(), name='select_skills'),
     path('profile/<str:slug>/unselect/', apis.UnselectSkillApiView.as_view(), name='unselect_skill'),
 
 
 
 
     # ============ JWT URL's ============
-    path('jwt/login/', TokenObtainPairView.as_view()),
-    path('jwt/refresh/', TokenRefreshView.as_view()),
-    path('jwt/verify/', TokenVerifyView.as_view())
+    path('jwt/login/', TokenObtainPairView.as_view(), name='jwt_login'),
+    path('jwt/refresh/', TokenRefreshView.as_view(), name='jwt_refresh'),
+    path('jwt/verify/', TokenVerifyView.as_view(), name='jwt_verify')
 ]
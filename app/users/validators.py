@@ -3,6 +3,7 @@ import re
 from django.conf import settings
 from django.core.exceptions import ValidationError
 from django.utils.translation import gettext_lazy as _
+from PIL import Image
 
 def phone_validator(phone_number):
     if len(phone_number) != 11:
@@ -45,6 +46,25 @@ def profile_image_size_validator(file):
             code='image_max_size'
         )
 
+def profile_image_dimensions_validator(file):
+    """
+    Validating profile image dimensions, read from the image header
+    without decoding the pixels.
+    """
+    max_dimension = settings.MAX_PROFILE_IMAGE_DIMENSION
+
+    position = file.tell()
+    try:
+        with Image.open(file) as image:
+            width, height = image.size
+    finally:
+        file.seek(position)
+    if width > max_dimension or height > max_dimension:
+        raise ValidationError(
+            _(f'Max image dimensions are {max_dimension}x{max_dimension} pixels.'),
+            code='image_max_dimensions'
+        )
+
 def age_validator(age):
     if age > 99:
         raise ValidationError(_(